@@ -1,8 +1,14 @@
 #!/bin/bash
 
-chown -R ${USER}:${USER} /mnt/plex/Media
-find /mnt/plex/Media -type d -exec chmod 755 {} +
-find /mnt/plex/Media -type f -exec chmod 644 {} +
+# Normalize ownership and modes under /mnt/plex/Media, then mirror /mnt/plex
+# to /mnt/backup. Permissions are fixed by route23's FIX_PERMISSIONS, which
+# only touches entries that differ and, after the first run, only lists
+# directories changed since the previous one.
+
+cd "$(dirname "$(readlink -f "$0")")/.." || exit 1
+
+FIX_PERMISSIONS=/mnt/plex/Media PERM_OWNER="${USER}:${USER}" LOG_LEVEL=WARNING \
+    python3 src/main.py
 
 rsync -avh --delete --itemize-changes --exclude='lost+found' /mnt/plex/ /mnt/backup/
 
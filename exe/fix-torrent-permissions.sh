@@ -4,6 +4,14 @@
 # Install at /home/russ/bin/fix-torrent-permissions.sh on each remote device.
 # Make sure it is executable: chmod +x /home/russ/bin/fix-torrent-permissions.sh
 #
+# Runs route23's permission fixer (FIX_PERMISSIONS), which walks the tree with
+# os.scandir across worker threads and only chowns/chmods entries that differ.
+# After the first run only directories changed since the previous run are
+# listed (tracked in .route23-permissions.json in the directory), so routine
+# runs take seconds. Install it as a symlink into a route23 checkout, or set
+# ROUTE23_MAIN to its src/main.py; without either, it falls back to a full
+# chown -R and chmod pass.
+#
 # Usage: fix-torrent-permissions.sh <directory>
 
 set -euo pipefail
@@ -16,6 +24,7 @@ fi
 TARGET_DIR="$1"
 OWNER="russ"
 GROUP="russ"
+ROUTE23_MAIN="${ROUTE23_MAIN:-$(dirname "$(readlink -f "$0")")/../src/main.py}"
 
 if [[ ! -d "${TARGET_DIR}" ]]; then
     echo "[ERROR] Directory does not exist: ${TARGET_DIR}" >&2
@@ -24,12 +33,24 @@ fi
 
 echo "[INFO] Fixing permissions on ${TARGET_DIR}"
 
-# Ownership: russ:russ for everything underneath
-chown -R "${OWNER}:${GROUP}" "${TARGET_DIR}" 2>/dev/null || \
-    sudo -n chown -R "${OWNER}:${GROUP}" "${TARGET_DIR}"
-
-# Directories: 755, files: 644
-find "${TARGET_DIR}" -type d -exec chmod 755 {} +
-find "${TARGET_DIR}" -type f -exec chmod 644 {} +
+if [[ -f "${ROUTE23_MAIN}" ]] && command -v python3 >/dev/null 2>&1; then
+    fix() {
+        "$@" env FIX_PERMISSIONS="${TARGET_DIR}" PERM_OWNER="${OWNER}:${GROUP}" \
+            LOG_LEVEL=WARNING python3 "${ROUTE23_MAIN}"
+    }
+    # Entries owned by someone else need root to chown; retry those with sudo.
+    if ! fix; then
+        [[ $EUID -ne 0 ]] || exit 1
+        fix sudo -n
+    fi
+else
+    # Ownership: russ:russ for everything underneath
+    chown -R "${OWNER}:${GROUP}" "${TARGET_DIR}" 2>/dev/null || \
+        sudo -n chown -R "${OWNER}:${GROUP}" "${TARGET_DIR}"
+
+    # Directories: 755, files: 644
+    find "${TARGET_DIR}" -type d -exec chmod 755 {} +
+    find "${TARGET_DIR}" -type f -exec chmod 644 {} +
+fi
 
 echo "[INFO] Permissions fixed"
@@ -14,6 +14,9 @@
 # If the remote-dir-override is given, it is used verbatim — the auto-matcher
 # is skipped. Use this when the Plex directory name doesn't match what the
 # matcher would derive from the torrent name.
+#
+# If ROUTE23_API and CONTROL_TOKEN are set in .env, the job is queued on the
+# running daemon through its control API instead.
 
 set -euo pipefail
 
@@ -25,6 +28,30 @@ fi
 TORRENT_SUBSTR="$1"
 REMOTE_DIR_OVERRIDE="${2:-}"
 
+# Read single keys from .env rather than sourcing it: values such as
+# POSTFIX_ALLOWED_SENDER_DOMAINS hold unquoted spaces that break the shell.
+env_value() {
+    [ -f .env ] || return 0
+    sed -n "s/^$1=//p" .env | tail -n 1 | sed -e 's/^"\(.*\)"$/\1/' -e "s/^'\(.*\)'$/\1/"
+}
+
+ROUTE23_API="${ROUTE23_API:-$(env_value ROUTE23_API)}"
+CONTROL_TOKEN="${CONTROL_TOKEN:-$(env_value CONTROL_TOKEN)}"
+
+# With the daemon's control API configured, queue the job there instead of
+# starting a container.
+if [ -n "${ROUTE23_API:-}" ] && [ -n "${CONTROL_TOKEN:-}" ]; then
+    json_escape() { printf '%s' "$1" | sed 's/\\/\\\\/g; s/"/\\"/g'; }
+    BODY="{\"torrent\": \"$(json_escape "$TORRENT_SUBSTR")\", \"remote_dir\": \"$(json_escape "$REMOTE_DIR_OVERRIDE")\"}"
+    if curl -fsS -X POST -H "Authorization: Bearer ${CONTROL_TOKEN}" \
+        -d "$BODY" "${ROUTE23_API%/}/force-preload"; then
+        echo
+        echo "Follow with: curl -N ${ROUTE23_API%/}/jobs/<id>/events"
+        exit 0
+    fi
+    echo "Control API unreachable, starting a container instead" >&2
+fi
+
 mkdir -p ./logs
 LOG_FILE="./logs/route23_force_preload.log"
 
@@ -1,3 +1,30 @@
 #!/bin/bash
+#
+# Force an immediate rotation.
+#
+# If ROUTE23_API and CONTROL_TOKEN are set in .env (the compose daemon
+# service running), the rotation is queued on the daemon through
+# its control API; otherwise a one-off container is started.
 
+# Read single keys from .env rather than sourcing it: values such as
+# POSTFIX_ALLOWED_SENDER_DOMAINS hold unquoted spaces that break the shell.
+env_value() {
+    [ -f .env ] || return 0
+    sed -n "s/^$1=//p" .env | tail -n 1 | sed -e 's/^"\(.*\)"$/\1/' -e "s/^'\(.*\)'$/\1/"
+}
+
+ROUTE23_API="${ROUTE23_API:-$(env_value ROUTE23_API)}"
+CONTROL_TOKEN="${CONTROL_TOKEN:-$(env_value CONTROL_TOKEN)}"
+
+if [ -n "${ROUTE23_API:-}" ] && [ -n "${CONTROL_TOKEN:-}" ]; then
+    if curl -fsS -X POST -H "Authorization: Bearer ${CONTROL_TOKEN}" \
+        -d '{}' "${ROUTE23_API%/}/rotate"; then
+        echo
+        echo "Follow with: curl -N ${ROUTE23_API%/}/jobs/<id>/events"
+        exit 0
+    fi
+    echo "Control API unreachable, starting a container instead" >&2
+fi
+
+mkdir -p ./logs
 docker compose run --rm --profile route23 -e FORCE_ROTATION=true app > ./logs/route23_rotation.log 2>&1 &
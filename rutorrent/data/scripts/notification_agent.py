@@ -1,10 +1,46 @@
 #!/usr/bin/env python3
+"""
+rTorrent email notifier.
+
+Daemon mode (notification_agent.py --daemon) is the normal setup. rTorrent's
+event hooks run notify_spool.sh, which writes each event as a small file
+into NOTIFY_SPOOL. This process watches that directory. It waits until
+events stop arriving for NOTIFY_COALESCE seconds (or the oldest has waited
+NOTIFY_MAX_DELAY), then mails them as one digest over an SMTP connection it
+keeps open between digests. Spool files are only removed once their digest
+has been accepted, so events survive restarts and mail outages.
+
+The old one-shot form still works and sends a single email right away:
+    notification_agent.py <added|completed> <name> <directory> <size> <hash>
+
+Environment Variables:
+    SMTP_SERVER         - SMTP host (required)
+    SMTP_PORT           - SMTP port (default: 25)
+    FROM_EMAIL          - Sender address (required)
+    TO_EMAIL            - Recipient address (required)
+    SERVER_NAME         - Server label shown in the email (default: server)
+    NOTIFY_SPOOL        - Spool directory written by notify_spool.sh (default: /data/spool/notify)
+    NOTIFY_COALESCE     - Seconds without new events before a digest is sent (default: 60)
+    NOTIFY_MAX_DELAY    - Longest an event waits for a digest, in seconds (default: 600)
+    NOTIFY_POLL         - Seconds between spool scans (default: 2)
+    NOTIFY_SMTP_IDLE    - Close the SMTP connection after this many idle seconds (default: 240)
+"""
+
+import logging
 import os
+import signal
 import smtplib
 import sys
+import time
 from datetime import datetime
 from email.mime.multipart import MIMEMultipart
 from email.mime.text import MIMEText
+from html import escape
+from pathlib import Path
+
+logger = logging.getLogger("notification_agent")
+
+MAX_EVENTS_PER_DIGEST = 100
 
 
 def get_env(name, default=None, required=False):
@@ -29,18 +65,58 @@ def format_size(size_bytes_str: str) -> str:
     return f"{size:.2f} {units[idx]}"
 
 
-def build_html(
-    event_type: str, name: str, path: str, size_bytes: str, torrent_hash: str, server_name: str
-) -> str:
-    size_human = format_size(size_bytes)
+def _event_block(event: dict) -> str:
+    return f"""
+      <div class="event">
+        <div class="label">Torrent</div>
+        <div class="torrent-name">{escape(event["name"] or "Unknown")}</div>
+
+        <div class="grid">
+          <div>
+            <div class="grid-label">Status</div>
+            <div class="grid-value">{escape(event["event_type"].capitalize())}</div>
+          </div>
+          <div>
+            <div class="grid-label">Size</div>
+            <div class="grid-value">{format_size(event["size_bytes"])}</div>
+          </div>
+          <div>
+            <div class="grid-label">Download Path</div>
+            <div class="grid-value">{escape(event["path"] or "Unknown")}</div>
+          </div>
+          <div>
+            <div class="grid-label">Info Hash</div>
+            <div class="grid-value">{escape(event["torrent_hash"] or "Unknown")}</div>
+          </div>
+          <div>
+            <div class="grid-label">Time</div>
+            <div class="grid-value">{event["time"].strftime("%Y-%m-%d %H:%M:%S")}</div>
+          </div>
+        </div>
+      </div>"""
+
+
+def _counts(events: list[dict]) -> tuple[int, int]:
+    added = sum(1 for e in events if e["event_type"] == "added")
+    return added, len(events) - added
+
+
+def build_html(events: list[dict], server_name: str) -> str:
     timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    added, completed = _counts(events)
 
-    if event_type == "added":
+    if len(events) > 1:
+        title = f"{len(events)} Torrent Events"
+        title_color = "#e5e7eb"
+    elif added:
         title = "New Torrent Added"
         title_color = "#2563eb"
     else:
         title = "Torrent Completed"
         title_color = "#16a34a"
+    subtitle = timestamp
+    if len(events) > 1:
+        subtitle += f" · {added} added, {completed} completed"
 
     return f"""
 <!DOCTYPE html>
@@ -95,6 +171,11 @@ def build_html(
     .content {{
       padding: 16px 24px 20px;
     }}
+    .event + .event {{
+      margin-top: 16px;
+      padding-top: 16px;
+      border-top: 1px solid rgba(148,163,184,0.2);
+    }}
     .label {{
       font-size: 11px;
       text-transform: uppercase;
@@ -150,33 +231,12 @@ def build_html(
   <div class="card">
     <div class="header">
       <div>
-        <div class="badge">rTorrent · {server_name}</div>
+        <div class="badge">rTorrent · {escape(server_name)}</div>
         <h1 class="title">{title}</h1>
-        <div class="subtitle">{timestamp}</div>
+        <div class="subtitle">{subtitle}</div>
       </div>
     </div>
-    <div class="content">
-      <div class="label">Torrent</div>
-      <div class="torrent-name">{name or "Unknown"}</div>
-
-      <div class="grid">
-        <div>
-          <div class="grid-label">Status</div>
-          <div class="grid-value">{event_type.capitalize()}</div>
-        </div>
-        <div>
-          <div class="grid-label">Size</div>
-          <div class="grid-value">{size_human}</div>
-        </div>
-        <div>
-          <div class="grid-label">Download Path</div>
-          <div class="grid-value">{path or "Unknown"}</div>
-        </div>
-        <div>
-          <div class="grid-label">Info Hash</div>
-          <div class="grid-value">{torrent_hash or "Unknown"}</div>
-        </div>
-      </div>
+    <div class="content">{"".join(_event_block(e) for e in events)}
 
       <div class="footer">
         <div>Generated automatically by your rTorrent notifier.</div>
@@ -189,6 +249,27 @@ def build_html(
 """
 
 
+def build_message(events: list[dict], from_email: str, to_email: str, server_name: str):
+    if len(events) == 1:
+        event = events[0]
+        subject_prefix = (
+            "[rTorrent] Torrent Added"
+            if event["event_type"] == "added"
+            else "[rTorrent] Torrent Completed"
+        )
+        subject = f"{subject_prefix}: {event['name'] or 'Unknown'}"
+    else:
+        added, completed = _counts(events)
+        subject = f"[rTorrent] {added} added, {completed} completed"
+
+    msg = MIMEMultipart("alternative")
+    msg["From"] = from_email
+    msg["To"] = to_email
+    msg["Subject"] = subject
+    msg.attach(MIMEText(build_html(events, server_name), "html"))
+    return msg
+
+
 def send_email(
     event_type: str, name: str, path: str, size_bytes: str, torrent_hash: str
 ) -> None:
@@ -198,25 +279,155 @@ def send_email(
     to_email = get_env("TO_EMAIL", required=True)
     server_name = get_env("SERVER_NAME", default="server")
 
-    subject_prefix = (
-        "[rTorrent] Torrent Added"
-        if event_type == "added"
-        else "[rTorrent] Torrent Completed"
-    )
-    subject = f"{subject_prefix}: {name or 'Unknown'}"
-
-    msg = MIMEMultipart("alternative")
-    msg["From"] = from_email
-    msg["To"] = to_email
-    msg["Subject"] = subject
-
-    html = build_html(event_type, name, path, size_bytes, torrent_hash, server_name)
-    msg.attach(MIMEText(html, "html"))
+    event = {
+        "event_type": event_type,
+        "name": name,
+        "path": path,
+        "size_bytes": size_bytes,
+        "torrent_hash": torrent_hash,
+        "time": datetime.now(),
+    }
+    msg = build_message([event], from_email, to_email, server_name)
 
     with smtplib.SMTP(smtp_host, smtp_port, timeout=10) as server:
         server.sendmail(from_email, [to_email], msg.as_string())
 
 
+def read_event(path: Path) -> dict | None:
+    """Parse one spool file: event type, name, directory, size and hash, one per line."""
+    try:
+        text = path.read_text(errors="replace")
+        mtime = path.stat().st_mtime
+    except OSError:
+        return None
+    lines = text.rstrip("\n").split("\n")
+    if len(lines) < 5:
+        return None
+    return {
+        "file": path,
+        "event_type": lines[0],
+        # A name containing newlines spans several lines; the last three are fixed.
+        "name": "\n".join(lines[1:-3]),
+        "path": lines[-3],
+        "size_bytes": lines[-2],
+        "torrent_hash": lines[-1],
+        "time": datetime.fromtimestamp(mtime),
+        "mtime": mtime,
+    }
+
+
+class Notifier:
+    """Sends spooled events as digests over one reused SMTP connection."""
+
+    RETRY_MIN = 30
+    RETRY_MAX = 1800
+
+    def __init__(self):
+        self.smtp_host = get_env("SMTP_SERVER", required=True)
+        self.smtp_port = int(get_env("SMTP_PORT", "25"))
+        self.from_email = get_env("FROM_EMAIL", required=True)
+        self.to_email = get_env("TO_EMAIL", required=True)
+        self.server_name = get_env("SERVER_NAME", default="server")
+        self.spool = Path(get_env("NOTIFY_SPOOL", "/data/spool/notify"))
+        self.coalesce = float(get_env("NOTIFY_COALESCE", "60"))
+        self.max_delay = float(get_env("NOTIFY_MAX_DELAY", "600"))
+        self.poll = float(get_env("NOTIFY_POLL", "2"))
+        self.smtp_idle = float(get_env("NOTIFY_SMTP_IDLE", "240"))
+        self._smtp: smtplib.SMTP | None = None
+        self._last_used = 0.0
+        self._retry_at = 0.0
+        self._retry_delay = 0.0
+
+    def pending(self) -> list[dict]:
+        events = []
+        for path in self.spool.glob("*.evt"):
+            event = read_event(path)
+            if event is None:
+                logger.warning(f"Discarding unreadable spool file {path.name}")
+                path.unlink(missing_ok=True)
+                continue
+            events.append(event)
+        return sorted(events, key=lambda e: (e["mtime"], e["file"].name))
+
+    def _connection(self) -> smtplib.SMTP:
+        if self._smtp is not None:
+            try:
+                if self._smtp.noop()[0] == 250:
+                    return self._smtp
+            except (smtplib.SMTPException, OSError):
+                pass
+            self.close()
+        self._smtp = smtplib.SMTP(self.smtp_host, self.smtp_port, timeout=30)
+        return self._smtp
+
+    def close(self):
+        if self._smtp is None:
+            return
+        try:
+            self._smtp.quit()
+        except (smtplib.SMTPException, OSError):
+            self._smtp.close()
+        self._smtp = None
+
+    def send(self, events: list[dict]):
+        msg = build_message(
+            events, self.from_email, self.to_email, self.server_name
+        ).as_string()
+        try:
+            self._connection().sendmail(self.from_email, [self.to_email], msg)
+        except smtplib.SMTPServerDisconnected:
+            # The server closed an idle connection between the NOOP and the send.
+            self.close()
+            self._connection().sendmail(self.from_email, [self.to_email], msg)
+        self._last_used = time.monotonic()
+
+    def due(self, events: list[dict]) -> bool:
+        """True once the burst has gone quiet, or the oldest event has waited long enough."""
+        now = time.time()
+        return (
+            now - events[-1]["mtime"] >= self.coalesce
+            or now - events[0]["mtime"] >= self.max_delay
+        )
+
+    def step(self):
+        events = self.pending()
+        if events and self.due(events) and time.monotonic() >= self._retry_at:
+            for start in range(0, len(events), MAX_EVENTS_PER_DIGEST):
+                batch = events[start : start + MAX_EVENTS_PER_DIGEST]
+                try:
+                    self.send(batch)
+                except (smtplib.SMTPException, OSError) as e:
+                    self.close()
+                    self._retry_delay = min(
+                        max(self._retry_delay * 2, self.RETRY_MIN), self.RETRY_MAX
+                    )
+                    self._retry_at = time.monotonic() + self._retry_delay
+                    logger.error(
+                        f"Sending {len(batch)} event(s) failed ({e}), "
+                        f"retrying in {self._retry_delay:.0f}s"
+                    )
+                    return
+                for event in batch:
+                    event["file"].unlink(missing_ok=True)
+                self._retry_delay = 0.0
+                logger.info(f"Sent digest of {len(batch)} event(s) to {self.to_email}")
+        elif self._smtp and time.monotonic() - self._last_used > self.smtp_idle:
+            self.close()
+
+    def run(self):
+        self.spool.mkdir(parents=True, exist_ok=True)
+        logger.info(
+            f"Watching {self.spool}, digest after {self.coalesce:.0f}s quiet "
+            f"(at most {self.max_delay:.0f}s)"
+        )
+        try:
+            while True:
+                self.step()
+                time.sleep(self.poll)
+        finally:
+            self.close()
+
+
 def main(argv):
     """
     Args from rTorrent:
@@ -225,7 +436,22 @@ def main(argv):
       argv[3] = download path (directory)
       argv[4] = size in bytes
       argv[5] = info hash
+
+    or --daemon to send spooled events as digests.
     """
+    if len(argv) > 1 and argv[1] == "--daemon":
+        logging.basicConfig(
+            level=logging.INFO,
+            format="%(asctime)s - %(levelname)s - %(message)s",
+        )
+        signal.signal(signal.SIGTERM, lambda *_: sys.exit(0))
+        try:
+            Notifier().run()
+        except RuntimeError as e:
+            logger.error(str(e))
+            return 1
+        return 0
+
     if len(argv) < 6:
         print(f"Not enough arguments, got {len(argv) - 1}", file=sys.stderr)
         return 1
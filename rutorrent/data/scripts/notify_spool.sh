@@ -0,0 +1,8 @@
+#!/bin/sh
+# rTorrent event hook: spool one event for notification_agent.py --daemon.
+# Args: event type, name, directory, size, hash. Written under a temporary
+# name and renamed, so the notifier never reads a half-written file.
+dir="${NOTIFY_SPOOL:-/data/spool/notify}"
+[ -d "$dir" ] || mkdir -p "$dir"
+f="$dir/$(date +%s).$$"
+printf '%s\n' "$@" > "$f.tmp" && mv "$f.tmp" "$f.evt"
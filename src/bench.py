@@ -0,0 +1,749 @@
+#!/usr/bin/env python3
+"""
+route23 benchmark harness - measures rotation performance without a live
+rtorrent, VPN container or Plex box.
+
+Builds a synthetic .torrent library, serves it from an in-process fake
+rtorrent (XML-RPC over HTTP, with configurable per-call latency and hashing
+speed), stands a local directory in for the remote preload host, then drives
+TorrentRotator.rotate, status, repreload and the LIBRARY_REPORT scan and
+queries, and reports wall time and RPC calls for each step. Development
+only: the container image ships main.py alone.
+
+Every run also starts main.py once as a cron job would when no rotation is
+due, under "python -X importtime", and fails if that path imports any of
+the subsystems it should load lazily (RPC, notifications, preload helpers),
+and a set of correctness checks (see CHECKS) for behaviour the timings
+would not catch, such as a corrupt library index.
+
+Usage:
+    python src/bench.py                              # 100 and 1000 torrents
+    python src/bench.py --sizes 100,10000,100000
+    python src/bench.py --latency 0.005 --hash-mb-per-s 80 --json results.json
+    python src/bench.py --budget bench_budget.json   # exit 1 if a budget is exceeded
+    python src/bench.py --check                      # CI regression gate
+
+Budget file: JSON mapping "<step>" or "<size>:<step>" to a maximum number of
+seconds, and "rpc:<step>" or "rpc:<size>:<step>" to a maximum number of RPC
+calls, e.g. {"status": 1.0, "100000:rotate": 120, "rpc:status": 5}. The
+startup check is the "startup" step; "import_ms:startup" caps the summed
+module import time it reports. bench_budget.json at the top of the checkout
+holds the limits --check enforces; raise one there, in the same change, when
+a slowdown is intended.
+"""
+
+import argparse
+import contextlib
+import hashlib
+import io
+import json
+import logging
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+from socketserver import ThreadingMixIn
+import xmlrpc.client
+from xmlrpc.server import SimpleXMLRPCRequestHandler, SimpleXMLRPCServer
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import main  # noqa: E402
+
+logger = logging.getLogger("route23.bench")
+
+# Checked-in limits and library sizes for --check, the regression gate CI runs.
+DEFAULT_BUDGET = Path(__file__).resolve().parent.parent / "bench_budget.json"
+CHECK_SIZES = "100"
+STARTUP_RUNS = 3
+
+# Modules the "no rotation needed" path must not import: the subsystems
+# main.py loads at their call sites (RPC, notifications, preload helpers,
+# the HTTP server, profiling).
+LAZY_MODULES = (
+    "asyncio",
+    "cProfile",
+    "concurrent.futures",
+    "ctypes",
+    "email",
+    "hashlib",
+    "http.client",
+    "http.server",
+    "mmap",
+    "pstats",
+    "shlex",
+    "smtplib",
+    "subprocess",
+    "tracemalloc",
+    "xmlrpc.client",
+)
+
+
+def bencode(obj) -> bytes:
+    """Minimal bencode encoder (the counterpart of main._bdecode)."""
+    if isinstance(obj, int):
+        return b"i%de" % obj
+    if isinstance(obj, str):
+        obj = obj.encode()
+    if isinstance(obj, bytes):
+        return b"%d:%s" % (len(obj), obj)
+    if isinstance(obj, list):
+        return b"l" + b"".join(bencode(item) for item in obj) + b"e"
+    if isinstance(obj, dict):
+        items = sorted(
+            (k.encode() if isinstance(k, str) else k, v) for k, v in obj.items()
+        )
+        return b"d" + b"".join(bencode(k) + bencode(v) for k, v in items) + b"e"
+    raise TypeError(f"cannot bencode {type(obj).__name__}")
+
+
+def make_corpus(
+    root: Path,
+    count: int,
+    files_per_torrent: int = 1,
+    file_size: int = 1024 * 1024,
+    remote_count: int = 0,
+    piece_length: int = 256 * 1024,
+) -> tuple[Path, Path]:
+    """Write count .torrent files, and remote copies of the first remote_count.
+
+    Torrents are named like scene releases ("Bench.Title.000042.1992.1080p.mkv")
+    and remote directories like Plex ("Bench Title 000042 (1992)") so the
+    preload matcher does real work. Files within a torrent get distinct sizes
+    so size matching is unambiguous, and every torrent gets its own piece
+    hashes so preload never treats two of them as the same content. Remote
+    files are sparse.
+    """
+    torrent_dir = root / "torrents"
+    remote_dir = root / "remote"
+    torrent_dir.mkdir(parents=True, exist_ok=True)
+    remote_dir.mkdir(parents=True, exist_ok=True)
+
+    for i in range(count):
+        year = 1950 + i % 70
+        release = f"Bench.Title.{i:06d}.{year}.1080p"
+        sizes = [file_size + n for n in range(files_per_torrent)]
+        n_pieces = max(1, -(-sum(sizes) // piece_length))
+        pieces = hashlib.sha1(release.encode()).digest() * n_pieces
+        if files_per_torrent == 1:
+            name = f"{release}.mkv"
+            info = {"name": name, "length": sizes[0]}
+            files = [(name, sizes[0])]
+        else:
+            name = release
+            files = [(f"part{n:02d}.mkv", size) for n, size in enumerate(sizes)]
+            info = {
+                "name": name,
+                "files": [{"path": [f], "length": size} for f, size in files],
+            }
+        info.update({"piece length": piece_length, "pieces": pieces})
+        (torrent_dir / f"{release}.torrent").write_bytes(
+            bencode({"announce": "http://tracker.invalid/announce", "info": info})
+        )
+
+        if i < remote_count:
+            movie_dir = remote_dir / f"Bench Title {i:06d} ({year})"
+            movie_dir.mkdir(exist_ok=True)
+            for n, (_, size) in enumerate(files):
+                with open(movie_dir / f"Bench Title {i:06d} ({year}) - {n}.mkv", "wb") as f:
+                    f.truncate(size)
+
+    return torrent_dir, remote_dir
+
+
+class _QuietHandler(SimpleXMLRPCRequestHandler):
+    rpc_paths = ()
+
+    def log_message(self, format, *args):
+        pass
+
+
+class _ThreadingXMLRPCServer(ThreadingMixIn, SimpleXMLRPCServer):
+    daemon_threads = True
+
+
+class FakeRtorrent:
+    """In-process rtorrent stand-in serving XML-RPC over HTTP.
+
+    Implements the methods route23 calls (system.multicall included; its
+    inner calls are what get counted). Every call sleeps for `latency`
+    seconds first, and calls are counted per method. Rechecks run one at a
+    time at `hash_rate` bytes/s (0 = instant) and complete lazily when
+    polled, so no timer threads are needed. Large integers are returned as
+    strings, which route23 int()s, because Python's XML-RPC marshaller has
+    no i8 support.
+    """
+
+    FIELDS = (
+        "d.hash",
+        "d.name",
+        "d.base_path",
+        "d.directory",
+        "d.size_bytes",
+        "d.bytes_done",
+        "d.hashing",
+        "d.up.total",
+        "d.up.rate",
+        "d.down.rate",
+        "d.ratio",
+        "d.state",
+        "d.peers_connected",
+        "d.peers_complete",
+        "d.peers_accounted",
+    )
+
+    def __init__(self, latency: float = 0.0, hash_rate: float = 0.0):
+        self.latency = latency
+        self.hash_rate = hash_rate
+        self.torrents: dict[str, dict] = {}
+        self.calls: dict[str, int] = {}
+        self._lock = threading.Lock()
+        self._hash_free_at = 0.0
+        self._server = _ThreadingXMLRPCServer(
+            ("127.0.0.1", 0),
+            requestHandler=_QuietHandler,
+            logRequests=False,
+            allow_none=True,
+        )
+        self._server.register_multicall_functions()
+        self._server.register_instance(self)
+        self.url = f"http://127.0.0.1:{self._server.server_address[1]}/RPC2"
+
+    def start(self) -> "FakeRtorrent":
+        threading.Thread(
+            target=self._server.serve_forever, name="fake-rtorrent", daemon=True
+        ).start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def call_count(self) -> int:
+        with self._lock:
+            return sum(self.calls.values())
+
+    def _dispatch(self, method: str, params):
+        with self._lock:
+            self.calls[method] = self.calls.get(method, 0) + 1
+        if self.latency:
+            time.sleep(self.latency)
+        handler = self._methods().get(method)
+        if handler is None:
+            if method in self.FIELDS:
+                return self._field(params[0], method)
+            raise xmlrpc.client.Fault(-506, f"Method '{method}' not defined")
+        return handler(*params)
+
+    def _methods(self) -> dict:
+        return {
+            "download_list": lambda *a: list(self.torrents),
+            "load.raw_start": self._load,
+            "load.raw": self._load,
+            "d.multicall2": self._multicall,
+            "d.check_hash": self._check_hash,
+            "d.stop": lambda h: self._touch(h),
+            "d.close": lambda h: self._touch(h),
+            "d.start": lambda h: self._touch(h),
+            "d.erase": self._erase,
+            "throttle.global_up.rate": lambda *a: 0,
+            "throttle.global_down.rate": lambda *a: 0,
+            "network.open_sockets": lambda *a: len(self.torrents),
+        }
+
+    def _touch(self, info_hash: str) -> int:
+        if info_hash not in self.torrents:
+            raise xmlrpc.client.Fault(-501, "Could not find info-hash.")
+        return 0
+
+    def _load(self, _target, data, *commands) -> int:
+        raw = data.data
+        info = main._bdecode_torrent(raw)[b"info"]
+        info_hash = main.torrent_info_hash(raw)
+        name = info[b"name"].decode("utf-8", errors="replace")
+        size = info.get(b"length") or sum(f[b"length"] for f in info[b"files"])
+        directory = "/downloads"
+        for command in commands:
+            if command.startswith("d.directory.set="):
+                directory = command.split("=", 1)[1]
+        seed = int(hashlib.sha1(raw).hexdigest()[:8], 16)
+        with self._lock:
+            self.torrents[info_hash] = {
+                "d.hash": info_hash,
+                "d.name": name,
+                "d.base_path": os.path.join(directory, name),
+                "d.directory": directory,
+                "d.size_bytes": size,
+                "d.bytes_done": 0,
+                "d.hashing": 0,
+                "d.up.total": seed % (8 * size + 1),
+                "d.up.rate": seed % 65536,
+                "d.down.rate": 0,
+                "d.state": 1,
+                "d.peers_connected": seed % 7,
+                "d.peers_complete": seed % 5,
+                "d.peers_accounted": seed % 3,
+                "hash_done_at": None,
+            }
+        return 0
+
+    def _erase(self, info_hash: str) -> int:
+        with self._lock:
+            if self.torrents.pop(info_hash, None) is None:
+                raise xmlrpc.client.Fault(-501, "Could not find info-hash.")
+        return 0
+
+    def _check_hash(self, info_hash: str) -> int:
+        self._touch(info_hash)
+        with self._lock:
+            t = self.torrents[info_hash]
+            duration = t["d.size_bytes"] / self.hash_rate if self.hash_rate else 0.0
+            start = max(time.monotonic(), self._hash_free_at)
+            self._hash_free_at = start + duration
+            t["d.hashing"] = 1
+            t["hash_done_at"] = self._hash_free_at
+        return 0
+
+    def _refresh(self, t: dict):
+        if t["hash_done_at"] is not None and time.monotonic() >= t["hash_done_at"]:
+            t["d.hashing"] = 0
+            t["d.bytes_done"] = t["d.size_bytes"]
+            t["hash_done_at"] = None
+
+    def _value(self, t: dict, field: str):
+        if field == "d.ratio":
+            done = t["d.bytes_done"]
+            return t["d.up.total"] * 1000 // done if done else 0
+        value = t[field]
+        return str(value) if isinstance(value, int) and value > 2**31 - 1 else value
+
+    def _field(self, info_hash: str, field: str):
+        self._touch(info_hash)
+        with self._lock:
+            t = self.torrents[info_hash]
+            self._refresh(t)
+            return self._value(t, field)
+
+    def _multicall(self, _target, _view, *fields):
+        names = [f.rstrip("=") for f in fields]
+        with self._lock:
+            rows = []
+            for t in self.torrents.values():
+                self._refresh(t)
+                rows.append([self._value(t, name) for name in names])
+        return rows
+
+
+def _bench_config(root: Path, torrent_dir: Path, remote_dir: Path, fake, args) -> dict:
+    config = main.load_config()
+    config.update(
+        {
+            "torrent_dir": str(torrent_dir),
+            "state_file": str(root / "states" / "route23_state.json"),
+            "download_dir": str(root / "downloads"),
+            "rtorrent_url": fake.url,
+            "batch_size": args.batch,
+            "sort_order": "alphabetical",
+            "add_delay": 0.0,
+            "remove_delay": 0.0,
+            "startup_delay": 0.0,
+            "max_load": float("inf"),
+            "disk_reserve_gb": 0.0,
+            "hashcheck_poll_interval": 0.25,
+            # The fake rechecks at --hash-mb-per-s, so rotate times the code
+            # rather than the grace a real rtorrent needs.
+            "hashcheck_start_grace": 0.0,
+            "preload_sources": [
+                {"name": "bench", "transport": "local", "remote_dir": str(remote_dir)}
+            ],
+            "notify_email": "",
+            "metrics_textfile": "",
+            "trace_file": "",
+            "sample_interval": 0.0,
+        }
+    )
+    return config
+
+
+def _step(results: list, size: int, step: str, fake: FakeRtorrent, fn):
+    before_calls = dict(fake.calls)
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        fn()
+    elapsed = time.perf_counter() - start
+    calls = {
+        m: n - before_calls.get(m, 0)
+        for m, n in fake.calls.items()
+        if n - before_calls.get(m, 0)
+    }
+    results.append(
+        {
+            "size": size,
+            "step": step,
+            "seconds": round(elapsed, 4),
+            "rpc_calls": sum(calls.values()),
+            "rpc_by_method": calls,
+        }
+    )
+    logger.info(f"{size:>7} {step:<20} {elapsed:8.3f}s {sum(calls.values()):>6} RPC")
+
+
+def run_size(size: int, args, results: list):
+    root = Path(tempfile.mkdtemp(prefix=f"route23-bench-{size}-", dir=args.workdir))
+    fake = FakeRtorrent(
+        latency=args.latency, hash_rate=args.hash_mb_per_s * 1024 * 1024
+    ).start()
+    try:
+        start = time.perf_counter()
+        torrent_dir, remote_dir = make_corpus(
+            root,
+            size,
+            files_per_torrent=args.files,
+            file_size=args.file_kb * 1024,
+            remote_count=min(size, args.batch * 2),
+        )
+        logger.info(f"{size:>7} corpus         {time.perf_counter() - start:8.3f}s")
+
+        config = _bench_config(root, torrent_dir, remote_dir, fake, args)
+        Path(config["download_dir"]).mkdir(parents=True, exist_ok=True)
+        preloader = main.PreloadManager(config)
+        rotator = main.TorrentRotator(config, preloader=preloader)
+
+        _step(results, size, "rotate (cold)", fake, rotator.rotate)
+        _step(results, size, "status", fake, rotator.status)
+        _step(results, size, "status --json", fake, lambda: rotator.status("json"))
+        _step(
+            results, size, "rotate", fake, lambda: rotator.rotate(delete_old_data=True)
+        )
+        _step(results, size, "repreload", fake, rotator.repreload)
+        index = main.LibraryIndex(config)
+        _step(results, size, "library scan (cold)", fake, index.scan)
+        _step(results, size, "library scan", fake, index.scan)
+        _step(results, size, "library report", fake, index.report)
+        index.close()
+        if rotator.deleter:
+            rotator.deleter.drain()
+    finally:
+        fake.stop()
+        if not args.keep:
+            shutil.rmtree(root, ignore_errors=True)
+
+
+def _parse_importtime(stderr: str) -> tuple[int, list[str]]:
+    """Summed self time in microseconds and module names from -X importtime."""
+    import_us, imported = 0, []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, _, name = line[len("import time:") :].split("|")
+        import_us += int(self_us)
+        imported.append(name.strip())
+    return import_us, imported
+
+
+def run_startup(args, results: list):
+    """Time a cold "no rotation needed" run of main.py and list eager imports."""
+    root = Path(tempfile.mkdtemp(prefix="route23-bench-startup-", dir=args.workdir))
+    fake = FakeRtorrent().start()
+    try:
+        state_file = root / "route23_state.json"
+        state_file.write_text(
+            json.dumps(
+                {
+                    "current_batch": [],
+                    "batch_started": time.strftime("%Y-%m-%dT%H:%M:%S"),
+                    "cycle": 1,
+                }
+            )
+        )
+        (root / "torrents").mkdir()
+        env = {
+            "PATH": os.environ.get("PATH", "/usr/bin:/bin"),
+            "TORRENT_DIR": str(root / "torrents"),
+            "STATE_FILE": str(state_file),
+            "RTORRENT_URL": fake.url,
+            "SAMPLE_INTERVAL": "10",
+            "LOG_LEVEL": "WARNING",
+        }
+        # Best of a few runs, so a tight import_ms budget is not at the mercy
+        # of one noisy start.
+        runs = []
+        for _ in range(STARTUP_RUNS):
+            start = time.perf_counter()
+            proc = subprocess.run(
+                [sys.executable, "-X", "importtime", main.__file__],
+                env=env,
+                capture_output=True,
+                text=True,
+                timeout=60,
+            )
+            runs.append((time.perf_counter() - start, proc))
+            if proc.returncode != 0:
+                break
+    finally:
+        fake.stop()
+        if not args.keep:
+            shutil.rmtree(root, ignore_errors=True)
+
+    elapsed = min(e for e, _ in runs)
+    proc = runs[-1][1]
+    if proc.returncode == 0:
+        proc = min((p for _, p in runs), key=lambda p: _parse_importtime(p.stderr)[0])
+    import_us, imported = _parse_importtime(proc.stderr)
+    eager = sorted(
+        m for m in LAZY_MODULES if any(n == m or n.startswith(m + ".") for n in imported)
+    )
+    if proc.returncode != 0:
+        logger.error(f"main.py exited {proc.returncode}:\n{proc.stderr[-2000:]}")
+    results.append(
+        {
+            "size": 0,
+            "step": "startup",
+            "seconds": round(elapsed, 4),
+            "rpc_calls": sum(fake.calls.values()),
+            "rpc_by_method": dict(fake.calls),
+            "import_ms": round(import_us / 1000, 1),
+            "modules": len(imported),
+            "eager_imports": eager,
+            "returncode": proc.returncode,
+        }
+    )
+    logger.info(
+        f"{'-':>7} startup        {elapsed:8.3f}s {sum(fake.calls.values()):>6} RPC"
+        f"  ({len(imported)} modules, {import_us / 1000:.1f}ms importing)"
+    )
+
+
+def check_index_truncated(args) -> list[str]:
+    """A truncated or corrupt route23_library.idx is rescanned, never raised."""
+    root = Path(tempfile.mkdtemp(prefix="route23-bench-index-", dir=args.workdir))
+    problems = []
+    try:
+        torrent_dir, _ = make_corpus(root, 5, file_size=1024)
+        config = main.load_config()
+        config.update(
+            {
+                "torrent_dir": str(torrent_dir),
+                "state_file": str(root / "route23_state.json"),
+                "scan_workers": 1,
+            }
+        )
+        index = main.LibraryIndex(config)
+        index.scan()
+        index.close()
+        data = index.path.read_bytes()
+        damaged = {
+            "empty": b"",
+            "header only": data[: main.LibraryIndex.HEADER.size],
+            "cut in columns": data[: main.LibraryIndex.HEADER.size + 24],
+            "cut in strings": data[:-3],
+            "trailing bytes": data + b"\0" * 8,
+            "bad magic": b"X" + data[1:],
+        }
+        for label, content in damaged.items():
+            index.path.write_bytes(content)
+            try:
+                if index.load():
+                    problems.append(f"{label}: load() accepted a damaged index")
+            except Exception as e:
+                problems.append(f"{label}: load() raised {type(e).__name__}: {e}")
+            index.close()
+        index.path.write_bytes(data)
+        if not index.load() or index.count != 5:
+            problems.append("intact index did not load back")
+        index.close()
+    finally:
+        if not args.keep:
+            shutil.rmtree(root, ignore_errors=True)
+    return problems
+
+
+def check_plan_matches_rotation(args) -> list[str]:
+    """PLAN_ROTATION picks the batch a real rotation then adds, with deletion freeing disk.
+
+    DISK_RESERVE_GB is set so that free space alone fits fewer torrents than
+    BATCH_SIZE, and only the data removed with the old batch makes room for
+    the rest.
+    """
+    root = Path(tempfile.mkdtemp(prefix="route23-bench-plan-", dir=args.workdir))
+    fake = FakeRtorrent().start()
+    problems = []
+    try:
+        batch, size = 4, 4 * 1024 * 1024
+        torrent_dir, remote_dir = make_corpus(
+            root, batch * 3, file_size=size, remote_count=batch * 3
+        )
+        # Real bytes, so staged copies use the disk space they claim.
+        for path in remote_dir.rglob("*.mkv"):
+            path.write_bytes(b"\1" * path.stat().st_size)
+        config = _bench_config(root, torrent_dir, remote_dir, fake, args)
+        config.update({"batch_size": batch, "hashcheck_per_device": batch})
+        Path(config["download_dir"]).mkdir(parents=True, exist_ok=True)
+        rotator = main.TorrentRotator(config, preloader=main.PreloadManager(config))
+        with contextlib.redirect_stdout(io.StringIO()):
+            rotator.rotate()
+            if rotator.deleter:
+                rotator.deleter.drain()
+            st = os.statvfs(config["download_dir"])
+            config["disk_reserve_gb"] = (
+                st.f_bavail * st.f_frsize - int(size * (batch / 2 + 0.5))
+            ) / 1024**3
+            plan = main.RotationSimulator(rotator).plan(delete_data=True)
+            rotator.rotate(delete_old_data=True)
+            if rotator.deleter:
+                rotator.deleter.drain()
+        planned = [t["path"] for t in plan["batch"]]
+        actual = rotator.state["current_batch"]
+        if len(planned) != batch:
+            problems.append(
+                f"plan picked {len(planned)} torrents, expected {batch} once the old batch is deleted"
+            )
+        if planned != actual:
+            problems.append(
+                f"plan picked {[Path(p).stem for p in planned]}, "
+                f"rotation added {[Path(p).stem for p in actual]}"
+            )
+    finally:
+        fake.stop()
+        if not args.keep:
+            shutil.rmtree(root, ignore_errors=True)
+    return problems
+
+
+CHECKS = {
+    "index truncated": check_index_truncated,
+    "plan vs rotation": check_plan_matches_rotation,
+}
+
+
+def run_checks(args, results: list):
+    for name, check in CHECKS.items():
+        start = time.perf_counter()
+        try:
+            problems = check(args)
+        except Exception as e:
+            problems = [f"raised {type(e).__name__}: {e}"]
+        elapsed = time.perf_counter() - start
+        results.append(
+            {
+                "size": 0,
+                "step": f"check {name}",
+                "seconds": round(elapsed, 4),
+                "rpc_calls": 0,
+                "rpc_by_method": {},
+                "problems": problems,
+            }
+        )
+        logger.info(
+            f"{'-':>7} check {name:<14} {elapsed:8.3f}s"
+            + (f"  FAILED: {'; '.join(problems)}" if problems else "  ok")
+        )
+
+
+def check_budget(results: list, budget: dict) -> list[str]:
+    """Return a description of every result that exceeds its budget."""
+    failures = []
+    for r in results:
+        failures.extend(f"{r['step']}: {p}" for p in r.get("problems", ()))
+        if r["step"] == "startup":
+            if r["returncode"] != 0:
+                failures.append(f"startup: main.py exited {r['returncode']}")
+            if r["eager_imports"]:
+                failures.append(
+                    f"startup: imported {', '.join(r['eager_imports'])} eagerly"
+                )
+            if r["rpc_calls"]:
+                failures.append(f"startup: made {r['rpc_calls']} RPC call(s)")
+            limit = budget.get("import_ms:startup")
+            if limit is not None and r["import_ms"] > limit:
+                failures.append(f"startup: import_ms {r['import_ms']} > {limit}")
+        # A size-specific limit overrides the step's general one.
+        for key, prefix in (("seconds", ""), ("rpc_calls", "rpc:")):
+            for limit_key in (
+                f"{prefix}{r['size']}:{r['step']}",
+                f"{prefix}{r['step']}",
+            ):
+                if limit_key in budget:
+                    if r[key] > budget[limit_key]:
+                        failures.append(
+                            f"{r['size']} {r['step']}: {key} {r[key]} > {budget[limit_key]}"
+                        )
+                    break
+    return failures
+
+
+def report(results: list):
+    print("\n" + "=" * 72)
+    print("ROTATION BENCHMARK")
+    print("=" * 72)
+    print(f"{'Torrents':>9}  {'Step':<20}{'Seconds':>10}{'RPC calls':>11}  Top methods")
+    print("-" * 72)
+    for r in results:
+        top = sorted(r["rpc_by_method"].items(), key=lambda kv: -kv[1])[:3]
+        methods = ", ".join(f"{m}={n}" for m, n in top)
+        print(
+            f"{r['size']:>9}  {r['step']:<20}{r['seconds']:>10.3f}{r['rpc_calls']:>11}  {methods}"
+        )
+    print("=" * 72 + "\n")
+
+
+def main_cli(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument(
+        "--sizes", default=None, help="library sizes to run (default: 100,1000)"
+    )
+    parser.add_argument("--batch", type=int, default=20, help="BATCH_SIZE")
+    parser.add_argument("--files", type=int, default=1, help="files per torrent")
+    parser.add_argument("--file-kb", type=int, default=1024, help="size of each file")
+    parser.add_argument(
+        "--latency", type=float, default=0.0, help="seconds added to every RPC call"
+    )
+    parser.add_argument(
+        "--hash-mb-per-s", type=float, default=0.0, help="recheck speed (0 = instant)"
+    )
+    parser.add_argument("--workdir", default=None, help="where to build corpora")
+    parser.add_argument("--keep", action="store_true", help="keep generated files")
+    parser.add_argument("--json", dest="json_out", help="write results to this file")
+    parser.add_argument("--budget", help="JSON budget file; exit 1 if exceeded")
+    parser.add_argument(
+        "--check",
+        action="store_true",
+        help=f"CI gate: {CHECK_SIZES} torrents against {DEFAULT_BUDGET.name}",
+    )
+    parser.add_argument("--verbose", action="store_true", help="show route23 logs")
+    args = parser.parse_args(argv)
+    if args.check:
+        args.budget = args.budget or str(DEFAULT_BUDGET)
+    if args.sizes is None:
+        args.sizes = CHECK_SIZES if args.check else "100,1000"
+
+    logging.getLogger().setLevel(logging.INFO if args.verbose else logging.WARNING)
+    logger.setLevel(logging.INFO)
+
+    results: list[dict] = []
+    run_startup(args, results)
+    run_checks(args, results)
+    for size in (int(s) for s in args.sizes.split(",") if s.strip()):
+        run_size(size, args, results)
+    report(results)
+
+    if args.json_out:
+        with open(args.json_out, "w") as f:
+            json.dump({"args": vars(args), "results": results}, f, indent=2)
+
+    budget = {}
+    if args.budget:
+        with open(args.budget) as f:
+            budget = json.load(f)
+    failures = check_budget(results, budget)
+    for failure in failures:
+        print(f"FAILED: {failure}")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main_cli())
@@ -12,6 +12,8 @@ Environment Variables:
     RTORRENT_URL        - rtorrent XMLRPC endpoint (default: http://localhost:8080/RPC2)
     RTORRENT_USER       - rtorrent username for authentication (optional)
     RTORRENT_PASS       - rtorrent password for authentication (optional)
+    RTORRENT_INSTANCES  - JSON list of rtorrent endpoints to spread batches across, each a URL
+                          or {"name", "url", "user", "pass", "weight"}; overrides RTORRENT_URL
     BATCH_SIZE          - Number of torrents per batch (default: 20)
     ROTATION_DAYS       - Days between rotations (default: 14)
     DOWNLOAD_DIR        - Download directory for torrent data (default: /downloads/route23)
@@ -22,18 +24,53 @@ Environment Variables:
     MAX_LOAD            - Max system load before waiting (default: 4.0)
     LOAD_WAIT           - Seconds to wait when load is high (default: 30)
     STARTUP_DELAY       - Seconds to wait after removals before adding (default: 10)
+    BACKGROUND_DELETE   - Set to "false" to delete data inline during removal (default: true)
+    DELETE_CHUNK_MB     - Large files are truncated in steps of this size before unlink (default: 256)
+    DELETE_CHUNK_PAUSE  - Seconds to pause between truncate steps (default: 0.05)
+    DISK_AWARE_BATCH    - Set to "false" to ignore torrent sizes when picking a batch (default: true)
+    DISK_RESERVE_GB     - Free space to keep in DOWNLOAD_DIR, matching rtorrent's
+                          close_low_diskspace threshold (default: 15)
+    HASHCHECK_PER_DEVICE - Concurrent rtorrent rechecks allowed per physical disk (default: 1)
+    HASHCHECK_TIMEOUT   - Seconds a single recheck may run before it is given up on (default: 600)
+    HASHCHECK_POLL_INTERVAL - Seconds between recheck progress polls (default: 3)
+    HASHCHECK_START_GRACE - Seconds a recheck counts as running after d.check_hash, since
+                          rtorrent can report it idle for a moment (default: 2)
+    HASHCHECK_TOTAL_TIMEOUT - Seconds a rotation's rechecks may take in all, from the
+                          first one queued; any still queued or running then fail (default: 14400)
+    HASHCHECK_PATH_MAP  - "rtorrent_dir:local_dir" pairs (comma-separated) translating
+                          rtorrent's download paths to this container's, to group
+                          rechecks by disk. Unmapped paths that don't exist here count
+                          as DOWNLOAD_DIR's disk (default: none)
+    RPC_TIMEOUT         - Seconds before an rtorrent XML-RPC call is abandoned (default: 30)
+    RPC_MAX_ATTEMPTS    - Attempts per call for retryable faults, with jittered backoff (default: 4)
+    RPC_BREAKER_THRESHOLD - Consecutive RPC failures that pause all calls (default: 5)
+    RPC_BREAKER_COOLDOWN  - Seconds calls are paused once the breaker opens (default: 30)
+    RPC_BREAKER_MAX_WAIT  - Seconds of continuous outage before the run aborts (default: 1800)
+    ROTATION_ENGINE     - sync or async. async adds, preloads and rechecks the batch's torrents
+                          concurrently instead of one after another (default: sync)
+    PRELOAD_CONCURRENCY - File transfers the async engine runs at once (default: 2)
+    PRELOAD_TIMEOUT     - Seconds one file transfer may run before it is killed (default: 7200)
 
     Action Flags:
     FORCE_ROTATION      - Set to "true" to force rotation (default: false)
     DELETE_DATA         - Set to "true" to delete downloaded files on rotation (default: false)
     SHOW_STATUS         - Set to "true" to only show status (default: false)
+    STATUS_FORMAT       - text or json; json prints per-torrent progress, ratio and rates, the
+                          hash-check queue, preload results and the next rotation time as
+                          one JSON document. Passing --json implies SHOW_STATUS (default: text)
     REPRELOAD           - Set to "true" to re-run preload against the current batch (default: false)
+    PLAN_ROTATION       - Set to "true" to simulate the next rotation from recorded throughput and
+                          print its duration, peak disk usage and seeding gap without touching
+                          rtorrent or the preload sources (JSON with --json)
     FORCE_PRELOAD_TORRENT       - Substring (case-insensitive) identifying a single torrent to preload.
                                   Searches current_batch first, then all .torrent files. Use when a
                                   single torrent failed and needs to be re-staged without touching others.
     FORCE_PRELOAD_REMOTE_DIR    - Optional exact remote directory name to use instead of auto-matching.
                                   Useful when the Plex dir name doesn't match what the auto-matcher expects.
-    SORT_ORDER          - Order to cycle through torrents: alphabetical, reverse, random, date_added (default: alphabetical)
+    DAEMON              - Set to "true" to stay running and check for rotation every
+                          DAEMON_INTERVAL seconds instead of exiting (default: false)
+    SORT_ORDER          - Order to cycle through torrents: alphabetical, reverse, random, date_added,
+                          demand (highest recorded upload per GB first) (default: alphabetical)
     LOG_LEVEL           - Logging level: DEBUG, INFO, WARNING, ERROR (default: INFO)
 
     Preload Settings (optional):
@@ -42,6 +79,77 @@ Environment Variables:
     PRELOAD_USER        - SSH username for the remote machine
     PRELOAD_SSH_KEY     - Path to SSH private key inside the container (default: /keys/id_rsa)
     PRELOAD_REMOTE_DIR  - Directory on the remote machine to search for matching files
+    PRELOAD_SOURCES     - JSON list of preload sources, overriding the single PRELOAD_HOST source.
+                          Each entry: {"name", "transport", "host", "user", "ssh_key",
+                          "remote_dir", "cipher", "compression"}. Unset keys fall back to
+                          the PRELOAD_* values.
+    PRELOAD_TRANSPORT   - Default transfer backend: scp, rsync, tar, sftp, local (default: scp)
+    PRELOAD_SSH_CIPHER  - ssh cipher for transfers, e.g. aes128-gcm@openssh.com (default: ssh's own)
+    PRELOAD_SSH_COMPRESSION - Set to "true" to enable ssh compression for transfers (default: false)
+    PRELOAD_STRIPE      - Set to "true" to split a file across every source that has it (default: false)
+    PRELOAD_STRIPE_MIN_MB - Smallest file (MB) worth striping across sources (default: 1024)
+    PRELOAD_LISTING_TTL - Seconds to reuse a source's directory listing within a run (default: 300)
+    PRELOAD_DEDUP       - Hardlink files identical to one already staged for another torrent
+                          instead of fetching them again (default: true)
+    PRELOAD_MANIFEST_MAX_AGE - Seconds a source's VERIFY_LIBRARY manifest is trusted for matching
+                          instead of listing the source; 0 never reads it (default: 86400)
+
+    Library Verification (optional):
+    VERIFY_LIBRARY      - movies, tv or all (true = all): check Plex naming under PLEX_MEDIA_DIR,
+                          write .route23-manifest.json into each section for preload, and exit
+                          1 if anything is misnamed (JSON with --json)
+    PLEX_MEDIA_DIR      - Plex library root holding Movies/ and TV Shows/ (default: /mnt/plex/Media)
+    VERIFY_WORKERS      - Threads walking title directories in parallel (default: 8)
+    PROMOTE_TORRENT     - Substring (case-insensitive) of a finished torrent to hardlink into
+                          PLEX_MEDIA_DIR/Movies under Plex names. It keeps seeding, and later
+                          preloads of it fetch the promoted files directly
+    PROMOTE_AS          - Library directory for PROMOTE_TORRENT, 'Title (YEAR) {imdb-ttXXXXXXX}'
+                          (default: the torrent's name, which must already be one)
+    BACKUP_MEDIA_DIR    - Mirror of PLEX_MEDIA_DIR that promoted files are copied to (default: unset)
+    BACKUP_PROMOTED     - Set to "true" to copy every promoted title missing or changed in
+                          BACKUP_MEDIA_DIR and exit
+
+    Permissions (optional):
+    FIX_PERMISSIONS     - Directory whose owner and modes to normalize, then exit; only entries
+                          that differ are changed (JSON with --json)
+    PERM_OWNER          - user:group (names or ids) to chown to; unset leaves ownership alone
+    PERM_DIR_MODE       - Octal mode for directories (default: 755)
+    PERM_FILE_MODE      - Octal mode for files (default: 644)
+    PERM_WORKERS        - Threads walking directories in parallel (default: 8)
+    PERM_INCREMENTAL    - Only list directories whose mtime changed since the last run, as
+                          recorded in .route23-permissions.json in the directory (default: true)
+
+    Transfer Benchmark (optional):
+    BENCHMARK_TRANSFER  - Set to "true" to benchmark every backend on every preload source and exit
+    BENCH_SIZE_MB       - Size of the generated test file (default: 256)
+    BENCH_BACKENDS      - Comma-separated backends to try on SSH sources (default: scp,rsync,tar,sftp)
+    BENCH_CIPHERS       - Comma-separated ssh ciphers to try with each backend (default: source's cipher)
+
+    Metrics (optional):
+    METRICS_TEXTFILE    - Path to write Prometheus metrics for node_exporter's textfile
+                          collector, e.g. /metrics/route23.prom (default: disabled)
+    METRICS_PORT        - Port for daemon mode's HTTP server: Prometheus /metrics, JSON /status
+                          and the control API (default: disabled)
+    CONTROL_TOKEN       - Bearer token required by the control API's POST endpoints;
+                          unset disables them (default: unset)
+    CONTROL_STATUS_TTL  - Seconds /status serves a cached snapshot before refreshing (default: 5)
+    DAEMON_INTERVAL     - Seconds between rotation checks in daemon mode (default: 3600)
+    SAMPLE_INTERVAL     - Seconds between system samples taken while route23 runs; 0 disables (default: 10)
+    SAMPLE_FILE         - Ring buffer file for samples (default: route23_samples.bin next to STATE_FILE)
+    SAMPLE_CAPACITY     - Samples kept in the ring buffer before the oldest is overwritten (default: 8640)
+    SAMPLE_PEER_PORT    - rtorrent's incoming port, to count peer connections separately (default: all)
+    MONITOR             - Set to "true" to print live samples for MONITOR_DURATION seconds and exit
+    MONITOR_DURATION    - Seconds to sample in MONITOR mode; 0 runs until interrupted (default: 120)
+    MONITOR_HISTORY     - Set to "true" to print the samples stored in SAMPLE_FILE and exit
+    LIBRARY_REPORT      - Set to "true" to index TORRENT_DIR into route23_library.idx and print
+                          library totals, size distributions and duplicates (JSON with --json)
+    SCAN_WORKERS        - Processes used to parse .torrent files for LIBRARY_REPORT
+                          (default: 0, one per CPU)
+    PROFILE             - cpu, mem or both: profile the selected action and write route23_profile.*
+                          reports (pstats, per-phase text, collapsed stacks, allocations) next to
+                          STATE_FILE (default: off)
+    TRACE_FILE          - Path to append JSON-lines timing spans to; a Chrome trace of the
+                          latest run is written alongside as <name>.chrome.json (default: disabled)
 
     Notification Settings (optional):
     SMTP_SERVER         - Postfix hostname (default: route23-postfix)
@@ -49,25 +157,33 @@ Environment Variables:
     FROM_EMAIL          - Sender address (default: torrents@website.com)
     NOTIFY_EMAIL        - Recipient address for preload digest emails
     SERVER_NAME         - Server label shown in email headers (default: route23)
+    MAIL_SPOOL_MAX      - Most digests kept in route23_outbox/ while the relay is down;
+                          the oldest are dropped beyond this (default: 200)
+    MAIL_DRAIN_TIMEOUT  - Seconds a one-off run waits at exit for spooled mail to be sent
+                          before leaving it for the next run (default: 30)
 """
 
-import hashlib
+import contextvars
+import functools
+import fcntl
+import heapq
+import itertools
 import json
 import logging
 import os
 import random
 import re
-import shutil
-import smtplib
-import subprocess
+import stat
+import struct
+import sys
+import threading
 import time
-import xmlrpc.client
+from abc import ABC, abstractmethod
+from collections import Counter
+from contextlib import contextmanager
 from dataclasses import dataclass, field
 from datetime import datetime, timedelta
-from email.mime.multipart import MIMEMultipart
-from email.mime.text import MIMEText
 from pathlib import Path
-from urllib.parse import urlparse, urlunparse
 
 
 def _bdecode(data: bytes, idx: int = 0):
@@ -96,11 +212,79 @@ def _bdecode(data: bytes, idx: int = 0):
         return data[s : s + n], s + n
 
 
+def _bskip(data: bytes, idx: int) -> int:
+    """Return the offset just past the bencoded value at idx, without building it."""
+    b = data[idx]
+    if b == 0x64 or b == 0x6C:  # d, l
+        idx += 1
+        while data[idx] != 0x65:
+            idx = _bskip(data, idx)
+        return idx + 1
+    if b == 0x69:  # i
+        return data.index(b"e", idx + 1) + 1
+    colon = data.index(b":", idx)
+    return colon + 1 + int(data[idx:colon])
+
+
 def _bdecode_torrent(data: bytes) -> dict:
     result, _ = _bdecode(data, 0)
     return result
 
 
+def _info_dict_span(data: bytes) -> tuple[int, int]:
+    """Return the (start, end) byte offsets of the bencoded info dict."""
+    idx = 1
+    while data[idx : idx + 1] != b"e":
+        key, idx = _bdecode(data, idx)
+        start = idx
+        idx = _bskip(data, idx)
+        if key == b"info":
+            return start, idx
+    raise ValueError("torrent has no info dict")
+
+
+def torrent_info_hash(data: bytes) -> str:
+    """Return the BitTorrent v1 info hash (uppercase hex, as rtorrent reports it)."""
+    import hashlib
+
+    start, end = _info_dict_span(data)
+    return hashlib.sha1(data[start:end]).hexdigest().upper()
+
+
+def _content_keys(lengths: list[int], piece_length: int, pieces: bytes) -> list[str | None]:
+    """A key per file identifying its content across torrents, or None if it has no whole piece.
+
+    The key is the file's size, the piece length, where the first piece
+    lying entirely inside the file starts relative to it, and a SHA-1 of the
+    hashes of every such piece. Two files with the same key hold the same
+    data at the same piece alignment, whichever torrent they come from;
+    only the partial pieces at either end are unverified.
+    """
+    import hashlib
+
+    total = sum(lengths)
+    n_pieces = len(pieces) // 20
+    keys: list[str | None] = []
+    offset = 0
+    for length in lengths:
+        end = offset + length
+        if not piece_length:
+            keys.append(None)
+            continue
+        first = -(-offset // piece_length)
+        # The torrent's final piece may be short, so it counts if it ends here.
+        last = n_pieces - 1 if end >= total else end // piece_length - 1
+        if length and first <= last < n_pieces:
+            keys.append(
+                f"{length}:{piece_length}:{first * piece_length - offset}:"
+                + hashlib.sha1(pieces[first * 20 : last * 20 + 20]).hexdigest()
+            )
+        else:
+            keys.append(None)
+        offset = end
+    return keys
+
+
 def parse_torrent(torrent_path: str) -> dict:
     """Return torrent name and expected file list from a .torrent file."""
     with open(torrent_path, "rb") as f:
@@ -119,9 +303,48 @@ def parse_torrent(torrent_path: str) -> dict:
         ]
     else:
         files = [{"path": name, "length": info[b"length"]}]
+    keys = _content_keys(
+        [f["length"] for f in files], info.get(b"piece length", 0), info.get(b"pieces", b"")
+    )
+    for f, key in zip(files, keys):
+        f["content_key"] = key
     return {"name": name, "files": files, "multi_file": b"files" in info}
 
 
+def _scan_torrent(torrent_path: str) -> tuple | None:
+    """(name, total size, piece length, file count, raw info hash) for LibraryIndex.
+
+    Walks the info dict directly and skips the piece hashes, which are most
+    of a .torrent's bytes. Module-level so process pool workers can run it.
+    """
+    import hashlib
+
+    try:
+        with open(torrent_path, "rb") as f:
+            data = f.read()
+        start, end = _info_dict_span(data)
+        name, total, piece_length, file_count = b"", 0, 0, 1
+        idx = start + 1
+        while data[idx] != 0x65:
+            key, idx = _bdecode(data, idx)
+            if key == b"pieces":
+                idx = _bskip(data, idx)
+                continue
+            value, idx = _bdecode(data, idx)
+            if key == b"name":
+                name = value
+            elif key == b"length":
+                total = value
+            elif key == b"piece length":
+                piece_length = value
+            elif key == b"files":
+                total = sum(entry[b"length"] for entry in value)
+                file_count = len(value)
+        return name, total, piece_length, file_count, hashlib.sha1(data[start:end]).digest()
+    except (OSError, ValueError, KeyError, IndexError, TypeError):
+        return None
+
+
 def get_env(key: str, default: str = "") -> str:
     """Get environment variable with default."""
     return os.environ.get(key, default)
@@ -153,13 +376,53 @@ def get_env_float(key: str, default: float) -> float:
         return default
 
 
-def build_rtorrent_url() -> str:
+def get_env_json(key: str, default):
+    """Get JSON environment variable."""
+    value = os.environ.get(key, "")
+    if not value:
+        return default
+    try:
+        return json.loads(value)
+    except ValueError:
+        logging.getLogger(__name__).warning(f"{key} is not valid JSON, ignoring")
+        return default
+
+
+def build_preload_sources() -> list[dict]:
+    """Build the preload source list from PRELOAD_SOURCES or the single-host settings."""
+    sources = get_env_json("PRELOAD_SOURCES", [])
+    if isinstance(sources, list) and sources:
+        return [s for s in sources if isinstance(s, dict) and s.get("remote_dir")]
+
+    host = get_env("PRELOAD_HOST", "")
+    user = get_env("PRELOAD_USER", "")
+    remote_dir = get_env("PRELOAD_REMOTE_DIR", "")
+    if not (host and user and remote_dir):
+        return []
+    return [
+        {
+            "name": host,
+            "host": host,
+            "user": user,
+            "remote_dir": remote_dir,
+        }
+    ]
+
+
+def build_rtorrent_url(
+    base_url: str | None = None, user: str | None = None, password: str | None = None
+) -> str:
     """Build rtorrent URL with optional authentication."""
-    base_url = get_env("RTORRENT_URL", "http://localhost:8080/RPC2")
-    user = get_env("RTORRENT_USER")
-    password = get_env("RTORRENT_PASS")
+    if base_url is None:
+        base_url = get_env("RTORRENT_URL", "http://localhost:8080/RPC2")
+    if user is None:
+        user = get_env("RTORRENT_USER")
+    if password is None:
+        password = get_env("RTORRENT_PASS")
 
     if user and password:
+        from urllib.parse import urlparse, urlunparse
+
         parsed = urlparse(base_url)
         netloc = f"{user}:{password}@{parsed.hostname}"
         if parsed.port:
@@ -179,38 +442,176 @@ def build_rtorrent_url() -> str:
     return base_url
 
 
-CONFIG = {
-    "torrent_dir": get_env("TORRENT_DIR", "/torrents"),
-    "state_file": get_env("STATE_FILE", "/states/route23_state.json"),
-    "rtorrent_url": build_rtorrent_url(),
-    "batch_size": get_env_int("BATCH_SIZE", 20),
-    "rotation_days": get_env_int("ROTATION_DAYS", 14),
-    "sort_order": get_env("SORT_ORDER", "alphabetical").lower(),
-    "download_dir": get_env("DOWNLOAD_DIR", "/downloads/route23"),
-    "add_delay": get_env_float("ADD_DELAY", 30.0),
-    "remove_delay": get_env_float("REMOVE_DELAY", 5.0),
-    "max_load": get_env_float("MAX_LOAD", 4.0),
-    "load_wait": get_env_float("LOAD_WAIT", 30.0),
-    "startup_delay": get_env_float("STARTUP_DELAY", 10.0),
-    "preload_host": get_env("PRELOAD_HOST", ""),
-    "preload_user": get_env("PRELOAD_USER", ""),
-    "preload_ssh_key": get_env("PRELOAD_SSH_KEY", "/keys/id_rsa"),
-    "preload_remote_dir": get_env("PRELOAD_REMOTE_DIR", ""),
-    "smtp_server": get_env("SMTP_SERVER", "route23-postfix"),
-    "smtp_port": get_env_int("SMTP_PORT", 25),
-    "from_email": get_env("FROM_EMAIL", "torrents@website.com"),
-    "notify_email": get_env("NOTIFY_EMAIL", ""),
-    "server_name": get_env("SERVER_NAME", "route23"),
-}
+def build_rtorrent_instances() -> list[dict]:
+    """The rtorrent pool from RTORRENT_INSTANCES, or [] to use RTORRENT_URL alone.
+
+    Each entry is a URL or {"name", "url", "user", "pass", "weight"}; user and
+    pass default to RTORRENT_USER and RTORRENT_PASS.
+    """
+    specs = get_env_json("RTORRENT_INSTANCES", [])
+    if not isinstance(specs, list):
+        return []
+    instances = []
+    for i, spec in enumerate(specs, 1):
+        if isinstance(spec, str):
+            spec = {"url": spec}
+        if not isinstance(spec, dict) or not spec.get("url"):
+            continue
+        instances.append(
+            {
+                "name": str(spec.get("name") or f"rtorrent{i}"),
+                "url": build_rtorrent_url(spec["url"], spec.get("user"), spec.get("pass")),
+                "weight": float(spec.get("weight", 1.0)) or 1.0,
+            }
+        )
+    return instances
+
+
+def load_config() -> dict:
+    """Read the configuration from the environment.
+
+    Called from main() rather than at import time, so importing this module
+    (as bench.py does) costs nothing and callers can build their own.
+    """
+    return {
+        "torrent_dir": get_env("TORRENT_DIR", "/torrents"),
+        "state_file": get_env("STATE_FILE", "/states/route23_state.json"),
+        "rtorrent_url": build_rtorrent_url(),
+        "rtorrent_instances": build_rtorrent_instances(),
+        "batch_size": get_env_int("BATCH_SIZE", 20),
+        "rotation_days": get_env_int("ROTATION_DAYS", 14),
+        "sort_order": get_env("SORT_ORDER", "alphabetical").lower(),
+        "download_dir": get_env("DOWNLOAD_DIR", "/downloads/route23"),
+        "add_delay": get_env_float("ADD_DELAY", 30.0),
+        "remove_delay": get_env_float("REMOVE_DELAY", 5.0),
+        "max_load": get_env_float("MAX_LOAD", 4.0),
+        "load_wait": get_env_float("LOAD_WAIT", 30.0),
+        "startup_delay": get_env_float("STARTUP_DELAY", 10.0),
+        "background_delete": get_env_bool("BACKGROUND_DELETE", True),
+        "delete_chunk_mb": get_env_int("DELETE_CHUNK_MB", 256),
+        "delete_chunk_pause": get_env_float("DELETE_CHUNK_PAUSE", 0.05),
+        "disk_aware_batch": get_env_bool("DISK_AWARE_BATCH", True),
+        "disk_reserve_gb": get_env_float("DISK_RESERVE_GB", 15.0),
+        "hashcheck_per_device": get_env_int("HASHCHECK_PER_DEVICE", 1),
+        "hashcheck_timeout": get_env_float("HASHCHECK_TIMEOUT", 600.0),
+        "hashcheck_poll_interval": get_env_float("HASHCHECK_POLL_INTERVAL", 3.0),
+        "hashcheck_start_grace": get_env_float("HASHCHECK_START_GRACE", 2.0),
+        "hashcheck_total_timeout": get_env_float("HASHCHECK_TOTAL_TIMEOUT", 14400.0),
+        "hashcheck_path_map": [
+            tuple(pair.split(":", 1))
+            for pair in get_env("HASHCHECK_PATH_MAP", "").split(",")
+            if ":" in pair
+        ],
+        "rpc_timeout": get_env_float("RPC_TIMEOUT", 30.0),
+        "rpc_max_attempts": get_env_int("RPC_MAX_ATTEMPTS", 4),
+        "rpc_breaker_threshold": get_env_int("RPC_BREAKER_THRESHOLD", 5),
+        "rpc_breaker_cooldown": get_env_float("RPC_BREAKER_COOLDOWN", 30.0),
+        "rpc_breaker_max_wait": get_env_float("RPC_BREAKER_MAX_WAIT", 1800.0),
+        "rotation_engine": get_env("ROTATION_ENGINE", "sync").lower(),
+        "preload_concurrency": get_env_int("PRELOAD_CONCURRENCY", 2),
+        "preload_timeout": get_env_float("PRELOAD_TIMEOUT", 7200.0),
+        "preload_host": get_env("PRELOAD_HOST", ""),
+        "preload_user": get_env("PRELOAD_USER", ""),
+        "preload_ssh_key": get_env("PRELOAD_SSH_KEY", "/keys/id_rsa"),
+        "preload_remote_dir": get_env("PRELOAD_REMOTE_DIR", ""),
+        "preload_sources": build_preload_sources(),
+        "preload_transport": get_env("PRELOAD_TRANSPORT", "scp").lower(),
+        "preload_ssh_cipher": get_env("PRELOAD_SSH_CIPHER", ""),
+        "preload_ssh_compression": get_env_bool("PRELOAD_SSH_COMPRESSION", False),
+        "preload_stripe": get_env_bool("PRELOAD_STRIPE", False),
+        "preload_stripe_min_mb": get_env_int("PRELOAD_STRIPE_MIN_MB", 1024),
+        "preload_listing_ttl": get_env_float("PRELOAD_LISTING_TTL", 300.0),
+        "preload_dedup": get_env_bool("PRELOAD_DEDUP", True),
+        "preload_manifest_max_age": get_env_float("PRELOAD_MANIFEST_MAX_AGE", 86400.0),
+        "plex_media_dir": get_env("PLEX_MEDIA_DIR", "/mnt/plex/Media"),
+        "verify_workers": get_env_int("VERIFY_WORKERS", 8),
+        "backup_media_dir": get_env("BACKUP_MEDIA_DIR", ""),
+        "perm_owner": get_env("PERM_OWNER", ""),
+        "perm_dir_mode": get_env("PERM_DIR_MODE", "755"),
+        "perm_file_mode": get_env("PERM_FILE_MODE", "644"),
+        "perm_workers": get_env_int("PERM_WORKERS", 8),
+        "perm_incremental": get_env_bool("PERM_INCREMENTAL", True),
+        "metrics_textfile": get_env("METRICS_TEXTFILE", ""),
+        "metrics_port": get_env_int("METRICS_PORT", 0),
+        "control_token": get_env("CONTROL_TOKEN", ""),
+        "control_status_ttl": get_env_float("CONTROL_STATUS_TTL", 5.0),
+        "daemon_interval": get_env_float("DAEMON_INTERVAL", 3600.0),
+        "trace_file": get_env("TRACE_FILE", ""),
+        "scan_workers": get_env_int("SCAN_WORKERS", 0),
+        "sample_interval": get_env_float("SAMPLE_INTERVAL", 10.0),
+        "sample_file": get_env("SAMPLE_FILE", ""),
+        "sample_capacity": get_env_int("SAMPLE_CAPACITY", 8640),
+        "sample_peer_port": get_env_int("SAMPLE_PEER_PORT", 0),
+        "monitor_duration": get_env_float("MONITOR_DURATION", 120.0),
+        "profile": get_env("PROFILE", "").lower(),
+        "bench_size_mb": get_env_int("BENCH_SIZE_MB", 256),
+        "bench_backends": get_env("BENCH_BACKENDS", "scp,rsync,tar,sftp"),
+        "bench_ciphers": get_env("BENCH_CIPHERS", ""),
+        "smtp_server": get_env("SMTP_SERVER", "route23-postfix"),
+        "smtp_port": get_env_int("SMTP_PORT", 25),
+        "from_email": get_env("FROM_EMAIL", "torrents@website.com"),
+        "notify_email": get_env("NOTIFY_EMAIL", ""),
+        "server_name": get_env("SERVER_NAME", "route23"),
+        "mail_spool_max": get_env_int("MAIL_SPOOL_MAX", 200),
+        "mail_drain_timeout": get_env_float("MAIL_DRAIN_TIMEOUT", 30.0),
+    }
+
+
+def _mask_url(url: str) -> str:
+    """url with any password replaced by ****."""
+    from urllib.parse import urlparse, urlunparse
+
+    parsed = urlparse(url)
+    if not parsed.password:
+        return url
+    masked_netloc = f"{parsed.username}:****@{parsed.hostname}"
+    if parsed.port:
+        masked_netloc += f":{parsed.port}"
+    return urlunparse(
+        (
+            parsed.scheme,
+            masked_netloc,
+            parsed.path,
+            parsed.params,
+            parsed.query,
+            parsed.fragment,
+        )
+    )
+
+
+def describe_config(config: dict) -> str:
+    """Config as indented JSON for the log, with rtorrent passwords and the control token masked."""
+    safe_config = config.copy()
+    safe_config["rtorrent_url"] = _mask_url(config["rtorrent_url"])
+    safe_config["rtorrent_instances"] = [
+        dict(spec, url=_mask_url(spec["url"])) for spec in config.get("rtorrent_instances", [])
+    ]
+    if config.get("control_token"):
+        safe_config["control_token"] = "****"
+    return json.dumps(safe_config, indent=2)
 
 
 FORCE_ROTATION = get_env_bool("FORCE_ROTATION", False)
 DELETE_DATA = get_env_bool("DELETE_DATA", False)
 SHOW_STATUS = get_env_bool("SHOW_STATUS", False)
+STATUS_FORMAT = (
+    "json" if "--json" in sys.argv[1:] else get_env("STATUS_FORMAT", "text").lower()
+)
 PRELOAD_ENABLED = get_env_bool("PRELOAD_ENABLED", False)
 REPRELOAD = get_env_bool("REPRELOAD", False)
 FORCE_PRELOAD_TORRENT = get_env("FORCE_PRELOAD_TORRENT", "")
 FORCE_PRELOAD_REMOTE_DIR = get_env("FORCE_PRELOAD_REMOTE_DIR", "")
+BENCHMARK_TRANSFER = get_env_bool("BENCHMARK_TRANSFER", False)
+DAEMON = get_env_bool("DAEMON", False)
+MONITOR = get_env_bool("MONITOR", False)
+MONITOR_HISTORY = get_env_bool("MONITOR_HISTORY", False)
+LIBRARY_REPORT = get_env_bool("LIBRARY_REPORT", False)
+PLAN_ROTATION = get_env_bool("PLAN_ROTATION", False)
+VERIFY_LIBRARY = get_env("VERIFY_LIBRARY", "").lower()
+PROMOTE_TORRENT = get_env("PROMOTE_TORRENT", "")
+PROMOTE_AS = get_env("PROMOTE_AS", "")
+BACKUP_PROMOTED = get_env_bool("BACKUP_PROMOTED", False)
+FIX_PERMISSIONS = get_env("FIX_PERMISSIONS", "")
 
 
 log_level = get_env("LOG_LEVEL", "INFO").upper()
@@ -231,6 +632,357 @@ def _format_size(size_bytes: int) -> str:
     return f"{size:.2f} {units[idx]}"
 
 
+class MetricsRegistry:
+    """Minimal Prometheus registry: labelled counters, gauges and histograms.
+
+    Rendered in the text exposition format, either to a file for
+    node_exporter's textfile collector or over HTTP from daemon mode.
+    """
+
+    DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+
+    DEFINITIONS = {
+        "route23_phase_duration_seconds": (
+            "histogram",
+            "Duration of each rotation phase",
+            (1, 5, 15, 30, 60, 120, 300, 600, 1800, 3600, 7200, 14400),
+        ),
+        "route23_rpc_calls_total": ("counter", "rtorrent XML-RPC calls by method", None),
+        "route23_rpc_latency_seconds": (
+            "histogram",
+            "rtorrent XML-RPC call latency by method",
+            DEFAULT_BUCKETS,
+        ),
+        "route23_rpc_errors_total": ("counter", "Failed rtorrent calls by fault class", None),
+        "route23_rpc_retries_total": ("counter", "rtorrent call retries by fault class", None),
+        "route23_rpc_breaker_opens_total": ("counter", "Times the RPC circuit breaker opened", None),
+        "route23_load_wait_seconds_total": (
+            "counter",
+            "Time spent in wait_for_low_load waiting for system load to drop",
+            None,
+        ),
+        "route23_throttle_sleep_seconds_total": (
+            "counter",
+            "Time spent in throttled_sleep by reason",
+            None,
+        ),
+        "route23_preload_bytes_total": ("counter", "Bytes staged by preload per source", None),
+        "route23_preload_throughput_bytes": (
+            "gauge",
+            "Running average preload throughput per source in bytes/second",
+            None,
+        ),
+        "route23_preload_results_total": ("counter", "Preload attempts by result", None),
+        "route23_preload_dedup_bytes_total": (
+            "counter",
+            "Bytes hardlinked from another torrent's staged copy instead of fetched",
+            None,
+        ),
+        "route23_hashcheck_duration_seconds": (
+            "histogram",
+            "Time from starting an rtorrent recheck to its completion",
+            (5, 15, 30, 60, 120, 300, 600, 1200),
+        ),
+        "route23_deleted_bytes_total": ("counter", "Bytes reclaimed by background deletion", None),
+        "route23_batch_torrents": ("gauge", "Torrents in the current batch", None),
+        "route23_pending_deletions": ("gauge", "Removed torrents still queued for deletion", None),
+        "route23_spooled_mail": ("gauge", "Digest emails waiting in the outbox", None),
+        "route23_last_rotation_timestamp_seconds": (
+            "gauge",
+            "Unix time the current batch was started",
+            None,
+        ),
+    }
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._values: dict[str, dict[tuple, float]] = {}
+        self._histograms: dict[str, dict[tuple, list]] = {}
+
+    @staticmethod
+    def _key(labels: dict | None) -> tuple:
+        return tuple(sorted((labels or {}).items()))
+
+    def inc(self, name: str, amount: float = 1.0, **labels):
+        with self._lock:
+            series = self._values.setdefault(name, {})
+            key = self._key(labels)
+            series[key] = series.get(key, 0.0) + amount
+
+    def set(self, name: str, value: float, **labels):
+        with self._lock:
+            self._values.setdefault(name, {})[self._key(labels)] = value
+
+    def observe(self, name: str, value: float, **labels):
+        buckets = self.DEFINITIONS[name][2]
+        with self._lock:
+            series = self._histograms.setdefault(name, {})
+            key = self._key(labels)
+            if key not in series:
+                series[key] = [[0] * len(buckets), 0, 0.0]
+            counts, _, _ = entry = series[key]
+            for i, bound in enumerate(buckets):
+                if value <= bound:
+                    counts[i] += 1
+            entry[1] += 1
+            entry[2] += value
+
+    def totals(self, name: str) -> tuple[int, float]:
+        """(count, sum) of a histogram's observations across all its labels."""
+        with self._lock:
+            series = self._histograms.get(name, {}).values()
+            return sum(e[1] for e in series), sum(e[2] for e in series)
+
+    @contextmanager
+    def timer(self, name: str, **labels):
+        start = time.monotonic()
+        try:
+            yield
+        finally:
+            self.observe(name, time.monotonic() - start, **labels)
+
+    @staticmethod
+    def _labels(key: tuple, extra: tuple = ()) -> str:
+        pairs = list(key) + list(extra)
+        if not pairs:
+            return ""
+        escaped = (
+            (k, str(v).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n"))
+            for k, v in pairs
+        )
+        return "{" + ",".join(f'{k}="{v}"' for k, v in escaped) + "}"
+
+    def render(self) -> str:
+        lines = []
+        with self._lock:
+            for name, (kind, help_text, buckets) in self.DEFINITIONS.items():
+                if name not in self._values and name not in self._histograms:
+                    continue
+                lines.append(f"# HELP {name} {help_text}")
+                lines.append(f"# TYPE {name} {kind}")
+                if kind == "histogram":
+                    for key, (counts, count, total) in self._histograms[name].items():
+                        for bound, n in zip(buckets, counts):
+                            lines.append(
+                                f"{name}_bucket{self._labels(key, (('le', bound),))} {n}"
+                            )
+                        lines.append(
+                            f"{name}_bucket{self._labels(key, (('le', '+Inf'),))} {count}"
+                        )
+                        lines.append(f"{name}_count{self._labels(key)} {count}")
+                        lines.append(f"{name}_sum{self._labels(key)} {total}")
+                else:
+                    for key, value in self._values[name].items():
+                        lines.append(f"{name}{self._labels(key)} {value}")
+        return "\n".join(lines) + "\n"
+
+    def write_textfile(self, path: str):
+        """Write metrics atomically so the textfile collector never sees a partial file."""
+        if not path:
+            return
+        target = Path(path)
+        try:
+            target.parent.mkdir(parents=True, exist_ok=True)
+            tmp = target.with_name(f".{target.name}.tmp")
+            tmp.write_text(self.render())
+            os.replace(tmp, target)
+        except OSError as e:
+            logger.warning(f"Could not write metrics to {path}: {e}")
+
+
+METRICS = MetricsRegistry()
+
+
+class Tracer:
+    """Nested timing spans showing where a run spends its time.
+
+    Spans nest per thread; work handed to a pool can name its parent
+    explicitly. Every finished span counts toward the end-of-run summary of
+    top time sinks (by self time, so a phase isn't charged for the calls
+    inside it). With TRACE_FILE set, spans are also appended to it as JSON
+    lines, and export_chrome() writes the run in Chrome trace-event format
+    for chrome://tracing or ui.perfetto.dev.
+    """
+
+    MAX_SPANS = 100_000
+
+    def __init__(self):
+        self.path: Path | None = None
+        self.trace_id = f"{os.getpid():x}{int(time.time()):x}"
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._ids = itertools.count(1)
+        self._file = None
+        self._spans: list[dict] = []
+        self._totals: dict[str, list] = {}
+        # Span starts are monotonic; this maps them onto wall-clock time.
+        self._wall_offset = time.time() - time.monotonic()
+
+    def configure(self, path: str):
+        """Start appending finished spans to path as JSON lines."""
+        if not path:
+            return
+        self.path = Path(path)
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self._file = open(self.path, "a", buffering=1)
+        except OSError as e:
+            logger.warning(f"Could not open trace file {path}: {e}")
+            self.path = None
+
+    def _stack(self) -> list[dict]:
+        stack = getattr(self._local, "stack", None)
+        if stack is None:
+            stack = self._local.stack = []
+        return stack
+
+    def current(self) -> dict | None:
+        """The innermost open span on this thread, to pass as a pool worker's parent."""
+        stack = self._stack()
+        return stack[-1] if stack else None
+
+    @contextmanager
+    def span(self, name: str, parent: dict | None = None, **attrs):
+        stack = self._stack()
+        if parent is None and stack:
+            parent = stack[-1]
+        span = {
+            "id": next(self._ids),
+            "parent": parent,
+            "name": name,
+            "thread": threading.current_thread().name,
+            "start": time.monotonic(),
+            "child_time": 0.0,
+            "attrs": attrs,
+        }
+        stack.append(span)
+        try:
+            yield span
+        except BaseException as e:
+            span["attrs"]["error"] = type(e).__name__
+            raise
+        finally:
+            stack.pop()
+            span["duration"] = time.monotonic() - span["start"]
+            self._record(span)
+
+    def annotate(self, **attrs):
+        """Attach attributes (e.g. bytes=...) to the innermost open span."""
+        span = self.current()
+        if span is not None:
+            span["attrs"].update(attrs)
+
+    def traced(self, name: str | None = None):
+        """Decorator form of span() for wrapping a whole method."""
+
+        def decorate(fn):
+            span_name = name or fn.__name__
+
+            @functools.wraps(fn)
+            def wrapper(*args, **kwargs):
+                with self.span(span_name):
+                    return fn(*args, **kwargs)
+
+            return wrapper
+
+        return decorate
+
+    def _record(self, span: dict):
+        parent = span["parent"]
+        with self._lock:
+            if parent is not None:
+                parent["child_time"] += span["duration"]
+            totals = self._totals.setdefault(span["name"], [0, 0.0, 0.0])
+            totals[0] += 1
+            totals[1] += span["duration"]
+            totals[2] += max(0.0, span["duration"] - span["child_time"])
+            if len(self._spans) < self.MAX_SPANS:
+                self._spans.append(span)
+            if self._file:
+                record = {
+                    "trace": self.trace_id,
+                    "span": span["id"],
+                    "parent": parent["id"] if parent else None,
+                    "name": span["name"],
+                    "thread": span["thread"],
+                    "start": round(span["start"] + self._wall_offset, 6),
+                    "duration": round(span["duration"], 6),
+                    **span["attrs"],
+                }
+                try:
+                    self._file.write(json.dumps(record, default=str) + "\n")
+                except OSError as e:
+                    logger.warning(f"Could not write trace: {e}")
+                    self._file = None
+
+    def top_sinks(self, limit: int = 8) -> list[tuple[str, int, float, float]]:
+        """[(name, count, total_s, self_s)] ordered by self time."""
+        with self._lock:
+            rows = [(name, *t) for name, t in self._totals.items()]
+        return sorted(rows, key=lambda r: r[3], reverse=True)[:limit]
+
+    def log_summary(self, limit: int = 8):
+        rows = self.top_sinks(limit)
+        if not rows:
+            return
+        logger.info("Top time sinks (self time):")
+        for name, count, total, self_time in rows:
+            logger.info(
+                f"  {name:<28} {self_time:>9.1f}s self {total:>9.1f}s total  x{count}"
+            )
+
+    def export_chrome(self) -> Path | None:
+        """Write this run's spans next to TRACE_FILE in Chrome trace-event format."""
+        if not self.path:
+            return None
+        with self._lock:
+            spans = list(self._spans)
+        threads: dict[str, int] = {}
+        events = []
+        for span in spans:
+            tid = threads.setdefault(span["thread"], len(threads) + 1)
+            events.append(
+                {
+                    "name": span["name"],
+                    "ph": "X",
+                    "ts": int((span["start"] + self._wall_offset) * 1e6),
+                    "dur": int(span["duration"] * 1e6),
+                    "pid": os.getpid(),
+                    "tid": tid,
+                    "args": span["attrs"],
+                }
+            )
+        for thread_name, tid in threads.items():
+            events.append(
+                {
+                    "name": "thread_name",
+                    "ph": "M",
+                    "pid": os.getpid(),
+                    "tid": tid,
+                    "args": {"name": thread_name},
+                }
+            )
+        out = self.path.with_suffix(".chrome.json")
+        try:
+            tmp = out.with_suffix(".tmp")
+            with open(tmp, "w") as f:
+                json.dump({"traceEvents": events}, f, default=str)
+            os.replace(tmp, out)
+        except OSError as e:
+            logger.warning(f"Could not write Chrome trace: {e}")
+            return None
+        return out
+
+    def reset(self):
+        """Forget finished spans so the next summary covers only the next run."""
+        with self._lock:
+            self._spans = []
+            self._totals = {}
+
+
+TRACER = Tracer()
+
+
 @dataclass
 class PreloadResult:
     torrent_name: str
@@ -243,8 +995,541 @@ class PreloadResult:
         return sum(f["size"] for f in self.staged_files)
 
 
+class TransferBackend(ABC):
+    """Copies one whole file from a preload source into the download directory."""
+
+    name = ""
+
+    @abstractmethod
+    def fetch(
+        self, source: "PreloadSource", remote_file: str, dest: Path
+    ) -> tuple[bool, str]:
+        """Copy remote_file to dest. Returns (ok, error)."""
+
+    @abstractmethod
+    async def fetch_async(
+        self, source: "PreloadSource", remote_file: str, dest: Path
+    ) -> tuple[bool, str]:
+        """fetch() on the event loop; cancelling it stops the transfer."""
+
+
+class PipelineBackend(TransferBackend):
+    """A transfer run as a pipeline of external commands.
+
+    Subclasses describe the transfer as a pipeline of argv lists. If
+    writes_stdout is set, the last command's stdout is written to dest;
+    otherwise the last command writes dest itself.
+    """
+
+    writes_stdout = False
+
+    @abstractmethod
+    def pipeline(
+        self, source: "PreloadSource", remote_file: str, dest: Path
+    ) -> list[list[str]]:
+        """The argv of each command in the transfer, upstream first."""
+
+    @staticmethod
+    def _kill_all(procs: list) -> None:
+        """Kill every process still running in the pipeline, then reap them all."""
+        for proc in procs:
+            if proc.poll() is None:
+                try:
+                    proc.kill()
+                except ProcessLookupError:
+                    pass
+        for proc in procs:
+            proc.communicate()
+
+    def fetch(
+        self, source: "PreloadSource", remote_file: str, dest: Path
+    ) -> tuple[bool, str]:
+        import subprocess
+
+        commands = self.pipeline(source, remote_file, dest)
+        out = open(dest, "wb") if self.writes_stdout else None
+        procs: list[subprocess.Popen] = []
+        try:
+            stdin = None
+            for i, argv in enumerate(commands):
+                last = i == len(commands) - 1
+                if last:
+                    stdout = out if out else subprocess.DEVNULL
+                else:
+                    stdout = subprocess.PIPE
+                proc = subprocess.Popen(
+                    argv,
+                    stdin=stdin,
+                    stdout=stdout,
+                    stderr=subprocess.PIPE,
+                )
+                if procs:
+                    # Only the downstream process should hold the pipe open.
+                    procs[-1].stdout.close()
+                    procs[-1].stdout = None
+                stdin = proc.stdout
+                procs.append(proc)
+
+            # One deadline for the whole pipeline, not one timeout per process.
+            deadline = time.monotonic() + source.timeout
+            errors = []
+            for proc in reversed(procs):
+                _, stderr = proc.communicate(
+                    timeout=max(0.0, deadline - time.monotonic())
+                )
+                if proc.returncode != 0:
+                    errors.append(
+                        f"{Path(proc.args[0]).name} exited {proc.returncode}: "
+                        f"{stderr.decode(errors='replace').strip()}"
+                    )
+        except subprocess.TimeoutExpired:
+            self._kill_all(procs)
+            return False, f"{self.name} failed: timed out after {source.timeout:.0f}s"
+        except OSError as e:
+            self._kill_all(procs)
+            return False, f"{self.name} failed: {e}"
+        finally:
+            if out:
+                out.close()
+
+        if errors:
+            return False, f"{self.name} failed: {'; '.join(errors)}"
+        return True, ""
+
+    async def fetch_async(
+        self, source: "PreloadSource", remote_file: str, dest: Path
+    ) -> tuple[bool, str]:
+        """fetch() on the event loop. Cancelling it kills the transfer processes."""
+        import asyncio
+        import subprocess
+
+        commands = self.pipeline(source, remote_file, dest)
+        out = open(dest, "wb") if self.writes_stdout else None
+        procs: list[asyncio.subprocess.Process] = []
+        parent_fds: list[int] = []
+
+        async def kill_all():
+            for proc in procs:
+                if proc.returncode is None:
+                    try:
+                        proc.kill()
+                    except ProcessLookupError:
+                        pass
+            # Reap them before the loop closes.
+            await asyncio.gather(
+                *(proc.wait() for proc in procs), return_exceptions=True
+            )
+
+        try:
+            stdin = None
+            for i, argv in enumerate(commands):
+                if i == len(commands) - 1:
+                    stdout = out if out else subprocess.DEVNULL
+                    next_stdin = None
+                else:
+                    next_stdin, stdout = os.pipe()
+                    parent_fds += [next_stdin, stdout]
+                procs.append(
+                    await asyncio.create_subprocess_exec(
+                        *argv,
+                        stdin=stdin,
+                        stdout=stdout,
+                        stderr=subprocess.PIPE,
+                    )
+                )
+                # Only the child processes should hold the pipe open.
+                for fd in (stdin, stdout):
+                    if fd in parent_fds:
+                        os.close(fd)
+                        parent_fds.remove(fd)
+                stdin = next_stdin
+
+            async with asyncio.timeout(source.timeout):
+                outputs = await asyncio.gather(
+                    *(proc.communicate() for proc in procs)
+                )
+        except TimeoutError:
+            await kill_all()
+            return False, f"{self.name} failed: timed out after {source.timeout:.0f}s"
+        except OSError as e:
+            await kill_all()
+            return False, f"{self.name} failed: {e}"
+        except asyncio.CancelledError:
+            await kill_all()
+            raise
+        finally:
+            for fd in parent_fds:
+                os.close(fd)
+            if out:
+                out.close()
+
+        errors = [
+            f"{Path(argv[0]).name} exited {proc.returncode}: "
+            f"{stderr.decode(errors='replace').strip()}"
+            for argv, proc, (_, stderr) in reversed(list(zip(commands, procs, outputs)))
+            if proc.returncode != 0
+        ]
+        if errors:
+            return False, f"{self.name} failed: {'; '.join(errors)}"
+        return True, ""
+
+
+class ScpBackend(PipelineBackend):
+    name = "scp"
+
+    def pipeline(self, source, remote_file, dest):
+        return [
+            [
+                "scp",
+                *source.ssh_options(transfer=True),
+                f"{source.user}@{source.host}:{remote_file}",
+                str(dest),
+            ]
+        ]
+
+
+class RsyncBackend(PipelineBackend):
+    """rsync over ssh; --inplace keeps a partially copied file resumable."""
+
+    name = "rsync"
+
+    def pipeline(self, source, remote_file, dest):
+        import shlex
+
+        ssh = shlex.join(["ssh", *source.ssh_options(transfer=True)])
+        return [
+            [
+                "rsync",
+                "--inplace",
+                "--partial",
+                "--whole-file",
+                "-e",
+                ssh,
+                f"{source.user}@{source.host}:{remote_file}",
+                str(dest),
+            ]
+        ]
+
+
+class TarStreamBackend(PipelineBackend):
+    """Streams the file inside a tar archive over a plain ssh channel."""
+
+    name = "tar"
+    writes_stdout = True
+
+    def pipeline(self, source, remote_file, dest):
+        import shlex
+
+        parent, fname = os.path.split(remote_file)
+        remote_cmd = f"tar -C {shlex.quote(parent)} -cf - {shlex.quote(fname)}"
+        return [
+            [
+                "ssh",
+                *source.ssh_options(transfer=True),
+                f"{source.user}@{source.host}",
+                remote_cmd,
+            ],
+            ["tar", "-xOf", "-"],
+        ]
+
+
+class SftpBackend(PipelineBackend):
+    name = "sftp"
+
+    def pipeline(self, source, remote_file, dest):
+        return [
+            [
+                "sftp",
+                "-q",
+                *source.ssh_options(transfer=True),
+                f"{source.user}@{source.host}:{remote_file}",
+                str(dest),
+            ]
+        ]
+
+
+class LocalBackend(TransferBackend):
+    """Plain file copy for sources mounted into the container."""
+
+    name = "local"
+
+    def fetch(self, source, remote_file, dest):
+        import shutil
+
+        try:
+            shutil.copyfile(remote_file, dest)
+            return True, ""
+        except OSError as e:
+            return False, str(e)
+
+    async def fetch_async(self, source, remote_file, dest):
+        import asyncio
+
+        return await asyncio.to_thread(self.fetch, source, remote_file, dest)
+
+
+TRANSFER_BACKENDS: dict[str, type[TransferBackend]] = {
+    backend.name: backend
+    for backend in (
+        ScpBackend,
+        RsyncBackend,
+        TarStreamBackend,
+        SftpBackend,
+        LocalBackend,
+    )
+}
+
+
+class PreloadSource:
+    """One location preload can copy from: a host over SSH or a locally mounted path."""
+
+    UNAVAILABLE_COOLDOWN = 300
+
+    def __init__(self, spec: dict, config: dict):
+        transport = spec.get(
+            "transport", config.get("preload_transport", "scp")
+        ).lower()
+        if transport == "ssh":
+            transport = "scp"
+        if transport not in TRANSFER_BACKENDS:
+            logger.warning(
+                f"Preload: unknown transport '{transport}', falling back to scp"
+            )
+            transport = "scp"
+        self.transport = transport
+        self.backend = TRANSFER_BACKENDS[transport]()
+        self.cipher = spec.get("cipher", config.get("preload_ssh_cipher", ""))
+        self.compression = spec.get(
+            "compression", config.get("preload_ssh_compression", False)
+        )
+        self.host = spec.get("host", config.get("preload_host", ""))
+        self.user = spec.get("user", config.get("preload_user", ""))
+        self.key = spec.get("ssh_key", config.get("preload_ssh_key", ""))
+        self.remote_dir = spec["remote_dir"].rstrip("/") or "/"
+        self.name = spec.get("name") or self.host or self.remote_dir
+        self.timeout = config.get("preload_timeout", 7200.0)
+        self._unavailable_until = 0.0
+
+    @property
+    def is_local(self) -> bool:
+        return self.transport == "local"
+
+    @property
+    def label(self) -> str:
+        if self.is_local:
+            return f"{self.name} ({self.remote_dir})"
+        return f"{self.name} ({self.user}@{self.host}:{self.remote_dir})"
+
+    @property
+    def available(self) -> bool:
+        return time.time() >= self._unavailable_until
+
+    def mark_unavailable(self, reason: str):
+        self._unavailable_until = time.time() + self.UNAVAILABLE_COOLDOWN
+        logger.warning(
+            f"Preload: source '{self.name}' unavailable ({reason}) — "
+            f"skipping it for {self.UNAVAILABLE_COOLDOWN}s"
+        )
+
+    def ssh_options(self, transfer: bool = False) -> list[str]:
+        """Options shared by ssh, scp and sftp. Transfers also get cipher/compression."""
+        options = [
+            "-i",
+            self.key,
+            "-o",
+            "StrictHostKeyChecking=no",
+            "-o",
+            "BatchMode=yes",
+        ]
+        if transfer:
+            if self.cipher:
+                options += ["-c", self.cipher]
+            options += [
+                "-o",
+                f"Compression={'yes' if self.compression else 'no'}",
+            ]
+        return options
+
+    def _ssh(self, cmd: str, timeout: int = 30) -> tuple[bool, str]:
+        import subprocess
+
+        try:
+            result = subprocess.run(
+                ["ssh", *self.ssh_options(), f"{self.user}@{self.host}", cmd],
+                capture_output=True,
+                text=True,
+                timeout=timeout,
+            )
+        except subprocess.TimeoutExpired:
+            return False, ""
+        return result.returncode == 0, result.stdout.strip()
+
+    def list_dirnames(self) -> list[str] | None:
+        """Return the entries of remote_dir, or None if the source can't be reached."""
+        if self.is_local:
+            try:
+                return sorted(os.listdir(self.remote_dir))
+            except OSError:
+                return None
+        ok, output = self._ssh(f'ls -1 "{self.remote_dir}"')
+        if not ok:
+            return None
+        return output.splitlines()
+
+    def find_video_files(
+        self, dirname: str, extensions: set[str]
+    ) -> list[tuple[int, str]]:
+        """Return (size_bytes, path) for every video file below remote_dir/dirname."""
+        remote_path = f"{self.remote_dir}/{dirname}"
+        if self.is_local:
+            found = []
+            for root, _, files in os.walk(remote_path):
+                for fname in files:
+                    if Path(fname).suffix.lower() not in extensions:
+                        continue
+                    path = os.path.join(root, fname)
+                    try:
+                        found.append((os.path.getsize(path), path))
+                    except OSError:
+                        continue
+            return found
+
+        ext_pattern = "|".join(re.escape(e.lstrip(".")) for e in extensions)
+        cmd = (
+            f'find "{remote_path}" -type f -printf "%s\\t%p\\n"'
+            f' | grep -Ei "\\.({ext_pattern})$"'
+        )
+        ok, output = self._ssh(cmd, timeout=15)
+        if not ok or not output:
+            return []
+
+        found = []
+        for line in output.splitlines():
+            parts = line.split("\t", 1)
+            if len(parts) != 2:
+                continue
+            try:
+                found.append((int(parts[0]), parts[1]))
+            except ValueError:
+                continue
+        return found
+
+    def read_manifest(self, max_age: float) -> dict | None:
+        """Entries of the library manifest in remote_dir, or None if it is missing or stale.
+
+        The manifest is written by VERIFY_LIBRARY; see PlexLibraryVerifier.
+        """
+        path = f"{self.remote_dir}/{PlexLibraryVerifier.MANIFEST_NAME}"
+        if self.is_local:
+            try:
+                with open(path) as f:
+                    text = f.read()
+            except OSError:
+                return None
+        else:
+            ok, text = self._ssh(f'cat "{path}"')
+            if not ok:
+                return None
+        try:
+            manifest = json.loads(text)
+        except ValueError:
+            logger.warning(f"Preload: ignoring unreadable manifest on '{self.name}'")
+            return None
+        if manifest.get("version") != PlexLibraryVerifier.MANIFEST_VERSION:
+            return None
+        age = time.time() - manifest.get("generated_ts", 0)
+        if age > max_age:
+            logger.info(
+                f"Preload: manifest on '{self.name}' is {_format_duration(age)} old "
+                f"— listing the directory instead"
+            )
+            return None
+        return manifest.get("entries") or None
+
+    def fetch(self, remote_file: str, dest: Path) -> tuple[bool, str]:
+        """Copy a whole file to dest with this source's backend. Returns (ok, error)."""
+        return self.backend.fetch(self, remote_file, dest)
+
+    async def fetch_async(self, remote_file: str, dest: Path) -> tuple[bool, str]:
+        """fetch() for the async engine; runs the backend's processes on the event loop."""
+        return await self.backend.fetch_async(self, remote_file, dest)
+
+    def fetch_range(
+        self, remote_file: str, dest: Path, offset: int, length: int
+    ) -> tuple[bool, str]:
+        """Copy bytes [offset, offset + length) of a file into the same range of dest."""
+        chunk = 1024 * 1024
+        fd = os.open(dest, os.O_WRONLY)
+        try:
+            if self.is_local:
+                with open(remote_file, "rb") as src:
+                    src.seek(offset)
+                    pos, remaining = offset, length
+                    while remaining > 0:
+                        data = src.read(min(chunk, remaining))
+                        if not data:
+                            break
+                        os.pwrite(fd, data, pos)
+                        pos += len(data)
+                        remaining -= len(data)
+                if remaining:
+                    return False, f"short read from {remote_file}"
+                return True, ""
+
+            import shlex
+            import subprocess
+
+            cmd = (
+                f"tail -c +{offset + 1} {shlex.quote(remote_file)}"
+                f" | head -c {length}"
+            )
+            proc = subprocess.Popen(
+                [
+                    "ssh",
+                    *self.ssh_options(transfer=True),
+                    f"{self.user}@{self.host}",
+                    cmd,
+                ],
+                stdout=subprocess.PIPE,
+                stderr=subprocess.PIPE,
+            )
+            pos, received = offset, 0
+            while True:
+                data = proc.stdout.read(chunk)
+                if not data:
+                    break
+                os.pwrite(fd, data, pos)
+                pos += len(data)
+                received += len(data)
+            proc.wait(timeout=60)
+            if proc.returncode != 0 or received != length:
+                err = proc.stderr.read().decode(errors="replace").strip()
+                return False, (
+                    f"range copy failed ({received}/{length} bytes): {err}"
+                )
+            return True, ""
+        finally:
+            os.close(fd)
+
+
+def normalize_title(text: str) -> str:
+    """Lowercase a title and reduce it to words, so release and Plex names compare equal."""
+    text = re.sub(r"[._\-]", " ", text)
+    text = text.lower().replace("&", "and")
+    text = re.sub(r"[^a-z0-9 ]", "", text)
+    return " ".join(text.split())
+
+
+def parse_plex_dirname(dirname: str) -> tuple[str, int | None]:
+    """Parse a Plex dir name like 'Movie Title (2020) {imdb-id}' into (title, year)."""
+    match = re.match(r"^(.+?)\s*\((\d{4})\)", dirname)
+    if match:
+        return normalize_title(match.group(1)), int(match.group(2))
+    return normalize_title(dirname), None
+
+
 class PreloadManager:
-    """Copies files from a remote machine to pre-seed newly added torrents."""
+    """Copies files from one or more sources to pre-seed newly added torrents."""
 
     VIDEO_EXTENSIONS = {
         ".mkv",
@@ -257,36 +1542,92 @@ class PreloadManager:
         ".m2ts",
     }
 
-    def __init__(self, config: dict):
-        self.host = config["preload_host"]
-        self.user = config["preload_user"]
-        self.key = config["preload_ssh_key"]
-        self.remote_dir = config["preload_remote_dir"]
+    # Weight of the newest transfer in each source's running throughput average.
+    THROUGHPUT_ALPHA = 0.3
 
-    def _ssh(self, cmd: str, timeout: int = 30) -> tuple[bool, str]:
-        result = subprocess.run(
-            [
-                "ssh",
-                "-i",
-                self.key,
-                "-o",
-                "StrictHostKeyChecking=no",
-                "-o",
-                "BatchMode=yes",
-                f"{self.user}@{self.host}",
-                cmd,
-            ],
-            capture_output=True,
-            text=True,
-            timeout=timeout,
+    def __init__(self, config: dict):
+        self.sources = [
+            PreloadSource(spec, config) for spec in config["preload_sources"]
+        ]
+        self.stripe = config.get("preload_stripe", False)
+        self.stripe_min_bytes = (
+            config.get("preload_stripe_min_mb", 1024) * 1024 * 1024
         )
-        return result.returncode == 0, result.stdout.strip()
+        self.listing_ttl = config.get("preload_listing_ttl", 300.0)
+        self.dedup = config.get("preload_dedup", True)
+        # Transfers the async engine runs at once.
+        self.concurrency = max(1, config.get("preload_concurrency", 2))
+        # Library manifests older than this are ignored; 0 never reads them.
+        self.manifest_max_age = config.get("preload_manifest_max_age", 86400.0)
+        # content_key -> a staged file holding that content, for hardlinking.
+        self._staged_content: dict[str, str] = {}
+        # content_key -> set once the async fetch holding that key finishes.
+        self._fetching: dict[str, "asyncio.Event"] = {}
+        self.source_stats: dict[str, dict] = {}
+        # torrent name -> where PROMOTE_TORRENT put it in the library.
+        self.promoted: dict[str, dict] = {}
+        # source name -> (listed at, dirnames, manifest entries or None)
+        self._listings: dict[str, tuple[float, list[str], dict | None]] = {}
+        self._stats_lock = threading.Lock()
+
+    def load_stats(self, stats: dict):
+        """Seed per-source throughput history saved by a previous run."""
+        self.source_stats = {
+            name: dict(s) for name, s in (stats or {}).items()
+        }
+
+    def load_promoted(self, promoted: dict):
+        """Seed the torrent -> library records written by PROMOTE_TORRENT."""
+        self.promoted = dict(promoted or {})
+
+    def export_stats(self) -> dict:
+        with self._stats_lock:
+            return {name: dict(s) for name, s in self.source_stats.items()}
+
+    def _record_transfer(self, source: PreloadSource, nbytes: int, seconds: float):
+        if seconds <= 0:
+            return
+        rate = nbytes / seconds
+        with self._stats_lock:
+            stats = self.source_stats.setdefault(
+                source.name, {"throughput": 0.0, "bytes": 0, "failures": 0}
+            )
+            previous = stats.get("throughput") or 0.0
+            stats["throughput"] = (
+                rate
+                if not previous
+                else previous
+                + self.THROUGHPUT_ALPHA * (rate - previous)
+            )
+            stats["bytes"] = stats.get("bytes", 0) + nbytes
+            stats["failures"] = 0
+            stats["last_ok"] = datetime.now().isoformat()
+            throughput = stats["throughput"]
+        METRICS.inc("route23_preload_bytes_total", nbytes, source=source.name)
+        METRICS.set("route23_preload_throughput_bytes", throughput, source=source.name)
+
+    def _record_failure(self, source: PreloadSource):
+        with self._stats_lock:
+            stats = self.source_stats.setdefault(
+                source.name, {"throughput": 0.0, "bytes": 0, "failures": 0}
+            )
+            stats["failures"] = stats.get("failures", 0) + 1
+
+    def _rank(self, sources: list[PreloadSource]) -> list[PreloadSource]:
+        """Order sources best-first by measured throughput, demoting recent failures.
+
+        Sources with no history keep their configured order ahead of slower
+        measured ones, so a newly added source gets tried and measured.
+        """
+        order = {s.name: i for i, s in enumerate(self.sources)}
 
-    def _normalize(self, text: str) -> str:
-        text = re.sub(r"[._\-]", " ", text)
-        text = text.lower().replace("&", "and")
-        text = re.sub(r"[^a-z0-9 ]", "", text)
-        return " ".join(text.split())
+        def score(source: PreloadSource) -> tuple[float, int]:
+            stats = self.source_stats.get(source.name, {})
+            throughput = stats.get("throughput") or float("inf")
+            throughput /= 2 ** stats.get("failures", 0)
+            return (-throughput, order.get(source.name, 0))
+
+        return sorted(sources, key=score)
 
     def _extract_title_year(self, torrent_name: str) -> tuple[str, int | None]:
         """Parse a torrent name like 'Movie.Title.2020.1080p...' into (title, year).
@@ -299,37 +1640,106 @@ class PreloadManager:
         if matches:
             match = matches[-1]
             year = int(match.group(1))
-            title = self._normalize(normalized[: match.start()])
+            title = normalize_title(normalized[: match.start()])
             return title, year
-        return self._normalize(normalized), None
+        return normalize_title(normalized), None
 
-    def _parse_plex_dirname(self, dirname: str) -> tuple[str, int | None]:
-        """Parse a Plex dir name like 'Movie Title (2020) {imdb-id}' into (title, year)."""
-        match = re.match(r"^(.+?)\s*\((\d{4})\)", dirname)
-        if match:
-            return self._normalize(match.group(1)), int(match.group(2))
-        return self._normalize(dirname), None
+    def _source_listing(
+        self, source: PreloadSource, live: bool = False
+    ) -> list[str] | None:
+        """Dirnames on a source, from its library manifest when a fresh one exists.
 
-    def find_remote_match(self, torrent_name: str) -> str | None:
-        """Return the remote directory name that best matches the torrent."""
-        title, year = self._extract_title_year(torrent_name)
-        logger.debug(f"Preload: searching for title='{title}' year={year}")
+        live skips the manifest, for when it may predate the wanted directory.
+        """
+        cached = self._listings.get(source.name)
+        if (
+            cached
+            and time.time() - cached[0] < self.listing_ttl
+            and not (live and cached[2] is not None)
+        ):
+            return cached[1]
+        manifest = None
+        if self.manifest_max_age > 0 and not live:
+            manifest = source.read_manifest(self.manifest_max_age)
+        if manifest is not None:
+            listing = sorted(manifest)
+            logger.debug(
+                f"Preload: using library manifest on '{source.name}' ({len(listing)} entries)"
+            )
+        else:
+            listing = source.list_dirnames()
+            if listing is None:
+                source.mark_unavailable("could not list remote directory")
+                return None
+        self._listings[source.name] = (time.time(), listing, manifest)
+        return listing
+
+    def _query_sources(self, live: bool = False) -> dict[str, list[str]]:
+        """List every available source concurrently. Returns {source_name: dirnames}."""
+        sources = [s for s in self.sources if s.available]
+        if live:
+            sources = [
+                s for s in sources
+                if self._listings.get(s.name, (0, [], None))[2] is not None
+            ]
+        if not sources:
+            return {}
+        from concurrent.futures import ThreadPoolExecutor
 
-        ok, output = self._ssh(f'ls -1 "{self.remote_dir}"')
-        if not ok or not output:
-            logger.warning("Preload: could not list remote directory")
-            return None
+        with ThreadPoolExecutor(max_workers=len(sources)) as pool:
+            listings = list(
+                pool.map(lambda s: self._source_listing(s, live), sources)
+            )
+        return {
+            s.name: listing
+            for s, listing in zip(sources, listings)
+            if listing is not None
+        }
 
+    @staticmethod
+    def _match_dirname(
+        title: str, year: int | None, listings: dict[str, list[str]]
+    ) -> tuple[str | None, list[str]]:
+        """Find title/year among the listed dirnames. Returns (match, same-year candidates)."""
+        dirnames = list(
+            dict.fromkeys(d for listing in listings.values() for d in listing)
+        )
         same_year_candidates: list[str] = []
-        for dirname in output.splitlines():
-            rtitle, ryear = self._parse_plex_dirname(dirname)
+        for dirname in dirnames:
+            rtitle, ryear = parse_plex_dirname(dirname)
             if year and ryear and year != ryear:
                 continue
             if title == rtitle:
-                logger.info(f"Preload: matched '{dirname}'")
-                return dirname
+                holders = [n for n, lst in listings.items() if dirname in lst]
+                logger.info(
+                    f"Preload: matched '{dirname}' on {', '.join(holders)}"
+                )
+                return dirname, []
             if year and ryear == year:
                 same_year_candidates.append(dirname)
+        return None, same_year_candidates
+
+    @TRACER.traced()
+    def find_remote_match(self, torrent_name: str) -> str | None:
+        """Return the remote directory name that best matches the torrent."""
+        title, year = self._extract_title_year(torrent_name)
+        logger.debug(f"Preload: searching for title='{title}' year={year}")
+
+        listings = self._query_sources()
+        if not any(listings.values()):
+            logger.warning("Preload: could not list any remote directory")
+            return None
+
+        match, same_year_candidates = self._match_dirname(title, year, listings)
+        if match:
+            return match
+        # A manifest only knows what was there when VERIFY_LIBRARY last ran.
+        refreshed = self._query_sources(live=True)
+        if refreshed:
+            listings.update(refreshed)
+            match, same_year_candidates = self._match_dirname(title, year, listings)
+            if match:
+                return match
 
         detail = f"normalized title='{title}', year={year}"
         if same_year_candidates:
@@ -342,37 +1752,36 @@ class PreloadManager:
         return None
 
     def _list_remote_video_files_with_sizes(
-        self, remote_path: str
+        self, source: PreloadSource, remote_dirname: str, expected: set[int] = frozenset()
     ) -> dict[int, str]:
-        """Return a {size_bytes: remote_filepath} map for video files in remote_path.
+        """Return a {size_bytes: remote_filepath} map for video files in remote_dirname.
 
         If two files share the same size (ambiguous), that size key is set to None
-        so the caller can detect and skip the collision.
+        so the caller can detect and skip the collision. Sizes come from the
+        library manifest when it lists the directory and has every expected
+        size; otherwise the directory is listed on the source.
         """
-        ext_pattern = "|".join(
-            re.escape(e.lstrip(".")) for e in self.VIDEO_EXTENSIONS
-        )
-        cmd = (
-            f'find "{remote_path}" -type f -printf "%s\\t%p\\n"'
-            f' | grep -Ei "\\.({ext_pattern})$"'
-        )
-        ok, output = self._ssh(cmd, timeout=15)
-        if not ok or not output:
-            return {}
-
         size_map: dict[int, str | None] = {}
-        for line in output.splitlines():
-            parts = line.split("\t", 1)
-            if len(parts) != 2:
-                continue
-            try:
-                size = int(parts[0])
-            except ValueError:
-                continue
-            path = parts[1]
+        cached = self._listings.get(source.name)
+        entry = cached[2].get(remote_dirname) if cached and cached[2] else None
+        found = None
+        if entry is not None:
+            found = [
+                (size, f"{source.remote_dir}/{remote_dirname}/{rel}")
+                for size, rel in entry["files"]
+            ]
+            if expected - {size for size, _ in found}:
+                logger.debug(
+                    f"Preload: manifest for '{source.name}' lacks sizes in "
+                    f"'{remote_dirname}', listing it"
+                )
+                found = None
+        if found is None:
+            found = source.find_video_files(remote_dirname, self.VIDEO_EXTENSIONS)
+        for size, path in found:
             if size in size_map:
                 logger.warning(
-                    f"Preload: two remote files share size {size} bytes "
+                    f"Preload: two files on '{source.name}' share size {size} bytes "
                     f"({size_map[size]} and {path}) — will not use either"
                 )
                 size_map[size] = None
@@ -381,17 +1790,183 @@ class PreloadManager:
 
         return size_map
 
-    def fetch_and_stage(
-        self, remote_dirname: str, torrent_info: dict, download_dir: str
-    ) -> tuple[list[dict] | None, str]:
-        """Match torrent files to remote files by size, SCP, and rename in place.
+    def _size_maps(
+        self, remote_dirname: str, expected: set[int] = frozenset()
+    ) -> list[tuple[PreloadSource, dict]]:
+        """Collect size maps for remote_dirname from every source that has it.
 
-        Returns (staged_files, reason) where staged_files is None on failure.
+        expected holds the sizes being matched; a manifest entry missing any
+        of them is treated as stale and the directory is listed instead.
         """
-        remote_path = f"{self.remote_dir}/{remote_dirname}"
-        torrent_name = torrent_info["name"]
-        is_multi = torrent_info["multi_file"]
+        holders = []
+        for source in self.sources:
+            if not source.available:
+                continue
+            listing = self._listings.get(source.name)
+            if listing and remote_dirname not in listing[1]:
+                continue
+            holders.append(source)
+        if not holders:
+            return []
+
+        from concurrent.futures import ThreadPoolExecutor
+
+        with ThreadPoolExecutor(max_workers=len(holders)) as pool:
+            maps = list(
+                pool.map(
+                    lambda s: self._list_remote_video_files_with_sizes(
+                        s, remote_dirname, expected
+                    ),
+                    holders,
+                )
+            )
+        return [(s, m) for s, m in zip(holders, maps) if m]
+
+    def _fetch_striped(
+        self, candidates: list[tuple[PreloadSource, str]], dest: Path, size: int
+    ) -> tuple[bool, str]:
+        """Split one file across several sources by their measured throughput."""
+        rates = [
+            self.source_stats.get(s.name, {}).get("throughput") or 1.0
+            for s, _ in candidates
+        ]
+        total_rate = sum(rates)
+        ranges, offset = [], 0
+        for i, (rate, (source, remote_file)) in enumerate(zip(rates, candidates)):
+            if i == len(candidates) - 1:
+                length = size - offset
+            else:
+                length = int(size * rate / total_rate)
+            ranges.append((source, remote_file, offset, length))
+            offset += length
+
+        with open(dest, "wb") as f:
+            f.truncate(size)
+
+        parent = TRACER.current()
+
+        def run(part):
+            source, remote_file, offset, length = part
+            start = time.monotonic()
+            with TRACER.span(
+                "fetch_range", parent=parent, source=source.name, bytes=length
+            ):
+                ok, err = source.fetch_range(remote_file, dest, offset, length)
+            if ok:
+                self._record_transfer(source, length, time.monotonic() - start)
+            else:
+                self._record_failure(source)
+            return ok, err
+
+        from concurrent.futures import ThreadPoolExecutor
+
+        with ThreadPoolExecutor(max_workers=len(ranges)) as pool:
+            results = list(pool.map(run, ranges))
+
+        errors = [err for ok, err in results if not ok]
+        if errors:
+            return False, "; ".join(errors)
+        return True, ""
+
+    @TRACER.traced()
+    def _fetch_file(
+        self, candidates: list[tuple[PreloadSource, str]], dest: Path, size: int
+    ) -> tuple[PreloadSource | None, str]:
+        """Copy one file from the best candidate, falling back to the others."""
+        TRACER.annotate(bytes=size)
+        if self.stripe and len(candidates) > 1 and size >= self.stripe_min_bytes:
+            names = ", ".join(s.name for s, _ in candidates)
+            logger.info(f"Preload: striping across {names}")
+            ok, err = self._fetch_striped(candidates, dest, size)
+            if ok:
+                return candidates[0][0], ""
+            logger.warning(
+                f"Preload: striped copy failed ({err}) — retrying from one source"
+            )
+
+        last_error = "no source available"
+        for source, remote_file in candidates:
+            start = time.monotonic()
+            ok, err = source.fetch(remote_file, dest)
+            if ok:
+                elapsed = time.monotonic() - start
+                self._record_transfer(source, size, elapsed)
+                TRACER.annotate(source=source.name)
+                if elapsed > 0:
+                    logger.debug(
+                        f"Preload: {source.name} delivered "
+                        f"{_format_size(int(size / elapsed))}/s"
+                    )
+                return source, ""
+            logger.warning(f"Preload: copy from '{source.name}' failed — {err}")
+            self._record_failure(source)
+            last_error = err
+        return None, last_error
+
+    async def _fetch_file_async(
+        self, candidates: list[tuple[PreloadSource, str]], dest: Path, size: int
+    ) -> tuple[PreloadSource | None, str]:
+        """_fetch_file() on the event loop. Striped copies still run in a worker thread."""
+        import asyncio
+
+        if self.stripe and len(candidates) > 1 and size >= self.stripe_min_bytes:
+            names = ", ".join(s.name for s, _ in candidates)
+            logger.info(f"Preload: striping across {names}")
+            ok, err = await asyncio.to_thread(
+                self._fetch_striped, candidates, dest, size
+            )
+            if ok:
+                return candidates[0][0], ""
+            logger.warning(
+                f"Preload: striped copy failed ({err}) — retrying from one source"
+            )
+
+        last_error = "no source available"
+        for source, remote_file in candidates:
+            start = time.monotonic()
+            ok, err = await source.fetch_async(remote_file, dest)
+            if ok:
+                self._record_transfer(source, size, time.monotonic() - start)
+                return source, ""
+            logger.warning(f"Preload: copy from '{source.name}' failed — {err}")
+            self._record_failure(source)
+            last_error = err
+        return None, last_error
+
+    def _link_staged(self, torrent_file: dict, dest: Path) -> str | None:
+        """Hardlink an already staged copy of torrent_file's content to dest.
+
+        Returns the path linked from, or None if there is no usable copy
+        (not staged this run, changed size, or a different filesystem).
+        """
+        key = torrent_file.get("content_key")
+        existing = self._staged_content.get(key) if self.dedup and key else None
+        if not existing or existing == str(dest):
+            return None
+        try:
+            if os.stat(existing).st_size != torrent_file["length"]:
+                del self._staged_content[key]
+                return None
+            if dest.exists() and os.path.samefile(existing, dest):
+                return existing
+            tmp = dest.with_name(f".{dest.name}.route23-link")
+            tmp.unlink(missing_ok=True)
+            os.link(existing, tmp)
+            os.replace(tmp, dest)
+        except OSError as e:
+            logger.debug(f"Preload: could not hardlink {existing} — {e}")
+            return None
+        return existing
+
+    def _plan_staging(
+        self, remote_dirname: str, torrent_info: dict
+    ) -> tuple[list | None, str]:
+        """Pair each of the torrent's video files with ranked (source, remote_file) candidates.
 
+        Returns (plan, reason) where plan is None if any file has no
+        unambiguous match on any source.
+        """
+        torrent_name = torrent_info["name"]
         torrent_videos = [
             f
             for f in torrent_info["files"]
@@ -400,18 +1975,32 @@ class PreloadManager:
         if not torrent_videos:
             return None, "torrent contains no video files"
 
-        size_map = self._list_remote_video_files_with_sizes(remote_path)
-        if not size_map:
+        promoted = self.promoted.get(torrent_name)
+        if (
+            promoted
+            and promoted["dir"] == remote_dirname
+            and all(tf["path"] in promoted["files"] for tf in torrent_videos)
+        ):
+            plan = self._plan_promoted(promoted, torrent_videos)
+            if plan:
+                return plan, ""
+
+        size_maps = self._size_maps(remote_dirname, {tf["length"] for tf in torrent_videos})
+        if not size_maps:
             reason = f"no video files found in remote '{remote_dirname}'"
             logger.warning(f"Preload: {reason} — skipping '{torrent_name}'")
             return None, reason
 
-        pairs = []
+        plan = []
         for tf in torrent_videos:
             expected_size = tf["length"]
-            remote_file = size_map.get(expected_size)
-            if remote_file is None:
-                if expected_size in size_map:
+            candidates = [
+                (source, size_map[expected_size])
+                for source, size_map in size_maps
+                if size_map.get(expected_size)
+            ]
+            if not candidates:
+                if any(expected_size in m for _, m in size_maps):
                     reason = f"size {_format_size(expected_size)} is ambiguous (two remote files match)"
                 else:
                     reason = f"no remote file matches expected size {_format_size(expected_size)} for '{Path(tf['path']).name}'"
@@ -419,57 +2008,255 @@ class PreloadManager:
                     f"Preload: {reason} — skipping '{torrent_name}'"
                 )
                 return None, reason
-            pairs.append((tf, remote_file))
+            by_source = dict(candidates)
+            ranked = self._rank([s for s, _ in candidates])
+            plan.append((tf, [(s, by_source[s]) for s in ranked]))
+        return plan, ""
+
+    def _plan_promoted(self, promoted: dict, torrent_videos: list[dict]) -> list | None:
+        """_plan_staging() for a torrent PROMOTE_TORRENT put in the library.
+
+        Only sources rooted where the promotion wrote (its library section)
+        are used, and each must still hold every file at its recorded name
+        and expected size. Skips the size matching across every source, not
+        the size check. None if no source qualifies.
+        """
+        remote_dirname = promoted["dir"]
+        expected = {tf["length"] for tf in torrent_videos}
+        holders = []
+        for source in self.sources:
+            listing = self._listings.get(source.name)
+            if (
+                not source.available
+                or source.remote_dir != promoted.get("root")
+                or (listing and remote_dirname not in listing[1])
+            ):
+                continue
+            size_map = self._list_remote_video_files_with_sizes(
+                source, remote_dirname, expected
+            )
+            if all(
+                size_map.get(tf["length"])
+                == f"{source.remote_dir}/{remote_dirname}/{promoted['files'][tf['path']]}"
+                for tf in torrent_videos
+            ):
+                holders.append(source)
+        if not holders:
+            return None
+        holders = self._rank(holders)
+        return [
+            (
+                tf,
+                [
+                    (s, f"{s.remote_dir}/{remote_dirname}/{promoted['files'][tf['path']]}")
+                    for s in holders
+                ],
+            )
+            for tf in torrent_videos
+        ]
 
-        staged_files = []
-        for torrent_file, remote_file in pairs:
-            if is_multi:
-                dest = Path(download_dir) / torrent_name / torrent_file["path"]
-            else:
-                dest = Path(download_dir) / torrent_file["path"]
+    def _prepare_dest(
+        self, torrent_info: dict, torrent_file: dict, download_dir: str
+    ) -> tuple[Path, dict | None]:
+        """Create dest's directory and hardlink a staged duplicate if there is one.
 
-            dest.parent.mkdir(parents=True, exist_ok=True)
+        Returns (dest, staged_entry); staged_entry is set if dest was linked
+        and needs no fetch.
+        """
+        if torrent_info["multi_file"]:
+            dest = Path(download_dir) / torrent_info["name"] / torrent_file["path"]
+        else:
+            dest = Path(download_dir) / torrent_file["path"]
+        dest.parent.mkdir(parents=True, exist_ok=True)
 
+        linked_from = self._link_staged(torrent_file, dest)
+        if linked_from:
             logger.info(
-                f"Preload: {Path(remote_file).name} ({_format_size(torrent_file['length'])})"
-                f" → {dest.relative_to(download_dir)}"
-            )
-            result = subprocess.run(
-                [
-                    "scp",
-                    "-i",
-                    self.key,
-                    "-o",
-                    "StrictHostKeyChecking=no",
-                    f"{self.user}@{self.host}:{remote_file}",
-                    str(dest),
-                ],
-                capture_output=True,
-                text=True,
-                timeout=7200,
+                f"Preload: {dest.relative_to(download_dir)} hardlinked to identical "
+                f"{Path(linked_from).relative_to(download_dir)} "
+                f"({_format_size(torrent_file['length'])} not fetched)"
             )
-            if result.returncode != 0:
-                reason = f"scp failed: {result.stderr.strip()}"
+            METRICS.inc("route23_preload_dedup_bytes_total", torrent_file["length"])
+            return dest, {
+                "name": dest.name,
+                "size": torrent_file["length"],
+                "source": "hardlink",
+            }
+        # Never write through a link into another torrent's copy.
+        if dest.exists() and dest.stat().st_nlink > 1:
+            dest.unlink()
+
+        return dest, None
+
+    def _staged(self, torrent_file: dict, dest: Path, source: PreloadSource) -> dict:
+        """Record a fetched file for later dedup and return its staged_files entry."""
+        if torrent_file.get("content_key"):
+            self._staged_content[torrent_file["content_key"]] = str(dest)
+        return {
+            "name": dest.name,
+            "size": torrent_file["length"],
+            "source": source.name,
+        }
+
+    @staticmethod
+    def _log_fetch(
+        candidates: list[tuple[PreloadSource, str]], dest: Path, size: int, download_dir: str
+    ):
+        best, remote_file = candidates[0]
+        logger.info(
+            f"Preload: {Path(remote_file).name} ({_format_size(size)})"
+            f" from {best.name} → {dest.relative_to(download_dir)}"
+        )
+
+    @TRACER.traced()
+    def fetch_and_stage(
+        self, remote_dirname: str, torrent_info: dict, download_dir: str
+    ) -> tuple[list[dict] | None, str]:
+        """Match torrent files to remote files by size, copy, and rename in place.
+
+        Each file is fetched from the fastest source that holds it unambiguously.
+        A file whose content (see _content_keys) was already staged this run
+        for another torrent is hardlinked to that copy instead of fetched.
+        Returns (staged_files, reason) where staged_files is None on failure.
+        """
+        plan, reason = self._plan_staging(remote_dirname, torrent_info)
+        if plan is None:
+            return None, reason
+
+        staged_files = []
+        for torrent_file, candidates in plan:
+            dest, entry = self._prepare_dest(torrent_info, torrent_file, download_dir)
+            if entry is None:
+                self._log_fetch(candidates, dest, torrent_file["length"], download_dir)
+                source, reason = self._fetch_file(
+                    candidates, dest, torrent_file["length"]
+                )
+                if source is None:
+                    logger.error(f"Preload: {reason}")
+                    return None, reason
+                entry = self._staged(torrent_file, dest, source)
+            staged_files.append(entry)
+
+        logger.info(
+            f"Preload: staged {len(staged_files)} file(s) for '{torrent_info['name']}'"
+        )
+        TRACER.annotate(bytes=sum(f["size"] for f in staged_files))
+        return staged_files, ""
+
+    async def fetch_and_stage_async(
+        self,
+        remote_dirname: str,
+        torrent_info: dict,
+        download_dir: str,
+        slots: "asyncio.Semaphore | None" = None,
+    ) -> tuple[list[dict] | None, str]:
+        """fetch_and_stage() with the torrent's files fetched concurrently.
+
+        At most slots' worth of transfers run at once; the semaphore is
+        shared across torrents by AsyncRotationEngine, or made here from
+        PRELOAD_CONCURRENCY for a single call. A file whose content another
+        torrent is already fetching waits for that fetch and links to it.
+        """
+        import asyncio
+
+        plan, reason = await asyncio.to_thread(
+            self._plan_staging, remote_dirname, torrent_info
+        )
+        if plan is None:
+            return None, reason
+        if slots is None:
+            slots = asyncio.Semaphore(self.concurrency)
+
+        async def stage(torrent_file, candidates):
+            # Wait for a concurrent fetch of the same content, then link to it.
+            key = torrent_file.get("content_key") if self.dedup else None
+            while key in self._fetching:
+                await self._fetching[key].wait()
+            dest, entry = self._prepare_dest(torrent_info, torrent_file, download_dir)
+            if entry is not None:
+                return entry, ""
+            if key:
+                self._fetching[key] = asyncio.Event()
+            try:
+                async with slots:
+                    self._log_fetch(candidates, dest, torrent_file["length"], download_dir)
+                    source, reason = await self._fetch_file_async(
+                        candidates, dest, torrent_file["length"]
+                    )
+                if source is not None:
+                    entry = self._staged(torrent_file, dest, source)
+            finally:
+                if key:
+                    self._fetching.pop(key).set()
+            if source is None:
                 logger.error(f"Preload: {reason}")
                 return None, reason
+            return entry, ""
 
-            staged_files.append(
-                {"name": dest.name, "size": torrent_file["length"]}
-            )
-
+        results = await asyncio.gather(*(stage(tf, c) for tf, c in plan))
+        for entry, reason in results:
+            if entry is None:
+                return None, reason
+        staged_files = [entry for entry, _ in results]
         logger.info(
-            f"Preload: staged {len(staged_files)} file(s) for '{torrent_name}'"
+            f"Preload: staged {len(staged_files)} file(s) for '{torrent_info['name']}'"
         )
         return staged_files, ""
 
+    @TRACER.traced()
     def preload(self, torrent_path: str, download_dir: str) -> PreloadResult:
         """Try to find and stage files for a torrent from the remote machine."""
+        result = self._preload(torrent_path, download_dir)
+        METRICS.inc(
+            "route23_preload_results_total",
+            result="success" if result.success else "failure",
+        )
+        return result
+
+    async def preload_async(
+        self,
+        torrent_path: str,
+        download_dir: str,
+        slots: "asyncio.Semaphore | None" = None,
+    ) -> PreloadResult:
+        """preload() for the async engine: matching runs in a worker thread, transfers on the loop."""
+        import asyncio
+
+        torrent_info, result = await asyncio.to_thread(self._match, torrent_path)
+        if torrent_info is not None:
+            result = self._staging_result(
+                result,
+                *await self.fetch_and_stage_async(
+                    result.remote_dir, torrent_info, download_dir, slots
+                ),
+            )
+        METRICS.inc(
+            "route23_preload_results_total",
+            result="success" if result.success else "failure",
+        )
+        return result
+
+    def _preload(self, torrent_path: str, download_dir: str) -> PreloadResult:
+        torrent_info, result = self._match(torrent_path)
+        if torrent_info is None:
+            return result
+        return self._staging_result(
+            result,
+            *self.fetch_and_stage(result.remote_dir, torrent_info, download_dir),
+        )
+
+    def _match(self, torrent_path: str) -> tuple[dict | None, PreloadResult]:
+        """Parse the torrent and find its remote directory.
+
+        Returns (torrent_info, result); torrent_info is None and result holds
+        the reason if either step failed.
+        """
         try:
             torrent_info = parse_torrent(torrent_path)
         except Exception as e:
             name = Path(torrent_path).stem
             logger.warning(f"Preload: could not parse torrent file — {e}")
-            return PreloadResult(
+            return None, PreloadResult(
                 torrent_name=name,
                 success=False,
                 reason=f"could not parse torrent: {e}",
@@ -477,144 +2264,1111 @@ class PreloadManager:
 
         torrent_name = torrent_info["name"]
 
-        remote_dirname = self.find_remote_match(torrent_name)
+        promoted = self.promoted.get(torrent_name)
+        if promoted:
+            remote_dirname = promoted["dir"]
+            logger.info(
+                f"Preload: '{torrent_name}' was promoted to '{remote_dirname}'"
+            )
+        else:
+            remote_dirname = self.find_remote_match(torrent_name)
         if not remote_dirname:
-            return PreloadResult(
+            return None, PreloadResult(
                 torrent_name=torrent_name,
                 success=False,
                 reason="no matching directory found on remote",
             )
-
-        staged_files, reason = self.fetch_and_stage(
-            remote_dirname, torrent_info, download_dir
+        return torrent_info, PreloadResult(
+            torrent_name=torrent_name, success=False, remote_dir=remote_dirname
         )
+
+    @staticmethod
+    def _staging_result(
+        result: PreloadResult, staged_files: list[dict] | None, reason: str
+    ) -> PreloadResult:
         if staged_files is None:
-            return PreloadResult(
-                torrent_name=torrent_name,
-                success=False,
-                remote_dir=remote_dirname,
-                reason=reason,
-            )
+            result.reason = reason
+        else:
+            result.success = True
+            result.staged_files = staged_files
+        return result
 
-        return PreloadResult(
-            torrent_name=torrent_name,
-            success=True,
-            remote_dir=remote_dirname,
-            staged_files=staged_files,
-        )
 
+class TransferBenchmark:
+    """Measures MB/s and CPU seconds per GB for each transfer backend on each source.
 
-class NotificationQueue:
-    """Collects preload results during a rotation and sends one digest email at the end."""
+    A random test file is written on the source (under /tmp for SSH sources,
+    or a temp dir for local ones), fetched once per backend/cipher combination
+    into DOWNLOAD_DIR, then removed. CPU time covers the local child processes
+    (ssh, scp, rsync, tar, sftp) plus route23 itself. Point a source at
+    localhost to benchmark against a local sshd, or use a local source for a
+    loopback baseline.
+    """
 
-    def __init__(self, config: dict):
-        self.config = config
-        self._results: list[PreloadResult] = []
+    REMOTE_TEST_FILE = "/tmp/route23-transfer-bench.bin"
 
-    def add(self, result: PreloadResult):
-        self._results.append(result)
+    def __init__(self, config: dict, preloader: PreloadManager):
+        self.config = config
+        self.preloader = preloader
+        self.size = config["bench_size_mb"] * 1024 * 1024
+        self.backends = [
+            b.strip().lower()
+            for b in config["bench_backends"].split(",")
+            if b.strip()
+        ]
+        self.ciphers = [
+            c.strip() for c in config["bench_ciphers"].split(",") if c.strip()
+        ]
 
-    def flush(self):
-        """Send digest email and clear the queue. No-op if nothing to report."""
-        if not self._results:
-            return
+    def _create_test_file(self, source: PreloadSource) -> str | None:
+        count = self.size // (1024 * 1024)
+        if source.is_local:
+            path = os.path.join(
+                self.config["download_dir"], ".route23-bench-src.bin"
+            )
+            with open(path, "wb") as f:
+                for _ in range(count):
+                    f.write(os.urandom(1024 * 1024))
+            return path
+        ok, _ = source._ssh(
+            f"head -c {count * 1024 * 1024} /dev/urandom > {self.REMOTE_TEST_FILE}",
+            timeout=600,
+        )
+        return self.REMOTE_TEST_FILE if ok else None
 
-        to_email = self.config.get("notify_email", "")
-        if not to_email:
-            logger.debug(
-                "Notifications: NOTIFY_EMAIL not set, skipping digest"
+    def _remove_test_file(self, source: PreloadSource, path: str):
+        if source.is_local:
+            Path(path).unlink(missing_ok=True)
+        else:
+            source._ssh(f"rm -f {self.REMOTE_TEST_FILE}")
+
+    def _measure(
+        self, source: PreloadSource, backend: TransferBackend, remote_file: str
+    ) -> dict:
+        import resource
+
+        dest = Path(self.config["download_dir"]) / ".route23-bench-dst.bin"
+        dest.unlink(missing_ok=True)
+
+        before_self = resource.getrusage(resource.RUSAGE_SELF)
+        before_children = resource.getrusage(resource.RUSAGE_CHILDREN)
+        start = time.monotonic()
+        ok, err = backend.fetch(source, remote_file, dest)
+        elapsed = time.monotonic() - start
+        after_self = resource.getrusage(resource.RUSAGE_SELF)
+        after_children = resource.getrusage(resource.RUSAGE_CHILDREN)
+
+        cpu = sum(
+            getattr(after, f) - getattr(before, f)
+            for before, after in (
+                (before_self, after_self),
+                (before_children, after_children),
             )
-            self._results.clear()
-            return
+            for f in ("ru_utime", "ru_stime")
+        )
+        size = dest.stat().st_size if dest.exists() else 0
+        dest.unlink(missing_ok=True)
+        if ok and size != self.size:
+            ok, err = False, f"copied {size} of {self.size} bytes"
 
-        smtp_host = self.config["smtp_server"]
-        smtp_port = self.config["smtp_port"]
-        from_email = self.config["from_email"]
-        server_name = self.config["server_name"]
+        gb = self.size / (1024**3)
+        return {
+            "source": source.name,
+            "backend": backend.name,
+            "cipher": source.cipher or "default",
+            "compression": bool(source.compression),
+            "ok": ok,
+            "error": err,
+            "seconds": round(elapsed, 3),
+            "mb_per_s": round(self.size / 1024**2 / elapsed, 2) if ok else 0.0,
+            "cpu_s_per_gb": round(cpu / gb, 2) if ok else 0.0,
+        }
 
-        successes = [r for r in self._results if r.success]
-        failures = [r for r in self._results if not r.success]
+    def run(self) -> list[dict]:
+        Path(self.config["download_dir"]).mkdir(parents=True, exist_ok=True)
+        results = []
+        for source in self.preloader.sources:
+            remote_file = self._create_test_file(source)
+            if not remote_file:
+                logger.error(
+                    f"Benchmark: could not create test file on '{source.name}'"
+                )
+                continue
+            original_cipher = source.cipher
+            try:
+                backends = ["local"] if source.is_local else self.backends
+                for name in backends:
+                    backend_cls = TRANSFER_BACKENDS.get(name)
+                    if backend_cls is None:
+                        logger.warning(f"Benchmark: unknown backend '{name}'")
+                        continue
+                    ciphers = (
+                        self.ciphers
+                        if self.ciphers and not source.is_local
+                        else [original_cipher]
+                    )
+                    for cipher in ciphers:
+                        source.cipher = cipher
+                        result = self._measure(source, backend_cls(), remote_file)
+                        results.append(result)
+                        if result["ok"]:
+                            logger.info(
+                                f"Benchmark: {source.name} {name} "
+                                f"[{result['cipher']}] {result['mb_per_s']} MB/s, "
+                                f"{result['cpu_s_per_gb']} CPU s/GB"
+                            )
+                        else:
+                            logger.warning(
+                                f"Benchmark: {source.name} {name} failed — "
+                                f"{result['error']}"
+                            )
+            finally:
+                source.cipher = original_cipher
+                self._remove_test_file(source, remote_file)
 
-        subject = f"[Route23] Preload Report — {len(successes)} matched, {len(failures)} missed"
-        html = self._build_html(successes, failures, server_name)
+        self.report(results)
+        return results
 
-        msg = MIMEMultipart("alternative")
-        msg["From"] = from_email
-        msg["To"] = to_email
-        msg["Subject"] = subject
-        msg.attach(MIMEText(html, "html"))
+    def report(self, results: list[dict]):
+        print("\n" + "=" * 72)
+        print(f"TRANSFER BENCHMARK ({_format_size(self.size)} test file)")
+        print("=" * 72)
+        print(
+            f"{'Source':<14}{'Backend':<8}{'Cipher':<28}{'MB/s':>10}{'CPU s/GB':>12}"
+        )
+        print("-" * 72)
+        for r in results:
+            if r["ok"]:
+                print(
+                    f"{r['source'][:13]:<14}{r['backend']:<8}{r['cipher'][:27]:<28}"
+                    f"{r['mb_per_s']:>10.2f}{r['cpu_s_per_gb']:>12.2f}"
+                )
+            else:
+                print(
+                    f"{r['source'][:13]:<14}{r['backend']:<8}{r['cipher'][:27]:<28}"
+                    f"{'failed':>10}"
+                )
+        print("=" * 72 + "\n")
+
+        out = Path(self.config["state_file"]).parent / "transfer_benchmark.json"
+        out.parent.mkdir(parents=True, exist_ok=True)
+        with open(out, "w") as f:
+            json.dump(
+                {"run_at": datetime.now().isoformat(), "results": results},
+                f,
+                indent=2,
+            )
+        logger.info(f"Benchmark results written to {out}")
+
+
+class PlexLibraryVerifier:
+    """Checks a Plex library's naming and writes the manifest preload matches against.
+
+    Each top-level title directory under Movies/ and TV Shows/ is walked once
+    with os.scandir, on a pool of VERIFY_WORKERS threads. The walk is checked
+    against the naming rules (the same ones exe/verify.sh used to apply) and
+    summarized into MANIFEST_NAME in that library root: per directory, the
+    title and year as the preload matcher normalizes them, the directory's
+    mtime, and every video file below it with its size. A preload source whose
+    remote_dir is that root reads the manifest instead of listing and
+    searching the tree for each torrent.
+    """
+
+    MANIFEST_NAME = ".route23-manifest.json"
+    MANIFEST_VERSION = 1
+    SECTIONS = {"movies": "Movies", "tv": "TV Shows"}
+
+    MOVIE_DIR = re.compile(r"^.* \(\d{4}\) \{imdb-tt\d{7,}\}$")
+    MOVIE_PART = re.compile(
+        r"^(.+ \(\d{4}\)) - (?:disk|part)\d+ - \{imdb-tt\d{7,}\}\.[A-Za-z0-9]+$"
+    )
+    SUBTITLE_SUFFIX = re.compile(r"^(?:\.[A-Za-z]{2,})?(?:\.(?:forced|sdh|cc))?\.srt$")
+    SHOW_DIR = re.compile(r"^.* \(\d{4}\)$")
+    SEASON_DIR = re.compile(r"^Season (\d{2})$")
+
+    def __init__(self, config: dict):
+        self.media_dir = config["plex_media_dir"].rstrip("/") or "/"
+        self.workers = max(1, config.get("verify_workers", 8))
+        self.video_extensions = PreloadManager.VIDEO_EXTENSIONS
+
+    def _walk(self, path: str) -> dict:
+        """{"mtime", "files": {name: size or None}, "dirs": {name: subtree}} for path.
 
+        Only video files are stat'ed; their sizes are what preload matches on.
+        """
+        tree = {"mtime": 0.0, "files": {}, "dirs": {}}
         try:
-            with smtplib.SMTP(smtp_host, smtp_port, timeout=10) as server:
-                server.sendmail(from_email, [to_email], msg.as_string())
-            logger.info(
-                f"Notifications: digest sent to {to_email} "
-                f"({len(successes)} preloaded, {len(failures)} missed)"
+            tree["mtime"] = os.stat(path).st_mtime
+            with os.scandir(path) as it:
+                for entry in it:
+                    if entry.is_dir(follow_symlinks=False):
+                        tree["dirs"][entry.name] = self._walk(entry.path)
+                    elif entry.is_file():
+                        size = None
+                        if Path(entry.name).suffix.lower() in self.video_extensions:
+                            size = entry.stat().st_size
+                        tree["files"][entry.name] = size
+        except OSError as e:
+            logger.warning(f"Verify: could not read {path}: {e}")
+        return tree
+
+    def _video_files(self, tree: dict, prefix: str = "") -> list[list]:
+        """[size, relative path] for every video file in tree, depth first."""
+        found = [
+            [size, prefix + name]
+            for name, size in sorted(tree["files"].items())
+            if size is not None
+        ]
+        for name, subtree in sorted(tree["dirs"].items()):
+            found += self._video_files(subtree, f"{prefix}{name}/")
+        return found
+
+    def _videos(self, tree: dict) -> list[str]:
+        return sorted(n for n, size in tree["files"].items() if size is not None)
+
+    @staticmethod
+    def _subtitles(tree: dict) -> list[str]:
+        return sorted(n for n in tree["files"] if n.lower().endswith(".srt"))
+
+    def _check_movie(self, dirname: str, tree: dict) -> list[str]:
+        if not self.MOVIE_DIR.match(dirname):
+            return ["invalid directory name (expected: Title (YEAR) {imdb-ttXXXXXXX})"]
+        videos = self._videos(tree)
+        if not videos:
+            return ["no video file found"]
+        issues = []
+        base = dirname.rsplit(" {", 1)[0]
+        for name in videos:
+            if Path(name).stem == dirname:
+                continue
+            part = self.MOVIE_PART.match(name)
+            if part and part.group(1) == base:
+                continue
+            issues.append(f"invalid video file name: {name}")
+        for name in self._subtitles(tree):
+            if not (
+                name.startswith(dirname)
+                and self.SUBTITLE_SUFFIX.match(name[len(dirname):])
+            ):
+                issues.append(f"invalid subtitle file name: {name}")
+        return issues
+
+    def _check_show(self, dirname: str, tree: dict) -> list[str]:
+        if not self.SHOW_DIR.match(dirname):
+            return ["invalid directory name (expected: Title (YEAR))"]
+        if not tree["dirs"]:
+            return ["no season directories found"]
+        issues = []
+        show = re.escape(dirname)
+        for season_name, season in sorted(tree["dirs"].items()):
+            season_match = self.SEASON_DIR.match(season_name)
+            if not season_match:
+                issues.append(f"invalid season directory: {season_name}")
+                continue
+            videos = self._videos(season)
+            if not videos:
+                issues.append(f"{season_name}: no video files found")
+                continue
+            episode = re.compile(
+                rf"^{show} - s{season_match.group(1)}e\d{{2,}}(?:-e?\d{{2,}})? - .+"
             )
-        except Exception as e:
-            logger.error(f"Notifications: failed to send digest — {e}")
-        finally:
-            self._results.clear()
+            for name in videos:
+                if not episode.match(Path(name).stem):
+                    issues.append(f"{season_name}: invalid episode name: {name}")
+            for name in self._subtitles(season):
+                if not episode.match(name[: -len(".srt")]):
+                    issues.append(f"{season_name}: invalid subtitle name: {name}")
+        return issues
+
+    def _check(self, section: str, root: str, dirname: str) -> tuple[list[str], dict]:
+        tree = self._walk(os.path.join(root, dirname))
+        check = self._check_movie if section == "movies" else self._check_show
+        title, year = parse_plex_dirname(dirname)
+        entry = {
+            "title": title,
+            "year": year,
+            "mtime": tree["mtime"],
+            "files": self._video_files(tree),
+        }
+        return check(dirname, tree), entry
 
-    def _build_html(
-        self,
-        successes: list[PreloadResult],
-        failures: list[PreloadResult],
-        server_name: str,
-    ) -> str:
-        timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    def _write_manifest(
+        self, root: str, entries: dict, generated_ts: float | None = None
+    ) -> str | None:
+        """Write the manifest atomically so a preload never reads half of one."""
+        path = os.path.join(root, self.MANIFEST_NAME)
+        tmp = os.path.join(root, f".{self.MANIFEST_NAME}.tmp")
+        now = time.time() if generated_ts is None else generated_ts
+        try:
+            with open(tmp, "w") as f:
+                json.dump(
+                    {
+                        "version": self.MANIFEST_VERSION,
+                        "generated": datetime.fromtimestamp(now).isoformat(),
+                        "generated_ts": now,
+                        "entries": entries,
+                    },
+                    f,
+                    separators=(",", ":"),
+                )
+            os.replace(tmp, path)
+        except OSError as e:
+            logger.warning(f"Verify: could not write manifest {path}: {e}")
+            return None
+        return path
 
-        def success_item(r: PreloadResult) -> str:
-            total = _format_size(r.total_bytes())
-            files_html = "".join(
-                f'<div class="file-row">'
-                f'{f["name"]}<span class="file-size">{_format_size(f["size"])}</span>'
-                f"</div>"
-                for f in r.staged_files
-            )
-            return (
-                f'<div class="item">'
-                f'<div class="item-name">{r.torrent_name}</div>'
-                f'<div class="item-meta">Matched: {r.remote_dir} &nbsp;·&nbsp; '
-                f"{len(r.staged_files)} file(s) &nbsp;·&nbsp; {total}</div>"
-                f"{files_html}"
-                f"</div>"
-            )
+    def verify_section(self, section: str) -> dict:
+        """Check one library section and refresh its manifest."""
+        root = os.path.join(self.media_dir, self.SECTIONS[section])
+        start = time.perf_counter()
+        try:
+            with os.scandir(root) as it:
+                dirnames = sorted(
+                    e.name
+                    for e in it
+                    if e.is_dir(follow_symlinks=False) and not e.name.startswith(".")
+                )
+        except OSError as e:
+            return {"root": root, "error": str(e)}
 
-        def failure_item(r: PreloadResult) -> str:
-            remote = (
-                f'<div class="item-meta">Remote: {r.remote_dir}</div>'
-                if r.remote_dir
-                else ""
-            )
-            return (
-                f'<div class="item item-fail">'
-                f'<div class="item-name">{r.torrent_name}</div>'
-                f"{remote}"
-                f'<div class="reason">{r.reason}</div>'
-                f"</div>"
+        from concurrent.futures import ThreadPoolExecutor
+
+        with ThreadPoolExecutor(max_workers=self.workers) as pool:
+            results = list(
+                pool.map(lambda d: self._check(section, root, d), dirnames)
             )
 
-        success_html = ""
-        if successes:
-            items = "".join(success_item(r) for r in successes)
-            success_html = f'<div class="section-title">&#10003; Successfully Preloaded</div>{items}'
+        issues, entries = [], {}
+        for dirname, (problems, entry) in zip(dirnames, results):
+            entries[dirname] = entry
+            issues += [{"dir": dirname, "issue": p} for p in problems]
+        bad = {i["dir"] for i in issues}
+        return {
+            "root": root,
+            "checked": len(dirnames),
+            "valid": len(dirnames) - len(bad),
+            "video_files": sum(len(e["files"]) for e in entries.values()),
+            "issues": issues,
+            "manifest": self._write_manifest(root, entries),
+            "seconds": round(time.perf_counter() - start, 3),
+        }
 
-        failure_html = ""
-        if failures:
-            items = "".join(failure_item(r) for r in failures)
-            failure_html = f'<div class="section-title">&#10007; No Match Found</div>{items}'
+    def run(self, sections: list[str]) -> dict:
+        return {s: self.verify_section(s) for s in sections}
 
-        return f"""<!DOCTYPE html>
-<html>
-<head>
-  <meta charset="utf-8" />
-  <style>
-    body{{font-family:system-ui,-apple-system,BlinkMacSystemFont,"Segoe UI",sans-serif;background-color:#0f172a;color:#e5e7eb;padding:24px;margin:0}}
-    .card{{max-width:680px;margin:0 auto;background:radial-gradient(circle at top left,#1e293b,#020617);border-radius:16px;border:1px solid #1f2933;box-shadow:0 18px 45px rgba(0,0,0,.65);overflow:hidden}}
-    .header{{padding:20px 24px 16px;border-bottom:1px solid rgba(148,163,184,.25)}}
-    .badge{{font-size:11px;letter-spacing:.08em;text-transform:uppercase;padding:4px 10px;border-radius:999px;background-color:rgba(15,23,42,.85);border:1px solid rgba(148,163,184,.4);color:#cbd5f5;display:inline-block;margin-bottom:8px}}
-    h1{{margin:0 0 2px;font-size:20px;font-weight:600;color:#e5e7eb}}
+    def update_entry(self, section: str, dirname: str) -> list[str] | None:
+        """Rescan one directory into an existing manifest and return its naming issues.
+
+        The manifest keeps its generation time, so its age still says when the
+        rest of the section was last walked. None if there is no manifest.
+        """
+        root = os.path.join(self.media_dir, self.SECTIONS[section])
+        try:
+            with open(os.path.join(root, self.MANIFEST_NAME)) as f:
+                manifest = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if manifest.get("version") != self.MANIFEST_VERSION:
+            return None
+        issues, entry = self._check(section, root, dirname)
+        manifest["entries"][dirname] = entry
+        self._write_manifest(root, manifest["entries"], manifest["generated_ts"])
+        return issues
+
+
+class LibraryPromoter:
+    """Puts a finished torrent into the Plex movie library by hardlink.
+
+    Each video file (and any .srt beside it) is linked under PLEX_MEDIA_DIR/
+    Movies with its Plex name, so rtorrent keeps seeding its own paths and
+    the library costs no extra space. If the two directories are on
+    different filesystems the files are copied instead. The returned record
+    (library dir, section path, and torrent path -> library name) is kept in
+    the state file for preload, and backup() copies only the promoted files to
+    BACKUP_MEDIA_DIR rather than syncing the whole library.
+    """
+
+    SUBTITLE_TAGS = re.compile(r"((?:\.[a-z]{2,3})?(?:\.(?:forced|sdh|cc))?)\.(?i:srt)$")
+    SAMPLE = re.compile(r"\bsample\b", re.IGNORECASE)
+
+    def __init__(self, config: dict):
+        self.download_dir = config["download_dir"]
+        self.media_dir = config["plex_media_dir"].rstrip("/") or "/"
+        self.section = PlexLibraryVerifier.SECTIONS["movies"]
+        self.backup_dir = config.get("backup_media_dir", "").rstrip("/")
+
+    def _data_path(self, torrent_info: dict, rel: str) -> Path:
+        if torrent_info["multi_file"]:
+            return Path(self.download_dir) / torrent_info["name"] / rel
+        return Path(self.download_dir) / rel
+
+    def plan(self, torrent_info: dict, dirname: str) -> list[tuple[str, str]]:
+        """Pair the torrent's video and subtitle paths with their Plex file names.
+
+        One video is named after the directory; several become
+        'Title (YEAR) - partN - {imdb-...}'. Subtitles are named after the
+        directory, keeping language and forced/sdh/cc tags; with several
+        videos, only ones named after one of them are kept. Sample clips
+        are left out when there is a real video beside them.
+        """
+        videos = sorted(
+            f["path"]
+            for f in torrent_info["files"]
+            if Path(f["path"]).suffix.lower() in PreloadManager.VIDEO_EXTENSIONS
+        )
+        features = [p for p in videos if not self.SAMPLE.search(Path(p).name)]
+        videos = features or videos
+        if len(videos) == 1:
+            names = {videos[0]: dirname + Path(videos[0]).suffix.lower()}
+        else:
+            base, imdb = dirname.rsplit(" ", 1)
+            names = {
+                path: f"{base} - part{i} - {imdb}{Path(path).suffix.lower()}"
+                for i, path in enumerate(videos, 1)
+            }
+
+        pairs = list(names.items())
+        taken = set(names.values())
+        for f in sorted(torrent_info["files"], key=lambda f: f["path"]):
+            name = Path(f["path"]).name
+            tags = self.SUBTITLE_TAGS.search(name)
+            if not tags:
+                continue
+            if len(videos) > 1 and not any(
+                name.startswith(Path(v).stem) for v in videos
+            ):
+                continue
+            target = f"{dirname}{tags.group(1)}.srt"
+            if target not in taken:
+                taken.add(target)
+                pairs.append((f["path"], target))
+        return pairs
+
+    @staticmethod
+    def _already_promoted(src: os.stat_result, dst: os.stat_result) -> bool:
+        """dst is src's hardlink, or the copy made when linking failed.
+
+        copy2 keeps the mtime, so a copy matches on size and mtime, the same
+        quick check backup() uses.
+        """
+        if os.path.samestat(src, dst):
+            return True
+        return src.st_size == dst.st_size and int(src.st_mtime) == int(dst.st_mtime)
+
+    def promote(self, torrent_info: dict, dirname: str) -> tuple[dict | None, str]:
+        """Link the torrent's files into the library. Returns (record, reason if it failed)."""
+        pairs = self.plan(torrent_info, dirname)
+        if not pairs:
+            return None, "torrent contains no video files"
+        lengths = {f["path"]: f["length"] for f in torrent_info["files"]}
+        target_dir = Path(self.media_dir) / self.section / dirname
+
+        # Check everything before linking anything, so a failure leaves no partial title.
+        for rel, name in pairs:
+            src, dst = self._data_path(torrent_info, rel), target_dir / name
+            try:
+                st = src.stat()
+            except OSError as e:
+                return None, f"cannot read {src}: {e.strerror}"
+            if st.st_size != lengths[rel]:
+                return None, f"{src} is {st.st_size} bytes, expected {lengths[rel]}"
+            if dst.exists() and not self._already_promoted(st, dst.stat()):
+                return None, f"{dst} already exists"
+
+        import shutil
+
+        target_dir.mkdir(parents=True, exist_ok=True)
+        copied = []
+        for rel, name in pairs:
+            src, dst = self._data_path(torrent_info, rel), target_dir / name
+            if dst.exists():
+                continue
+            tmp = dst.with_name(f".{dst.name}.route23-link")
+            tmp.unlink(missing_ok=True)
+            try:
+                try:
+                    os.link(src, tmp)
+                except OSError as e:
+                    logger.debug(f"Promote: could not hardlink {src} — {e}")
+                    shutil.copy2(src, tmp)
+                    copied.append(name)
+                os.replace(tmp, dst)
+            except OSError as e:
+                tmp.unlink(missing_ok=True)
+                return None, f"could not create {dst}: {e}"
+            logger.info(f"Promote: {rel} → {self.section}/{dirname}/{name}")
+        if copied:
+            logger.warning(
+                f"Promote: copied {len(copied)} file(s) instead of hardlinking — "
+                f"DOWNLOAD_DIR and PLEX_MEDIA_DIR are on different filesystems or mounts"
+            )
+        return {
+            "dir": dirname,
+            "root": os.path.join(self.media_dir, self.section),
+            "files": dict(pairs),
+            "promoted_at": datetime.now().isoformat(),
+        }, ""
+
+    def library_paths(self, record: dict) -> list[str]:
+        """Paths of a promotion's files relative to PLEX_MEDIA_DIR."""
+        return [
+            f"{self.section}/{record['dir']}/{name}" for name in record["files"].values()
+        ]
+
+    def backup(self, relpaths: list[str]) -> dict:
+        """Copy the given library files to BACKUP_MEDIA_DIR, skipping ones already there.
+
+        A backup copy with the same size and mtime counts as current, like
+        rsync's quick check, so repeated runs only touch what changed.
+        """
+        import shutil
+
+        stats = {"copied": 0, "current": 0, "failed": 0, "bytes": 0}
+        for rel in relpaths:
+            src = Path(self.media_dir) / rel
+            dst = Path(self.backup_dir) / rel
+            try:
+                st = src.stat()
+                try:
+                    bst = dst.stat()
+                    if bst.st_size == st.st_size and int(bst.st_mtime) == int(st.st_mtime):
+                        stats["current"] += 1
+                        continue
+                except FileNotFoundError:
+                    pass
+                dst.parent.mkdir(parents=True, exist_ok=True)
+                tmp = dst.with_name(f".{dst.name}.route23-tmp")
+                shutil.copy2(src, tmp)
+                os.replace(tmp, dst)
+            except OSError as e:
+                logger.error(f"Backup: could not copy {rel} — {e}")
+                stats["failed"] += 1
+                continue
+            stats["copied"] += 1
+            stats["bytes"] += st.st_size
+        return stats
+
+
+class PermissionFixer:
+    """Sets owner and mode across a tree, touching only entries that differ.
+
+    The tree is walked a directory level at a time, each level's
+    directories spread over PERM_WORKERS threads. Entries are compared using
+    the lstat that os.scandir's DirEntry caches, and chown/chmod is called
+    only on a mismatch. Symlinks are left alone. Each directory's mtime
+    and subdirectory names are saved to MANIFEST_NAME in the root. An
+    incremental run lists only directories whose mtime moved since: adding,
+    removing or renaming an entry (which is how files arrive from rsync or a
+    torrent client) always changes it. Unchanged directories get a single
+    lstat to check them and find their subdirectories.
+    """
+
+    MANIFEST_NAME = ".route23-permissions.json"
+    MANIFEST_VERSION = 1
+
+    def __init__(self, config: dict, root: str):
+        """Raises ValueError for a mode that isn't octal or an unknown user or group."""
+        self.root = root.rstrip("/") or "/"
+        self.workers = max(1, config.get("perm_workers", 8))
+        self.dir_mode = self._parse_mode(config.get("perm_dir_mode", "755"))
+        self.file_mode = self._parse_mode(config.get("perm_file_mode", "644"))
+        self.owner = config.get("perm_owner", "")
+        self.uid, self.gid = self._resolve_owner(self.owner)
+        self.incremental = config.get("perm_incremental", True)
+        self._previous: dict[str, list] = {}
+
+    @staticmethod
+    def _parse_mode(mode: str) -> int:
+        try:
+            value = int(mode, 8)
+        except ValueError:
+            value = -1
+        if not 0 <= value <= 0o7777:
+            raise ValueError(f"'{mode}' is not an octal mode")
+        return value
+
+    @staticmethod
+    def _resolve_owner(owner: str) -> tuple[int | None, int | None]:
+        """'user:group', 'user' (their primary group) or numeric ids; '' leaves ownership alone."""
+        if not owner:
+            return None, None
+        import grp
+        import pwd
+
+        user, _, group = owner.partition(":")
+        try:
+            if user.isdigit():
+                uid, gid = int(user), None
+            else:
+                entry = pwd.getpwnam(user)
+                uid, gid = entry.pw_uid, entry.pw_gid
+            if group:
+                gid = int(group) if group.isdigit() else grp.getgrnam(group).gr_gid
+            if gid is None:
+                gid = pwd.getpwuid(uid).pw_gid
+        except KeyError as e:
+            raise ValueError(f"unknown owner '{owner}': {e.args[0]}") from None
+        return uid, gid
+
+    def _settings(self) -> dict:
+        return {
+            "owner": [self.uid, self.gid],
+            "dir_mode": oct(self.dir_mode),
+            "file_mode": oct(self.file_mode),
+        }
+
+    def _path(self, rel: str) -> str:
+        return os.path.join(self.root, rel) if rel else self.root
+
+    def _fix(self, path: str, st: os.stat_result, stats: Counter) -> bool:
+        """chown/chmod path if it differs from what is wanted. False if a change failed."""
+        want = self.dir_mode if stat.S_ISDIR(st.st_mode) else self.file_mode
+        stats["checked"] += 1
+        try:
+            if self.uid is not None and (st.st_uid != self.uid or st.st_gid != self.gid):
+                os.chown(path, self.uid, self.gid, follow_symlinks=False)
+                stats["chowned"] += 1
+            if stat.S_IMODE(st.st_mode) != want:
+                os.chmod(path, want)
+                stats["chmodded"] += 1
+        except OSError as e:
+            logger.warning(f"Permissions: {path}: {e.strerror}")
+            stats["failed"] += 1
+            return False
+        return True
+
+    def _visit(
+        self, item: tuple[str, os.stat_result]
+    ) -> tuple[list[tuple[str, os.stat_result]], list | None, Counter]:
+        """Fix one directory and its files. Returns (subdirs, manifest record, stats).
+
+        The record is None if a file could not be fixed, so the directory is
+        listed again next run.
+        """
+        rel, st = item
+        stats = Counter()
+        path = self._path(rel)
+        self._fix(path, st, stats)
+
+        previous = self._previous.get(rel)
+        if previous and previous[0] == st.st_mtime_ns:
+            stats["dirs_skipped"] += 1
+            subdirs = []
+            for name in previous[1]:
+                sub = os.path.join(rel, name) if rel else name
+                try:
+                    sub_st = os.lstat(self._path(sub))
+                except OSError:
+                    continue
+                if stat.S_ISDIR(sub_st.st_mode):
+                    subdirs.append((sub, sub_st))
+            return subdirs, previous, stats
+
+        stats["dirs_listed"] += 1
+        subdirs, ok = [], True
+        try:
+            with os.scandir(path) as it:
+                for entry in it:
+                    if entry.is_symlink():
+                        continue
+                    entry_st = entry.stat(follow_symlinks=False)
+                    if stat.S_ISDIR(entry_st.st_mode):
+                        sub = os.path.join(rel, entry.name) if rel else entry.name
+                        subdirs.append((sub, entry_st))
+                    elif stat.S_ISREG(entry_st.st_mode):
+                        ok = self._fix(entry.path, entry_st, stats) and ok
+        except OSError as e:
+            logger.warning(f"Permissions: could not list {path}: {e.strerror}")
+            stats["failed"] += 1
+            return [], None, stats
+        record = [st.st_mtime_ns, sorted(os.path.basename(s) for s, _ in subdirs)]
+        return subdirs, record if ok else None, stats
+
+    def _load_manifest(self):
+        self._previous = {}
+        if not self.incremental:
+            return
+        try:
+            with open(os.path.join(self.root, self.MANIFEST_NAME)) as f:
+                manifest = json.load(f)
+        except (OSError, ValueError):
+            return
+        if (
+            manifest.get("version") == self.MANIFEST_VERSION
+            and manifest.get("settings") == self._settings()
+        ):
+            self._previous = manifest.get("dirs", {})
+
+    def _write_manifest(self, dirs: dict):
+        path = os.path.join(self.root, self.MANIFEST_NAME)
+        tmp = os.path.join(self.root, f".{self.MANIFEST_NAME}.tmp")
+        try:
+            with open(tmp, "w") as f:
+                json.dump(
+                    {
+                        "version": self.MANIFEST_VERSION,
+                        "generated": datetime.now().isoformat(),
+                        "settings": self._settings(),
+                        "dirs": dirs,
+                    },
+                    f,
+                    separators=(",", ":"),
+                )
+            if self.uid is not None:
+                os.chown(tmp, self.uid, self.gid)
+            os.chmod(tmp, self.file_mode)
+            os.replace(tmp, path)
+        except OSError as e:
+            logger.warning(f"Permissions: could not write manifest {path}: {e}")
+
+    def run(self) -> dict:
+        start = time.perf_counter()
+        try:
+            root_st = os.lstat(self.root)
+        except OSError as e:
+            return {"root": self.root, "error": e.strerror}
+        if not stat.S_ISDIR(root_st.st_mode):
+            return {"root": self.root, "error": "not a directory"}
+        self._load_manifest()
+        incremental = bool(self._previous)
+
+        from concurrent.futures import ThreadPoolExecutor
+
+        totals, dirs = Counter(), {}
+        level = [("", root_st)]
+        with ThreadPoolExecutor(max_workers=self.workers) as pool:
+            while level:
+                next_level = []
+                for (rel, _), (subdirs, record, stats) in zip(
+                    level, pool.map(self._visit, level)
+                ):
+                    totals.update(stats)
+                    if record is not None:
+                        dirs[rel] = record
+                    next_level += subdirs
+                level = next_level
+        self._write_manifest(dirs)
+        return {
+            "root": self.root,
+            "incremental": incremental,
+            "owner": self.owner or None,
+            "dir_mode": oct(self.dir_mode)[2:],
+            "file_mode": oct(self.file_mode)[2:],
+            **{
+                key: totals[key]
+                for key in (
+                    "dirs_listed",
+                    "dirs_skipped",
+                    "checked",
+                    "chowned",
+                    "chmodded",
+                    "failed",
+                )
+            },
+            "seconds": round(time.perf_counter() - start, 3),
+        }
+
+
+class MailOutbox:
+    """On-disk spool of outgoing emails, delivered by a background thread.
+
+    Each message is written atomically to route23_outbox/ next to the state
+    file and removed only once the relay has accepted it, so a postfix
+    outage delays reports instead of dropping them; whatever is left is sent
+    by the next run. Everything queued goes out over one SMTP connection.
+    Failed attempts back off from 30 seconds to 30 minutes. The spool is
+    capped at MAIL_SPOOL_MAX messages, dropping the oldest beyond that.
+    Messages the relay rejects permanently (5xx) are moved to failed/.
+    """
+
+    RETRY_MIN = 30.0
+    RETRY_MAX = 1800.0
+
+    def __init__(self, config: dict):
+        self.spool_dir = Path(config["state_file"]).with_name("route23_outbox")
+        self.smtp_host = config["smtp_server"]
+        self.smtp_port = config["smtp_port"]
+        self.max_messages = config["mail_spool_max"]
+        self._lock = threading.Lock()
+        self._thread: threading.Thread | None = None
+        self._wake = threading.Event()
+        self._backoff = 0.0
+
+    def pending(self) -> list[Path]:
+        """Spooled messages, oldest first."""
+        try:
+            return sorted(self.spool_dir.glob("*.msg"))
+        except OSError:
+            return []
+
+    @property
+    def pending_count(self) -> int:
+        return len(self.pending())
+
+    def put(self, from_addr: str, to_addrs: list[str], message: str):
+        """Write a message to the spool and make sure the sender is running."""
+        self.spool_dir.mkdir(parents=True, exist_ok=True)
+        name = f"{time.time_ns()}.msg"
+        tmp = self.spool_dir / f".{name}.tmp"
+        with open(tmp, "w") as f:
+            json.dump(
+                {"from": from_addr, "to": to_addrs, "queued_at": time.time(), "message": message},
+                f,
+            )
+        os.replace(tmp, self.spool_dir / name)
+
+        spooled = self.pending()
+        for path in spooled[: max(0, len(spooled) - self.max_messages)]:
+            logger.error(f"Notifications: outbox full, dropping oldest message {path.name}")
+            path.unlink(missing_ok=True)
+        self._ensure_thread()
+
+    def resume(self):
+        """Start delivering messages left in the spool by an earlier run."""
+        count = self.pending_count
+        if count:
+            logger.info(f"Notifications: resuming delivery of {count} spooled message(s)")
+            self._ensure_thread()
+
+    def _ensure_thread(self):
+        with self._lock:
+            if self._thread is not None:
+                # A new message cuts a retry wait short.
+                self._wake.set()
+                return
+            self._thread = threading.Thread(
+                target=self._run, name="route23-mailer", daemon=True
+            )
+            self._thread.start()
+
+    def drain(self, timeout: float | None = None) -> bool:
+        """Wait up to timeout for the spool to empty. Returns False if mail is left over.
+
+        Gives up straight away while backing off after a failed attempt; the
+        messages stay spooled for the next run.
+        """
+        deadline = time.monotonic() + (timeout if timeout is not None else float("inf"))
+        thread = self._thread
+        while thread and thread.is_alive() and not self._backoff:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            thread.join(min(remaining, 0.5))
+        count = self.pending_count
+        if count:
+            logger.warning(
+                f"Notifications: {count} message(s) left in {self.spool_dir} "
+                f"for the next run"
+            )
+        return count == 0
+
+    def _run(self):
+        while True:
+            with self._lock:
+                batch = self.pending()
+                if not batch:
+                    self._thread = None
+                    return
+                self._wake.clear()
+
+            if self._send(batch):
+                self._backoff = 0.0
+                continue
+            self._backoff = min(max(self._backoff * 2, self.RETRY_MIN), self.RETRY_MAX)
+            logger.warning(
+                f"Notifications: {len(batch)} message(s) spooled, "
+                f"retrying in {self._backoff:.0f}s"
+            )
+            self._wake.wait(self._backoff)
+
+    def _send(self, batch: list[Path]) -> bool:
+        """Deliver batch over one connection.
+
+        False if the relay could not be reached or a message is left for a
+        retry: refused with a temporary 4xx, or held by another process.
+        A daemon and one-off containers share the spool, so each message is
+        claimed with flock before it is sent.
+        """
+        import smtplib
+
+        retry = False
+        try:
+            with smtplib.SMTP(self.smtp_host, self.smtp_port, timeout=10) as server:
+                for path in batch:
+                    try:
+                        f = open(path, "r")
+                    except FileNotFoundError:
+                        continue
+                    with f:
+                        try:
+                            fcntl.flock(f, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                        except BlockingIOError:
+                            retry = True
+                            continue
+                        try:
+                            if os.stat(path).st_ino != os.fstat(f.fileno()).st_ino:
+                                continue
+                        except FileNotFoundError:
+                            # Delivered by whoever held the lock.
+                            continue
+                        if not self._deliver(server, path, f):
+                            retry = True
+            return not retry
+        except (OSError, smtplib.SMTPException) as e:
+            logger.error(f"Notifications: could not reach {self.smtp_host}:{self.smtp_port} — {e}")
+            return False
+
+    def _deliver(self, server, path: Path, f) -> bool:
+        """Send one claimed message. False if the relay refused it for now (4xx)."""
+        import smtplib
+
+        try:
+            item = json.load(f)
+            server.sendmail(item["from"], item["to"], item["message"])
+        except (ValueError, KeyError) as e:
+            self._set_aside(path, e)
+            return True
+        except smtplib.SMTPRecipientsRefused as e:
+            if all(code >= 500 for code, _ in e.recipients.values()):
+                self._set_aside(path, e)
+                return True
+            logger.warning(f"Notifications: {path.name} deferred by the relay — {e}")
+            return False
+        except smtplib.SMTPResponseException as e:
+            # SMTPSenderRefused, SMTPDataError: the connection is still usable.
+            if e.smtp_code >= 500:
+                self._set_aside(path, e)
+                return True
+            logger.warning(f"Notifications: {path.name} deferred by the relay — {e}")
+            return False
+        path.unlink(missing_ok=True)
+        logger.info(f"Notifications: delivered {path.name} to {', '.join(item['to'])}")
+        return True
+
+    def _set_aside(self, path: Path, error: Exception):
+        """Move a message retrying will never deliver to failed/, for inspection."""
+        logger.error(f"Notifications: cannot deliver {path.name}, moved to failed/ — {error}")
+        failed = self.spool_dir / "failed"
+        failed.mkdir(exist_ok=True)
+        os.replace(path, failed / path.name)
+
+
+class NotificationQueue:
+    """Collects preload results during a rotation and sends one digest email at the end."""
+
+    def __init__(self, config: dict):
+        self.config = config
+        self._results: list[PreloadResult] = []
+        self.outbox = MailOutbox(config)
+
+    def add(self, result: PreloadResult):
+        self._results.append(result)
+
+    def flush(self):
+        """Spool the digest for background delivery and clear the queue.
+
+        Returns as soon as the message is on disk; MailOutbox does the SMTP
+        work, so a slow or down relay never holds up a rotation.
+        """
+        if not self._results:
+            return
+
+        to_email = self.config.get("notify_email", "")
+        if not to_email:
+            logger.debug(
+                "Notifications: NOTIFY_EMAIL not set, skipping digest"
+            )
+            self._results.clear()
+            return
+
+        from_email = self.config["from_email"]
+        server_name = self.config["server_name"]
+
+        successes = [r for r in self._results if r.success]
+        failures = [r for r in self._results if not r.success]
+
+        subject = f"[Route23] Preload Report — {len(successes)} matched, {len(failures)} missed"
+        html = self._build_html(successes, failures, server_name)
+
+        from email.mime.multipart import MIMEMultipart
+        from email.mime.text import MIMEText
+
+        msg = MIMEMultipart("alternative")
+        msg["From"] = from_email
+        msg["To"] = to_email
+        msg["Subject"] = subject
+        msg.attach(MIMEText(html, "html"))
+
+        try:
+            self.outbox.put(from_email, [to_email], msg.as_string())
+            logger.info(
+                f"Notifications: digest queued for {to_email} "
+                f"({len(successes)} preloaded, {len(failures)} missed)"
+            )
+        except OSError as e:
+            logger.error(f"Notifications: could not spool digest — {e}")
+        finally:
+            self._results.clear()
+
+    def _build_html(
+        self,
+        successes: list[PreloadResult],
+        failures: list[PreloadResult],
+        server_name: str,
+    ) -> str:
+        timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+
+        def success_item(r: PreloadResult) -> str:
+            total = _format_size(r.total_bytes())
+            files_html = "".join(
+                f'<div class="file-row">'
+                f'{f["name"]}<span class="file-size">{_format_size(f["size"])}</span>'
+                f"</div>"
+                for f in r.staged_files
+            )
+            return (
+                f'<div class="item">'
+                f'<div class="item-name">{r.torrent_name}</div>'
+                f'<div class="item-meta">Matched: {r.remote_dir} &nbsp;·&nbsp; '
+                f"{len(r.staged_files)} file(s) &nbsp;·&nbsp; {total}</div>"
+                f"{files_html}"
+                f"</div>"
+            )
+
+        def failure_item(r: PreloadResult) -> str:
+            remote = (
+                f'<div class="item-meta">Remote: {r.remote_dir}</div>'
+                if r.remote_dir
+                else ""
+            )
+            return (
+                f'<div class="item item-fail">'
+                f'<div class="item-name">{r.torrent_name}</div>'
+                f"{remote}"
+                f'<div class="reason">{r.reason}</div>'
+                f"</div>"
+            )
+
+        success_html = ""
+        if successes:
+            items = "".join(success_item(r) for r in successes)
+            success_html = f'<div class="section-title">&#10003; Successfully Preloaded</div>{items}'
+
+        failure_html = ""
+        if failures:
+            items = "".join(failure_item(r) for r in failures)
+            failure_html = f'<div class="section-title">&#10007; No Match Found</div>{items}'
+
+        return f"""<!DOCTYPE html>
+<html>
+<head>
+  <meta charset="utf-8" />
+  <style>
+    body{{font-family:system-ui,-apple-system,BlinkMacSystemFont,"Segoe UI",sans-serif;background-color:#0f172a;color:#e5e7eb;padding:24px;margin:0}}
+    .card{{max-width:680px;margin:0 auto;background:radial-gradient(circle at top left,#1e293b,#020617);border-radius:16px;border:1px solid #1f2933;box-shadow:0 18px 45px rgba(0,0,0,.65);overflow:hidden}}
+    .header{{padding:20px 24px 16px;border-bottom:1px solid rgba(148,163,184,.25)}}
+    .badge{{font-size:11px;letter-spacing:.08em;text-transform:uppercase;padding:4px 10px;border-radius:999px;background-color:rgba(15,23,42,.85);border:1px solid rgba(148,163,184,.4);color:#cbd5f5;display:inline-block;margin-bottom:8px}}
+    h1{{margin:0 0 2px;font-size:20px;font-weight:600;color:#e5e7eb}}
     .subtitle{{font-size:12px;color:#9ca3af}}
     .content{{padding:20px 24px}}
     .summary{{display:flex;gap:16px;margin-bottom:20px}}
@@ -669,775 +3423,4589 @@ class NotificationQueue:
 </html>"""
 
 
-class TorrentRotator:
-    def __init__(self, config: dict, preloader: PreloadManager | None = None):
-        self.config = config
-        self.state = self.load_state()
-        self.rtorrent = xmlrpc.client.ServerProxy(config["rtorrent_url"])
-        self.preloader = preloader
-        self.notifier = NotificationQueue(config)
+def _set_thread_idle_io():
+    """Drop the calling thread to idle I/O priority and lowest CPU priority (Linux only).
+
+    ioprio_set has no libc wrapper, so it is called through syscall(2).
+    Failure is harmless: deletion simply runs at normal priority.
+    """
+    syscall_numbers = {
+        "x86_64": 251,
+        "i386": 289,
+        "i686": 289,
+        "aarch64": 30,
+        "armv7l": 314,
+        "armv6l": 314,
+        "riscv64": 30,
+    }
+    ioprio_class_idle, ioprio_class_shift, ioprio_who_process = 3, 13, 1
+    try:
+        import ctypes
+        import platform
+
+        nr = syscall_numbers.get(platform.machine())
+        if nr is not None:
+            libc = ctypes.CDLL(None, use_errno=True)
+            libc.syscall(
+                nr, ioprio_who_process, 0, ioprio_class_idle << ioprio_class_shift
+            )
+        os.setpriority(os.PRIO_PROCESS, threading.get_native_id(), 19)
+    except Exception as e:
+        logger.debug(f"Deletion: could not lower thread priority — {e}")
 
-    def find_rtorrent_hash(
-        self, torrent_name: str, retries: int = 6
-    ) -> str | None:
-        """Find the rtorrent info hash for a torrent by its name, with retries."""
-        for attempt in range(retries):
-            for h in self.get_active_torrents():
-                try:
-                    if self.rtorrent.d.name(h) == torrent_name:
-                        return h
-                except Exception:
-                    pass
-            if attempt < retries - 1:
-                time.sleep(3)
-        return None
 
-    def trigger_hash_check(self, info_hash: str):
-        """Ask rtorrent to recheck a torrent's files against what's on disk."""
-        try:
-            self.rtorrent.d.check_hash(info_hash)
-            logger.info(f"Preload: triggered hash check for {info_hash[:8]}")
-        except Exception as e:
-            logger.error(f"Preload: hash check failed — {e}")
+class DeletionWorker:
+    """Deletes removed torrents' data on a background thread at idle I/O priority.
 
-    def wait_for_hash_check(self, info_hash: str, timeout: int = 600) -> bool:
-        """Block until rtorrent finishes hashing this torrent. Returns True if it finished."""
-        time.sleep(2)
-        deadline = time.time() + timeout
-        while time.time() < deadline:
-            try:
-                if int(self.rtorrent.d.hashing(info_hash)) == 0:
-                    return True
-            except Exception as e:
-                logger.warning(
-                    f"Hash check poll failed for {info_hash[:8]} — {e}"
-                )
-                return False
-            time.sleep(3)
-        logger.warning(
-            f"Hash check did not finish within {timeout}s for {info_hash[:8]}"
+    Paths are first renamed into a trash directory inside DOWNLOAD_DIR (an
+    instant metadata operation), so removals return immediately and a
+    re-added torrent never sees stale files. Large files are shrunk with
+    repeated truncates before the final unlink so the filesystem frees
+    extents gradually instead of in one long stall. Pending work is kept in
+    a journal next to the state file and resumed by the next run.
+    """
+
+    def __init__(self, config: dict):
+        self.trash_dir = Path(config["download_dir"]) / ".route23-trash"
+        self.journal_path = Path(config["state_file"]).with_name(
+            "route23_deletions.json"
         )
-        return False
+        self.chunk_bytes = config["delete_chunk_mb"] * 1024 * 1024
+        self.chunk_pause = config["delete_chunk_pause"]
+        self._lock = threading.Lock()
+        self._thread: threading.Thread | None = None
+        self._journal = self._load_journal()
+
+    def _load_journal(self) -> dict:
+        if self.journal_path.exists():
+            try:
+                with open(self.journal_path, "r") as f:
+                    journal = json.load(f)
+                journal.setdefault("pending", [])
+                journal.setdefault("reclaimed_bytes", 0)
+                return journal
+            except (OSError, ValueError) as e:
+                logger.warning(f"Deletion: unreadable journal, starting fresh — {e}")
+        return {"pending": [], "reclaimed_bytes": 0}
+
+    def _save_journal(self):
+        """Write the journal atomically. Caller holds the lock."""
+        self.journal_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.journal_path.with_suffix(".tmp")
+        with open(tmp, "w") as f:
+            json.dump(self._journal, f, indent=2)
+        os.replace(tmp, self.journal_path)
+
+    @property
+    def pending_count(self) -> int:
+        with self._lock:
+            return len(self._journal["pending"])
+
+    @property
+    def reclaimed_bytes(self) -> int:
+        with self._lock:
+            return self._journal["reclaimed_bytes"]
+
+    def pending_bytes(self) -> int:
+        """Bytes still waiting to be freed by queued deletions."""
+        with self._lock:
+            paths = [item["path"] for item in self._journal["pending"]]
+        return sum(_tree_size(Path(p)) for p in paths)
+
+    def enqueue(self, path: str):
+        """Move path out of the way and queue it for background deletion."""
+        p = Path(path)
+        if not p.exists():
+            logger.debug(f"Nothing to delete, path does not exist: {path}")
+            return
 
-    def verify_preload_data(self, info_hash: str, torrent_name: str) -> int:
-        """Wait for hash-check completion. If 0%, stop the torrent so it's visibly broken.
+        target = p
+        try:
+            self.trash_dir.mkdir(parents=True, exist_ok=True)
+            target = self.trash_dir / f"{time.time_ns()}-{p.name}"
+            os.rename(p, target)
+        except OSError as e:
+            # Different filesystem or permissions — delete it where it is.
+            logger.debug(f"Deletion: could not move {path} to trash — {e}")
+            target = p
+
+        with self._lock:
+            self._journal["pending"].append(
+                {"path": str(target), "original": path, "queued_at": time.time()}
+            )
+            self._save_journal()
+        logger.info(f"Queued for background deletion: {path}")
+        self._ensure_thread()
+
+    def resume(self):
+        """Start working through deletions left in the journal by an earlier run."""
+        if self.pending_count:
+            logger.info(
+                f"Deletion: resuming {self.pending_count} pending deletion(s)"
+            )
+            self._ensure_thread()
+
+    def _ensure_thread(self):
+        with self._lock:
+            if self._thread is not None:
+                return
+            self._thread = threading.Thread(
+                target=self._run, name="route23-deleter", daemon=True
+            )
+            self._thread.start()
+
+    def drain(self, timeout: float | None = None) -> bool:
+        """Block until every queued deletion has finished. Returns False on timeout."""
+        thread = self._thread
+        if not thread or not thread.is_alive():
+            return self.pending_count == 0
+        count = self.pending_count
+        if count:
+            logger.info(f"Waiting for {count} background deletion(s) to finish...")
+        thread.join(timeout)
+        return not thread.is_alive()
+
+    def _run(self):
+        _set_thread_idle_io()
+        while True:
+            with self._lock:
+                if not self._journal["pending"]:
+                    self._thread = None
+                    return
+                item = self._journal["pending"][0]
+
+            reclaimed = self._delete_tree(Path(item["path"]))
+            with self._lock:
+                self._journal["pending"].pop(0)
+                self._journal["reclaimed_bytes"] += reclaimed
+                self._save_journal()
+            METRICS.inc("route23_deleted_bytes_total", reclaimed)
+            logger.info(
+                f"Deleted {item.get('original', item['path'])} "
+                f"({_format_size(reclaimed)} reclaimed)"
+            )
+
+    def _delete_tree(self, root: Path) -> int:
+        if not root.exists() and not root.is_symlink():
+            return 0
+        if root.is_file() or root.is_symlink():
+            return self._delete_file(root)
+
+        reclaimed = 0
+        for dirpath, dirnames, filenames in os.walk(root, topdown=False):
+            for fname in filenames:
+                reclaimed += self._delete_file(Path(dirpath) / fname)
+            for dname in dirnames:
+                try:
+                    os.rmdir(os.path.join(dirpath, dname))
+                except OSError as e:
+                    logger.error(f"Failed to delete {dname}: {e}")
+        try:
+            os.rmdir(root)
+        except OSError as e:
+            logger.error(f"Failed to delete {root}: {e}")
+        return reclaimed
+
+    def _delete_file(self, path: Path) -> int:
+        try:
+            st = path.lstat()
+        except OSError:
+            return 0
+        # Hardlinked data is still in use elsewhere; truncating would destroy it.
+        size = st.st_size if st.st_nlink <= 1 else 0
+        try:
+            if size > self.chunk_bytes and not path.is_symlink():
+                remaining = size
+                while remaining > self.chunk_bytes:
+                    remaining -= self.chunk_bytes
+                    os.truncate(path, remaining)
+                    if self.chunk_pause > 0:
+                        time.sleep(self.chunk_pause)
+            path.unlink()
+        except OSError as e:
+            logger.error(f"Failed to delete {path}: {e}")
+            return 0
+        return size
+
+
+def _tree_size(root: Path) -> int:
+    """Total size of the files under root (or of root itself if it is a file)."""
+    try:
+        if root.is_file():
+            return root.stat().st_size
+    except OSError:
+        return 0
+    total = 0
+    for dirpath, _, filenames in os.walk(root):
+        for fname in filenames:
+            try:
+                total += os.lstat(os.path.join(dirpath, fname)).st_size
+            except OSError:
+                continue
+    return total
+
+
+class TorrentMetadataCache:
+    """Per-file torrent metadata (name, total size, file count, info hash) kept on disk.
+
+    Entries are keyed by path and revalidated by mtime and file size, so a
+    library is only parsed once and later runs read sizes without
+    bdecoding every .torrent again.
+    """
+
+    def __init__(self, config: dict):
+        self.path = Path(config["state_file"]).with_name("route23_metadata.json")
+        self._entries: dict[str, dict] | None = None
+        self._dirty = False
+
+    def _load(self) -> dict[str, dict]:
+        if self._entries is None:
+            self._entries = {}
+            if self.path.exists():
+                try:
+                    with open(self.path, "r") as f:
+                        self._entries = json.load(f)
+                except (OSError, ValueError) as e:
+                    logger.warning(f"Metadata cache unreadable, rebuilding — {e}")
+        return self._entries
+
+    def get(self, torrent_path: str) -> dict | None:
+        """Return cached metadata for a .torrent file, parsing it if new or changed."""
+        entries = self._load()
+        try:
+            st = os.stat(torrent_path)
+        except OSError:
+            return None
+
+        entry = entries.get(torrent_path)
+        if (
+            entry
+            and entry["mtime"] == st.st_mtime
+            and entry["fsize"] == st.st_size
+        ):
+            return entry
 
-        Returns bytes_done. Catches the 'preload staged wrong bytes' case where SCP
-        succeeded but the data doesn't match the torrent's pieces (e.g. same size,
-        different encode), which would otherwise leave the torrent silently started
-        with no usable data.
-        """
-        self.wait_for_hash_check(info_hash)
         try:
-            done = int(self.rtorrent.d.bytes_done(info_hash))
-            total = int(self.rtorrent.d.size_bytes(info_hash))
+            with open(torrent_path, "rb") as f:
+                data = f.read()
+            info = parse_torrent(torrent_path)
+            info_hash = torrent_info_hash(data)
         except Exception as e:
-            logger.warning(
-                f"Preload verify: could not read bytes for {info_hash[:8]} — {e}"
+            logger.warning(f"Could not parse {Path(torrent_path).name}: {e}")
+            return None
+
+        entry = {
+            "mtime": st.st_mtime,
+            "fsize": st.st_size,
+            "name": info["name"],
+            "total_size": sum(f["length"] for f in info["files"]),
+            "file_count": len(info["files"]),
+            "info_hash": info_hash,
+        }
+        entries[torrent_path] = entry
+        self._dirty = True
+        return entry
+
+    def total_size(self, torrent_path: str) -> int | None:
+        entry = self.get(torrent_path)
+        return entry["total_size"] if entry else None
+
+    def save(self):
+        if not self._dirty or self._entries is None:
+            return
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.path.with_suffix(".tmp")
+        with open(tmp, "w") as f:
+            json.dump(self._entries, f)
+        os.replace(tmp, self.path)
+        self._dirty = False
+
+
+class LibraryIndex:
+    """Columnar summary of every .torrent in TORRENT_DIR for library-wide queries.
+
+    A scan parses new or changed files across a process pool, skipping piece
+    hashes, and stores one row per torrent in parallel int64 arrays (mtime,
+    file size, total size, piece length, file count), a 20-byte info hash
+    column, and offsets into a single string table of file names and torrent
+    names. The arrays are written to route23_library.idx next to the state
+    file and memory-mapped back, so totals, histograms and duplicate checks
+    over 100k torrents read a few MB of flat memory rather than 100k dicts.
+    """
+
+    MAGIC = b"R23LIB01"
+    HEADER = struct.Struct("<8sQQ")
+    COLUMNS = ("mtime_ns", "fsize", "total_size", "piece_length", "file_count")
+    # Below this many files a pool costs more to start than it saves.
+    PARALLEL_MIN = 512
+
+    def __init__(self, config: dict):
+        self.torrent_dir = config["torrent_dir"]
+        self.path = Path(config["state_file"]).with_name("route23_library.idx")
+        self.workers = config["scan_workers"] or os.cpu_count() or 1
+        self._mmap = None
+        self._clear()
+
+    def _clear(self):
+        self.count = 0
+        self.columns: dict[str, memoryview] = {}
+        self.hashes = memoryview(b"")
+        self._strings = memoryview(b"")
+        self._file_offsets = memoryview(b"").cast("q")
+        self._name_offsets = memoryview(b"").cast("q")
+
+    def load(self) -> bool:
+        """Map the saved index. False if there is none or it is unreadable."""
+        import mmap
+
+        self.close()
+        try:
+            with open(self.path, "rb") as f:
+                mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except (OSError, ValueError):
+            return False
+        try:
+            magic, count, strings_len = self.HEADER.unpack_from(mm)
+            if magic != self.MAGIC:
+                raise ValueError("bad magic")
+            expected = self.HEADER.size + count * (8 * len(self.COLUMNS) + 16 + 20) + 16
+            if len(mm) != expected + strings_len:
+                raise ValueError(f"{len(mm)} bytes, header says {expected + strings_len}")
+        except (ValueError, struct.error) as e:
+            # Checked before any view exists: mm can't close while one does.
+            logger.warning(f"Library index unreadable, rescanning — {e}")
+            mm.close()
+            return False
+        view = memoryview(mm)
+        offset = self.HEADER.size
+        columns = {}
+        for name in self.COLUMNS:
+            columns[name] = view[offset : offset + count * 8].cast("q")
+            offset += count * 8
+        file_offsets = view[offset : offset + (count + 1) * 8].cast("q")
+        offset += (count + 1) * 8
+        name_offsets = view[offset : offset + (count + 1) * 8].cast("q")
+        offset += (count + 1) * 8
+        hashes = view[offset : offset + count * 20]
+        offset += count * 20
+        strings = view[offset : offset + strings_len]
+        self._mmap = (mm, view)
+        self.count = count
+        self.columns = columns
+        self.hashes = hashes
+        self._strings = strings
+        self._file_offsets = file_offsets
+        self._name_offsets = name_offsets
+        return True
+
+    def close(self):
+        if self._mmap is None:
+            return
+        mm, view = self._mmap
+        for column in self.columns.values():
+            column.release()
+        for v in (self.hashes, self._strings, self._file_offsets, self._name_offsets):
+            v.release()
+        view.release()
+        mm.close()
+        self._mmap = None
+        self._clear()
+
+    def filename(self, row: int) -> str:
+        return bytes(
+            self._strings[self._file_offsets[row] : self._name_offsets[row]]
+        ).decode("utf-8", errors="replace")
+
+    def name(self, row: int) -> str:
+        return bytes(
+            self._strings[self._name_offsets[row] : self._file_offsets[row + 1]]
+        ).decode("utf-8", errors="replace")
+
+    def info_hash(self, row: int) -> str:
+        return self.hashes[row * 20 : row * 20 + 20].hex().upper()
+
+    def scan(self) -> dict:
+        """Bring the index up to date with TORRENT_DIR and save it.
+
+        Rows whose file mtime and size are unchanged are copied from the
+        previous index; only the rest are parsed.
+        """
+        start = time.monotonic()
+        self.load()
+        strings = bytes(self._strings)
+        known = {
+            strings[start:end].decode("utf-8", errors="replace"): (mtime_ns, fsize, i)
+            for i, (start, end, mtime_ns, fsize) in enumerate(
+                zip(
+                    self._file_offsets,
+                    self._name_offsets,
+                    self.columns.get("mtime_ns", ()),
+                    self.columns.get("fsize", ()),
+                )
             )
-            return 0
+        }
 
-        if total <= 0:
+        listing = []
+        try:
+            with os.scandir(self.torrent_dir) as entries:
+                for e in entries:
+                    if e.name.endswith(".torrent") and not e.name.startswith("."):
+                        try:
+                            st = e.stat()
+                        except OSError:
+                            continue
+                        listing.append((e.name, st.st_mtime_ns, st.st_size))
+        except OSError as e:
+            logger.error(f"Cannot scan {self.torrent_dir}: {e}")
+            return {"torrents": self.count, "parsed": 0, "reused": 0, "failed": 0, "seconds": 0.0}
+        listing.sort()
+
+        rows: list[tuple | None] = []
+        to_parse = []
+        for fname, mtime_ns, fsize in listing:
+            prev = known.get(fname)
+            if prev and prev[0] == mtime_ns and prev[1] == fsize:
+                i = prev[2]
+                rows.append(
+                    (
+                        bytes(self._strings[self._name_offsets[i] : self._file_offsets[i + 1]]),
+                        self.columns["total_size"][i],
+                        self.columns["piece_length"][i],
+                        self.columns["file_count"][i],
+                        bytes(self.hashes[i * 20 : i * 20 + 20]),
+                    )
+                )
+            else:
+                to_parse.append(len(rows))
+                rows.append(None)
+
+        paths = [os.path.join(self.torrent_dir, listing[i][0]) for i in to_parse]
+        if len(paths) >= self.PARALLEL_MIN and self.workers > 1:
+            from concurrent.futures import ProcessPoolExecutor
+
+            chunksize = max(1, len(paths) // (self.workers * 8))
+            with ProcessPoolExecutor(max_workers=self.workers) as pool:
+                parsed = list(pool.map(_scan_torrent, paths, chunksize=chunksize))
+        else:
+            parsed = [_scan_torrent(p) for p in paths]
+        for i, result in zip(to_parse, parsed):
+            rows[i] = result
+
+        failed = 0
+        from array import array
+
+        columns = {name: array("q") for name in self.COLUMNS}
+        file_offsets, name_offsets = array("q"), array("q")
+        hashes, strings = bytearray(), bytearray()
+        for (fname, mtime_ns, fsize), row in zip(listing, rows):
+            if row is None:
+                failed += 1
+                logger.warning(f"Library scan: could not parse {fname}")
+                continue
+            name, total, piece_length, file_count, digest = row
+            columns["mtime_ns"].append(mtime_ns)
+            columns["fsize"].append(fsize)
+            columns["total_size"].append(total)
+            columns["piece_length"].append(piece_length)
+            columns["file_count"].append(file_count)
+            file_offsets.append(len(strings))
+            strings += fname.encode()
+            name_offsets.append(len(strings))
+            strings += name
+            hashes += digest
+        file_offsets.append(len(strings))
+        name_offsets.append(len(strings))
+
+        self.close()
+        count = len(columns["mtime_ns"])
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.path.with_suffix(".tmp")
+        with open(tmp, "wb") as f:
+            f.write(self.HEADER.pack(self.MAGIC, count, len(strings)))
+            for name in self.COLUMNS:
+                columns[name].tofile(f)
+            file_offsets.tofile(f)
+            name_offsets.tofile(f)
+            f.write(hashes)
+            f.write(strings)
+        os.replace(tmp, self.path)
+        self.load()
+
+        stats = {
+            "torrents": count,
+            "parsed": len(paths) - failed,
+            "reused": len(listing) - len(paths),
+            "failed": failed,
+            "seconds": round(time.monotonic() - start, 3),
+        }
+        logger.info(
+            f"Library scan: {count} torrents ({stats['parsed']} parsed, "
+            f"{stats['reused']} unchanged, {failed} failed) in {stats['seconds']:.2f}s"
+        )
+        return stats
+
+    def duplicates(self) -> dict[str, list[list[str]]]:
+        """Torrent files sharing an info hash, and distinct torrents with the same name and size."""
+        hashes = bytes(self.hashes)
+        digests = [hashes[o : o + 20] for o in range(0, len(hashes), 20)]
+        same_hash = {h for h, n in Counter(digests).items() if n > 1}
+        groups: dict[bytes, list[int]] = {}
+        first_rows = range(self.count)
+        if same_hash:
+            for i, h in enumerate(digests):
+                if h in same_hash:
+                    groups.setdefault(h, []).append(i)
+            extra = {i for rows in groups.values() for i in rows[1:]}
+            first_rows = [i for i in first_rows if i not in extra]
+
+        # Names are only compared between torrents whose total size collides.
+        sizes = self.columns["total_size"]
+        repeated = {size for size, n in Counter(sizes[i] for i in first_rows).items() if n > 1}
+        strings, starts, ends = bytes(self._strings), self._name_offsets, self._file_offsets
+        by_content: dict[tuple, list[int]] = {}
+        for i in first_rows:
+            size = sizes[i]
+            if size in repeated:
+                by_content.setdefault((strings[starts[i] : ends[i + 1]], size), []).append(i)
+        return {
+            "same_info_hash": [[self.filename(i) for i in rows] for rows in groups.values()],
+            "same_name_and_size": [
+                [self.filename(i) for i in rows] for rows in by_content.values() if len(rows) > 1
+            ],
+        }
+
+    def report(self, top: int = 10) -> dict:
+        """Library-wide totals, size and file-count distributions, largest torrents and duplicates."""
+        if not self.count:
+            return {"torrents": 0, "total_bytes": 0}
+        sizes = self.columns["total_size"]
+        file_counts = self.columns["file_count"]
+        ordered = sorted(sizes)
+        # Histograms count distinct values first, so per-row work stays in C.
+        size_buckets = Counter(map(int.bit_length, sizes))
+        files_hist: dict[str, int] = {}
+        for n, count in sorted(Counter(file_counts).items()):
+            bucket = str(n) if n < 10 else "10-99" if n < 100 else "100+"
+            files_hist[bucket] = files_hist.get(bucket, 0) + count
+        return {
+            "torrents": self.count,
+            "total_bytes": sum(sizes),
+            "total_files": sum(file_counts),
+            "median_bytes": ordered[len(ordered) // 2],
+            "size_histogram": {
+                f"<{_format_size(2 ** b)}": size_buckets[b] for b in sorted(size_buckets)
+            },
+            "file_count_histogram": files_hist,
+            "piece_length_histogram": {
+                _format_size(p): n
+                for p, n in sorted(Counter(self.columns["piece_length"]).items())
+            },
+            "largest": [
+                {"file": self.filename(i), "name": self.name(i), "bytes": sizes[i]}
+                for i in heapq.nlargest(top, range(self.count), key=sizes.__getitem__)
+            ],
+            "duplicates": self.duplicates(),
+        }
+
+
+class RtorrentUnavailable(Exception):
+    """rtorrent stayed unresponsive for longer than RPC_BREAKER_MAX_WAIT."""
+
+
+def _timeout_transport(url: str, timeout: float) -> "xmlrpc.client.Transport":
+    """XML-RPC transport whose connections give up after timeout seconds."""
+    import xmlrpc.client
+    from urllib.parse import urlparse
+
+    https = urlparse(url).scheme == "https"
+    base = xmlrpc.client.SafeTransport if https else xmlrpc.client.Transport
+
+    class TimeoutTransport(base):
+        def make_connection(self, host):
+            conn = super().make_connection(host)
+            conn.timeout = timeout
+            return conn
+
+    return TimeoutTransport()
+
+
+class RpcPolicy:
+    """Retry, backoff and circuit-breaker rules for rtorrent XML-RPC calls.
+
+    Failures are sorted into classes, each with its own jittered exponential
+    backoff. "trust" is rtorrent's transient -507 fault; "refused" means the
+    request never reached rtorrent and is always safe to repeat; "timeout"
+    covers dropped or stalled connections, where the call may already have
+    run, so it is only retried for read-only methods. After
+    RPC_BREAKER_THRESHOLD consecutive failures the breaker opens and every
+    caller waits out a cooldown instead of hammering an overloaded rtorrent.
+    If it stays down past RPC_BREAKER_MAX_WAIT, calls fail fast with
+    RtorrentUnavailable.
+    """
+
+    BACKOFF = {
+        "trust": (0.5, 8.0),
+        "refused": (2.0, 60.0),
+        "timeout": (2.0, 60.0),
+    }
+    NON_IDEMPOTENT = {"load.raw_start", "load.raw", "load.start", "d.erase"}
+
+    def __init__(self, config: dict):
+        self.max_attempts = max(1, config["rpc_max_attempts"])
+        self.threshold = max(1, config["rpc_breaker_threshold"])
+        self.cooldown = config["rpc_breaker_cooldown"]
+        self.max_wait = config["rpc_breaker_max_wait"]
+        self._lock = threading.Lock()
+        self._consecutive_failures = 0
+        self._open_until = 0.0
+        self._outage_started: float | None = None
+        self.tripped = False
+        self.stats = {
+            "calls": {},
+            "retries": {},
+            "errors": 0,
+            "breaker_opens": 0,
+        }
+
+    @staticmethod
+    def classify(exc: BaseException) -> str | None:
+        import http.client
+        import socket
+        import xmlrpc.client
+
+        if isinstance(exc, xmlrpc.client.Fault):
+            return "trust" if exc.faultCode == -507 else None
+        if isinstance(exc, (ConnectionRefusedError, socket.gaierror)):
+            return "refused"
+        if isinstance(exc, xmlrpc.client.ProtocolError):
+            return "timeout" if exc.errcode >= 500 else None
+        if isinstance(exc, (TimeoutError, OSError, http.client.HTTPException)):
+            return "timeout"
+        return None
+
+    @classmethod
+    def backoff_delay(cls, fault_class: str, attempt: int) -> float:
+        """Full-jitter exponential backoff for the given attempt (0-based)."""
+        base, cap = cls.BACKOFF.get(fault_class, (1.0, 30.0))
+        return random.uniform(0, min(cap, base * 2**attempt))
+
+    def _wait_for_breaker(self):
+        while True:
+            with self._lock:
+                if self.tripped:
+                    raise RtorrentUnavailable(
+                        "rtorrent unresponsive, circuit breaker tripped"
+                    )
+                remaining = self._open_until - time.monotonic()
+                if remaining <= 0:
+                    return
+                if (
+                    self._outage_started is not None
+                    and time.monotonic() - self._outage_started > self.max_wait
+                ):
+                    self.tripped = True
+                    logger.error(
+                        f"rtorrent unresponsive for over {self.max_wait:.0f}s — giving up"
+                    )
+                    continue
+            logger.debug(f"RPC circuit open, pausing {remaining:.0f}s")
+            time.sleep(min(remaining, 5.0))
+
+    def _on_success(self):
+        with self._lock:
+            if self._open_until:
+                logger.info("rtorrent responding again, circuit closed")
+            self._consecutive_failures = 0
+            self._open_until = 0.0
+            self._outage_started = None
+
+    def _on_failure(self):
+        with self._lock:
+            self.stats["errors"] += 1
+            self._consecutive_failures += 1
+            if self._consecutive_failures < self.threshold:
+                return
+            if self._outage_started is None:
+                self._outage_started = time.monotonic()
+            # Each reopening doubles the cooldown, up to four times the base.
+            reopen = self._consecutive_failures // self.threshold
+            pause = self.cooldown * min(2 ** (reopen - 1), 4)
+            self._open_until = time.monotonic() + pause
+            self.stats["breaker_opens"] += 1
+            METRICS.inc("route23_rpc_breaker_opens_total")
             logger.warning(
-                f"Preload verify: '{torrent_name}' has unknown total size"
+                f"rtorrent RPC failing ({self._consecutive_failures} in a row), "
+                f"pausing calls for {pause:.0f}s"
             )
-            return 0
 
-        pct = done * 100 / total
-        if done == 0:
-            logger.error(
-                f"Preload verify: '{torrent_name}' is 0% after hash check — "
-                f"staged data did not match torrent pieces. Stopping torrent."
-            )
+    def run(self, method: str, fn):
+        """Call fn() under the policy. method names the XML-RPC method for retry rules."""
+        calls = self.stats["calls"]
+        calls[method] = calls.get(method, 0) + 1
+        METRICS.inc("route23_rpc_calls_total", method=method)
+        attempt = 0
+        while True:
+            self._wait_for_breaker()
+            start = time.monotonic()
             try:
-                self.rtorrent.d.stop(info_hash)
+                result = fn()
             except Exception as e:
+                METRICS.observe(
+                    "route23_rpc_latency_seconds", time.monotonic() - start, method=method
+                )
+                fault_class = self.classify(e)
+                METRICS.inc("route23_rpc_errors_total", fault=fault_class or "other")
+                if fault_class is None:
+                    raise
+                self._on_failure()
+                retryable = fault_class != "timeout" or method not in self.NON_IDEMPOTENT
+                if not retryable or attempt + 1 >= self.max_attempts:
+                    raise
+                delay = self.backoff_delay(fault_class, attempt)
+                retries = self.stats["retries"]
+                retries[fault_class] = retries.get(fault_class, 0) + 1
+                METRICS.inc("route23_rpc_retries_total", fault=fault_class)
                 logger.warning(
-                    f"Preload verify: failed to stop torrent — {e}"
+                    f"RPC {method} failed ({fault_class}: {e}), "
+                    f"retry {attempt + 1}/{self.max_attempts - 1} in {delay:.1f}s"
                 )
-        elif pct < 100:
-            logger.warning(
-                f"Preload verify: '{torrent_name}' is {pct:.1f}% after hash check "
-                f"({_format_size(done)} / {_format_size(total)}) — remainder will leech"
-            )
-        else:
-            logger.info(
-                f"Preload verify: '{torrent_name}' is 100% — seeding"
+                time.sleep(delay)
+                attempt += 1
+                continue
+            METRICS.observe(
+                "route23_rpc_latency_seconds", time.monotonic() - start, method=method
             )
-        return done
+            self._on_success()
+            return result
+
+    def reset(self):
+        """Close the breaker and clear a trip so a long-running process can try again."""
+        with self._lock:
+            self._consecutive_failures = 0
+            self._open_until = 0.0
+            self._outage_started = None
+            self.tripped = False
+
+    def summary(self) -> str:
+        calls = sum(self.stats["calls"].values())
+        retries = sum(self.stats["retries"].values())
+        detail = ", ".join(f"{k}={v}" for k, v in self.stats["retries"].items())
+        return (
+            f"{calls} calls, {retries} retries"
+            + (f" ({detail})" if detail else "")
+            + f", breaker opened {self.stats['breaker_opens']} time(s)"
+        )
 
-    def get_system_load(self) -> float:
-        """Get current system load average (1 minute)."""
-        try:
-            with open("/proc/loadavg", "r") as f:
-                return float(f.read().split()[0])
-        except Exception:
-            return 0.0
 
-    def wait_for_low_load(self):
-        """Wait until system load drops below threshold."""
-        max_load = self.config["max_load"]
-        load_wait = self.config["load_wait"]
+class _RpcMethod:
+    def __init__(self, client: "RtorrentClient", name: str):
+        self._client = client
+        self._name = name
 
-        current_load = self.get_system_load()
-        while current_load > max_load:
-            logger.info(
-                f"System load {current_load:.2f} exceeds {max_load:.2f}, waiting {load_wait}s..."
-            )
-            time.sleep(load_wait)
-            current_load = self.get_system_load()
+    def __getattr__(self, attr: str) -> "_RpcMethod":
+        return _RpcMethod(self._client, f"{self._name}.{attr}")
 
-        return current_load
+    def __call__(self, *args):
+        return self._client.call(self._name, *args)
 
-    def throttled_sleep(self, seconds: float, reason: str = ""):
-        """Sleep with logging for transparency."""
-        if seconds > 0:
-            if reason:
-                logger.debug(f"Waiting {seconds}s ({reason})")
-            time.sleep(seconds)
 
-    def load_state(self) -> dict:
-        """Load state from file or create initial state."""
-        state_path = Path(self.config["state_file"])
-        if state_path.exists():
-            with open(state_path, "r") as f:
-                state = json.load(f)
-            # One-time migration: backfill seeded_this_cycle from torrent_history
-            # so existing installs don't re-seed already-processed files.
-            if "seeded_this_cycle" not in state:
-                state["seeded_this_cycle"] = [
-                    info["path"]
-                    for info in state.get("torrent_history", {}).values()
-                    if "path" in info
-                ]
-                if state["seeded_this_cycle"]:
-                    logger.info(
-                        f"Migrated {len(state['seeded_this_cycle'])} previously seeded "
-                        f"torrents into cycle tracking"
-                    )
-            return state
-        return {
-            "current_index": 0,
-            "batch_started": None,
-            "current_batch": [],
-            "completed_batches": 0,
-            "sort_seed": None,
-            "seeded_this_cycle": [],
-            "torrent_history": {},
-        }
+class RtorrentClient:
+    """ServerProxy lookalike (client.d.name(h)) that routes every call through an RpcPolicy."""
 
-    def save_state(self):
-        """Persist state to file."""
-        state_path = Path(self.config["state_file"])
-        state_path.parent.mkdir(parents=True, exist_ok=True)
-        with open(state_path, "w") as f:
-            json.dump(self.state, f, indent=2, default=str)
-        logger.info(f"State saved to {state_path}")
+    def __init__(self, url: str, policy: RpcPolicy, timeout: float = 30.0):
+        import xmlrpc.client
 
-    def get_torrent_files(self) -> list:
-        """Get list of all .torrent files ordered by SORT_ORDER."""
-        torrent_dir = Path(self.config["torrent_dir"])
-        if not torrent_dir.exists():
-            logger.error(f"Torrent directory not found: {torrent_dir}")
-            return []
+        self._proxy = xmlrpc.client.ServerProxy(
+            url, transport=_timeout_transport(url, timeout)
+        )
+        self._lock = threading.Lock()
+        self.policy = policy
 
-        sort_order = self.config["sort_order"]
-        torrents = list(torrent_dir.glob("*.torrent"))
+    @property
+    def unavailable(self) -> bool:
+        return self.policy.tripped
 
-        if sort_order == "alphabetical":
-            torrents = sorted(torrents)
-        elif sort_order == "reverse":
-            torrents = sorted(torrents, reverse=True)
-        elif sort_order == "date_added":
-            torrents = sorted(torrents, key=lambda t: t.stat().st_mtime)
-        elif sort_order == "random":
-            if self.state.get("sort_seed") is None:
-                self.state["sort_seed"] = random.randint(0, 2**32)
-            rng = random.Random(self.state["sort_seed"])
-            rng.shuffle(torrents)
-        else:
-            logger.warning(
-                f"Unknown SORT_ORDER '{sort_order}', falling back to alphabetical"
+    def call(self, method: str, *args):
+        def invoke():
+            # ServerProxy reuses one HTTP connection and is not thread-safe.
+            with self._lock:
+                return getattr(self._proxy, method)(*args)
+
+        with TRACER.span(f"rpc {method}"):
+            return self.policy.run(method, invoke)
+
+    def __getattr__(self, name: str) -> _RpcMethod:
+        if name.startswith("_"):
+            raise AttributeError(name)
+        return _RpcMethod(self, name)
+
+
+class _PoolPolicy:
+    """RpcPolicy lookalike summarizing every instance's policy in an RtorrentPool."""
+
+    def __init__(self, clients: dict[str, RtorrentClient]):
+        self._clients = clients
+
+    @property
+    def tripped(self) -> bool:
+        return all(c.policy.tripped for c in self._clients.values())
+
+    def reset(self):
+        for client in self._clients.values():
+            client.policy.reset()
+
+    def summary(self) -> str:
+        return "; ".join(
+            f"{name}: {client.policy.summary()}" for name, client in self._clients.items()
+        )
+
+
+class RtorrentPool:
+    """Several rtorrent daemons behind the RtorrentClient interface.
+
+    rtorrent is single-threaded, so one daemon runs out of CPU for peers and
+    hashing long before the disks or network do. With RTORRENT_INSTANCES
+    set, each batch torrent is loaded on the least-loaded instance (by
+    torrent count, bytes and upload rate, relative to the pool and divided
+    by the instance's weight), calls that name a torrent (d.*(info_hash))
+    go to the instance holding it, and download_list and d.multicall2 are
+    asked of every instance and concatenated. Each instance has its own
+    RpcPolicy, so one stalled daemon only trips its own breaker; tripped
+    instances are left out of fan-outs and new loads.
+    """
+
+    LOAD_METHODS = {"load.raw_start", "load.raw", "load.start", "load.normal"}
+    FAN_OUT = {"download_list", "d.multicall2"}
+    # Instance load figures are refreshed after removals or once this old.
+    LOAD_TTL = 300.0
+
+    def __init__(self, instances: list[dict], config: dict, timeout: float):
+        self.clients = {
+            spec["name"]: RtorrentClient(spec["url"], RpcPolicy(config), timeout)
+            for spec in instances
+        }
+        self.weights = {spec["name"]: spec.get("weight", 1.0) for spec in instances}
+        self.policy = _PoolPolicy(self.clients)
+        self._owner: dict[str, str] = {}
+        self._load: dict[str, dict] | None = None
+        self._load_at = 0.0
+        self._lock = threading.Lock()
+
+    @property
+    def unavailable(self) -> bool:
+        return self.policy.tripped
+
+    def _available(self) -> dict[str, RtorrentClient]:
+        clients = {n: c for n, c in self.clients.items() if not c.unavailable}
+        if not clients:
+            raise RtorrentUnavailable("every rtorrent instance is unresponsive")
+        return clients
+
+    def owner(self, info_hash: str) -> str | None:
+        """Name of the instance holding info_hash, refreshing the map if it is unknown."""
+        key = info_hash.upper()
+        if key not in self._owner:
+            self.download_list()
+        return self._owner.get(key)
+
+    def _remember(self, name: str, hashes):
+        with self._lock:
+            for h in hashes:
+                self._owner[str(h).upper()] = name
+
+    def download_list(self, *args) -> list:
+        hashes = []
+        for name, client in self._available().items():
+            listed = client.call("download_list", *args)
+            self._remember(name, listed)
+            hashes.extend(listed)
+        return hashes
+
+    def multicall_by_instance(self, *args) -> dict[str, tuple[list | None, str]]:
+        """d.multicall2 on every instance: {name: (rows, "")} or {name: (None, error)}."""
+        results = {}
+        for name, client in self.clients.items():
+            try:
+                results[name] = (client.call("d.multicall2", *args), "")
+            except Exception as e:
+                results[name] = (None, str(e))
+        return results
+
+    def _multicall(self, *args) -> list:
+        fields = list(args[2:])
+        hash_col = fields.index("d.hash=") if "d.hash=" in fields else None
+        rows = []
+        for name, client in self._available().items():
+            part = client.call("d.multicall2", *args)
+            if hash_col is not None:
+                self._remember(name, (row[hash_col] for row in part))
+            rows.extend(part)
+        return rows
+
+    def loads(self) -> dict[str, dict]:
+        """Torrent count, bytes and upload rate per available instance, cached for LOAD_TTL."""
+        with self._lock:
+            if self._load is not None and time.monotonic() - self._load_at < self.LOAD_TTL:
+                return self._load
+        loads = {}
+        for name, client in self._available().items():
+            rows = client.call("d.multicall2", "", "main", "d.hash=", "d.size_bytes=", "d.up.rate=")
+            self._remember(name, (row[0] for row in rows))
+            loads[name] = {
+                "torrents": len(rows),
+                "bytes": sum(int(row[1]) for row in rows),
+                "up_rate": sum(int(row[2]) for row in rows),
+            }
+        with self._lock:
+            self._load, self._load_at = loads, time.monotonic()
+        return loads
+
+    def pick(self) -> str:
+        """The instance that should take the next torrent."""
+        loads = self.loads()
+        totals = {
+            metric: sum(load[metric] for load in loads.values())
+            for metric in ("torrents", "bytes", "up_rate")
+        }
+
+        def score(name: str) -> float:
+            share = sum(
+                loads[name][metric] / total for metric, total in totals.items() if total
             )
-            torrents = sorted(torrents)
+            return share / self.weights.get(name, 1.0)
+
+        return min(loads, key=score)
+
+    def _load_torrent(self, method: str, *args):
+        name = self.pick()
+        result = self.clients[name].call(method, *args)
+        data = args[1] if len(args) > 1 else None
+        data = getattr(data, "data", data)
+        if isinstance(data, bytes):
+            info_hash = torrent_info_hash(data)
+            self._remember(name, [info_hash])
+            info = _bdecode_torrent(data)[b"info"]
+            size = info.get(b"length") or sum(f[b"length"] for f in info.get(b"files", []))
+            with self._lock:
+                if self._load is not None and name in self._load:
+                    self._load[name]["torrents"] += 1
+                    self._load[name]["bytes"] += size
+            logger.debug(f"Pool: loaded {info_hash} on {name}")
+        return result
+
+    def call(self, method: str, *args):
+        if method in self.LOAD_METHODS:
+            return self._load_torrent(method, *args)
+        if method == "download_list":
+            return self.download_list(*args)
+        if method == "d.multicall2":
+            return self._multicall(*args)
+        if method.startswith("d.") and args and isinstance(args[0], str) and len(args[0]) == 40:
+            name = self.owner(args[0]) or next(iter(self._available()))
+            result = self.clients[name].call(method, *args)
+            if method == "d.erase":
+                with self._lock:
+                    self._owner.pop(args[0].upper(), None)
+                    self._load = None
+            return result
+        return next(iter(self._available().values())).call(method, *args)
+
+    def __getattr__(self, name: str) -> _RpcMethod:
+        if name.startswith("_"):
+            raise AttributeError(name)
+        return _RpcMethod(self, name)
+
+
+def make_rtorrent_client(
+    config: dict, timeout: float | None = None
+) -> "RtorrentClient | RtorrentPool":
+    """An RtorrentPool if RTORRENT_INSTANCES lists several endpoints, else one RtorrentClient."""
+    timeout = config["rpc_timeout"] if timeout is None else timeout
+    instances = config.get("rtorrent_instances") or []
+    if len(instances) > 1:
+        return RtorrentPool(instances, config, timeout)
+    url = instances[0]["url"] if instances else config["rtorrent_url"]
+    return RtorrentClient(url, RpcPolicy(config), timeout)
+
+
+class SystemSampler:
+    """Samples host and rtorrent vitals into a fixed-size ring buffer file.
+
+    Everything is read straight from /proc and /sys (load, CPU, memory,
+    disk I/O, TCP connections, thermal zones) plus rtorrent's global rates
+    in a single system.multicall, so a sample costs a few file reads rather
+    than the handful of forked tools monitor.sh used to run. Each record is a
+    fixed-size struct tagged with the rotation phase in progress, and the
+    file never grows: once full, the oldest sample is overwritten.
+    """
+
+    MAGIC = b"R23S"
+    VERSION = 1
+    HEADER = struct.Struct("<4sHHIQ")
+    FIELDS = (
+        ("ts", "d"),
+        ("load1", "f"),
+        ("cpu_pct", "f"),
+        ("iowait_pct", "f"),
+        ("mem_used_pct", "f"),
+        ("swap_used_mb", "f"),
+        ("disk_read_bps", "f"),
+        ("disk_write_bps", "f"),
+        ("disk_util_pct", "f"),
+        ("tcp_established", "I"),
+        ("tcp_peers", "I"),
+        ("temp_c", "f"),
+        ("rt_up_bps", "f"),
+        ("rt_down_bps", "f"),
+        ("rt_sockets", "i"),
+        ("phase", "12s"),
+    )
+    RECORD = struct.Struct("<" + "".join(fmt for _, fmt in FIELDS))
+    RTORRENT_GLOBALS = (
+        "throttle.global_up.rate",
+        "throttle.global_down.rate",
+        "network.open_sockets",
+    )
 
-        logger.info(f"Found {len(torrents)} torrent files (sort: {sort_order})")
-        return [str(t) for t in torrents]
+    def __init__(self, config: dict):
+        import xmlrpc.client
 
-    def get_torrent_hash(self, torrent_path: str) -> str:
-        """Get info hash from a .torrent file (simplified - uses file hash)."""
-        with open(torrent_path, "rb") as f:
-            return hashlib.sha1(f.read()).hexdigest().upper()
+        self.path = Path(config["sample_file"]) if config["sample_file"] else (
+            Path(config["state_file"]).with_name("route23_samples.bin")
+        )
+        self.interval = max(1.0, config["sample_interval"])
+        self.capacity = max(1, config["sample_capacity"])
+        self.peer_port = config["sample_peer_port"]
+        self.phase = ""
+        urls = [spec["url"] for spec in config.get("rtorrent_instances") or []]
+        self._proxies = [
+            xmlrpc.client.ServerProxy(url, transport=_timeout_transport(url, 5.0))
+            for url in urls or [config["rtorrent_url"]]
+        ]
+        self._fd: int | None = None
+        self._written = 0
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+        self._prev_cpu: tuple[int, int, int] | None = None
+        self._prev_disk: tuple[float, int, int] | None = None
+        self._prev_io_ms: dict[str, int] = {}
+        self._disks = self._whole_disks()
+
+    @staticmethod
+    def _whole_disks() -> set[str]:
+        try:
+            return {
+                name
+                for name in os.listdir("/sys/block")
+                if not name.startswith(("loop", "ram", "zram", "dm-", "md"))
+            }
+        except OSError:
+            return set()
 
-    def get_active_torrents(self) -> list:
-        """Get list of currently active torrent hashes in rtorrent."""
+    def open(self) -> bool:
+        """Open (creating or resizing) the ring file and lock it. False if another sampler holds it."""
+        size = self.HEADER.size + self.capacity * self.RECORD.size
         try:
-            return self.rtorrent.download_list()
-        except Exception as e:
-            logger.error(f"Failed to get active torrents: {e}")
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644)
+        except OSError as e:
+            logger.warning(f"Sampler: cannot open {self.path} — {e}")
+            return False
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            logger.info(f"Sampler: {self.path} is in use by another sampler, not sampling")
+            os.close(fd)
+            return False
+
+        header = os.pread(fd, self.HEADER.size, 0)
+        written = 0
+        if len(header) == self.HEADER.size:
+            magic, version, record_size, capacity, written = self.HEADER.unpack(header)
+            if (magic, version, record_size, capacity) != (
+                self.MAGIC,
+                self.VERSION,
+                self.RECORD.size,
+                self.capacity,
+            ):
+                logger.info("Sampler: ring file layout changed, starting a new one")
+                written = 0
+        if written == 0:
+            os.ftruncate(fd, 0)
+        os.ftruncate(fd, size)
+        self._fd = fd
+        self._written = written
+        self._write_header()
+        return True
+
+    def _write_header(self):
+        os.pwrite(
+            self._fd,
+            self.HEADER.pack(
+                self.MAGIC, self.VERSION, self.RECORD.size, self.capacity, self._written
+            ),
+            0,
+        )
+
+    def append(self, sample: dict):
+        values = []
+        for name, fmt in self.FIELDS:
+            value = sample.get(name)
+            if fmt == "12s":
+                value = (value or "").encode()[:12]
+            elif fmt in ("I", "i"):
+                value = -1 if value is None and fmt == "i" else int(value or 0)
+            elif value is None:
+                value = float("nan")
+            values.append(value)
+        slot = self._written % self.capacity
+        os.pwrite(
+            self._fd,
+            self.RECORD.pack(*values),
+            self.HEADER.size + slot * self.RECORD.size,
+        )
+        self._written += 1
+        self._write_header()
+
+    def close(self):
+        if self._fd is not None:
+            os.close(self._fd)
+            self._fd = None
+
+    @classmethod
+    def read(cls, path: Path) -> list[dict]:
+        """Return every sample in the ring file, oldest first."""
+        with open(path, "rb") as f:
+            data = f.read()
+        if len(data) < cls.HEADER.size:
             return []
+        magic, version, record_size, capacity, written = cls.HEADER.unpack_from(data)
+        if magic != cls.MAGIC or version != cls.VERSION or record_size != cls.RECORD.size:
+            raise ValueError(f"{path} is not a route23 sample file")
+        count = min(written, capacity)
+        first = written - count
+        samples = []
+        for n in range(first, written):
+            offset = cls.HEADER.size + (n % capacity) * record_size
+            values = cls.RECORD.unpack_from(data, offset)
+            sample = {
+                name: None if value != value else value
+                for (name, _), value in zip(cls.FIELDS, values)
+            }
+            sample["phase"] = sample["phase"].rstrip(b"\0").decode()
+            if sample["rt_sockets"] < 0:
+                sample["rt_sockets"] = None
+            samples.append(sample)
+        return samples
+
+    @staticmethod
+    def _read(path: str) -> str | None:
+        try:
+            with open(path, "r") as f:
+                return f.read()
+        except OSError:
+            return None
+
+    def _cpu(self, sample: dict):
+        text = self._read("/proc/stat")
+        if not text:
+            return
+        fields = [int(v) for v in text.split("\n", 1)[0].split()[1:]]
+        total = sum(fields[:8])
+        idle, iowait = fields[3], fields[4] if len(fields) > 4 else 0
+        if self._prev_cpu:
+            d_total = total - self._prev_cpu[0]
+            if d_total > 0:
+                d_idle = idle - self._prev_cpu[1]
+                d_iowait = iowait - self._prev_cpu[2]
+                sample["cpu_pct"] = 100.0 * (d_total - d_idle - d_iowait) / d_total
+                sample["iowait_pct"] = 100.0 * d_iowait / d_total
+        self._prev_cpu = (total, idle, iowait)
+
+    def _memory(self, sample: dict):
+        text = self._read("/proc/meminfo")
+        if not text:
+            return
+        info = {}
+        for line in text.splitlines():
+            key, _, rest = line.partition(":")
+            parts = rest.split()
+            if parts:
+                info[key] = int(parts[0])
+        total = info.get("MemTotal", 0)
+        if total:
+            available = info.get("MemAvailable", info.get("MemFree", 0))
+            sample["mem_used_pct"] = 100.0 * (total - available) / total
+        sample["swap_used_mb"] = (
+            info.get("SwapTotal", 0) - info.get("SwapFree", 0)
+        ) / 1024
+
+    def _disk(self, sample: dict):
+        text = self._read("/proc/diskstats")
+        if not text:
+            return
+        read_sectors = write_sectors = 0
+        busiest = 0
+        io_ms: dict[str, int] = {}
+        for line in text.splitlines():
+            parts = line.split()
+            if len(parts) < 14 or (self._disks and parts[2] not in self._disks):
+                continue
+            read_sectors += int(parts[5])
+            write_sectors += int(parts[9])
+            io_ms[parts[2]] = int(parts[12])
+        now = time.monotonic()
+        if self._prev_disk:
+            elapsed = now - self._prev_disk[0]
+            if elapsed > 0:
+                sample["disk_read_bps"] = (read_sectors - self._prev_disk[1]) * 512 / elapsed
+                sample["disk_write_bps"] = (write_sectors - self._prev_disk[2]) * 512 / elapsed
+                for name, ms in io_ms.items():
+                    busiest = max(busiest, ms - self._prev_io_ms.get(name, ms))
+                sample["disk_util_pct"] = min(100.0, busiest / (elapsed * 10))
+        self._prev_disk = (now, read_sectors, write_sectors)
+        self._prev_io_ms = io_ms
+
+    def _tcp(self, sample: dict):
+        established = peers = 0
+        for path in ("/proc/net/tcp", "/proc/net/tcp6"):
+            text = self._read(path)
+            if not text:
+                continue
+            for line in text.splitlines()[1:]:
+                parts = line.split(None, 4)
+                if len(parts) < 4 or parts[3] != "01":
+                    continue
+                established += 1
+                if self.peer_port and int(parts[1].rsplit(":", 1)[1], 16) == self.peer_port:
+                    peers += 1
+        sample["tcp_established"] = established
+        sample["tcp_peers"] = peers if self.peer_port else established
+
+    def _thermal(self, sample: dict):
+        temps = []
+        try:
+            zones = os.listdir("/sys/class/thermal")
+        except OSError:
+            return
+        for zone in zones:
+            if zone.startswith("thermal_zone"):
+                text = self._read(f"/sys/class/thermal/{zone}/temp")
+                if text and text.strip().lstrip("-").isdigit():
+                    temps.append(int(text) / 1000)
+        if temps:
+            sample["temp_c"] = max(temps)
+
+    def _rtorrent(self, sample: dict):
+        """rtorrent's global rates and sockets, summed over every instance that answers."""
+        calls = [{"methodName": m, "params": [""]} for m in self.RTORRENT_GLOBALS]
+        totals = None
+        for proxy in self._proxies:
+            try:
+                results = proxy.system.multicall(calls)
+            except Exception as e:
+                logger.debug(f"Sampler: rtorrent unavailable — {e}")
+                continue
+            values = [r[0] if isinstance(r, list) and r else 0 for r in results]
+            values = (values + [0] * 3)[:3]
+            totals = values if totals is None else [a + b for a, b in zip(totals, values)]
+        if totals is None:
+            return
+        sample["rt_up_bps"], sample["rt_down_bps"], sample["rt_sockets"] = totals
+
+    def sample(self) -> dict:
+        sample = {"ts": time.time(), "phase": self.phase}
+        text = self._read("/proc/loadavg")
+        if text:
+            sample["load1"] = float(text.split()[0])
+        for collect in (
+            self._cpu,
+            self._memory,
+            self._disk,
+            self._tcp,
+            self._thermal,
+            self._rtorrent,
+        ):
+            try:
+                collect(sample)
+            except (ValueError, IndexError) as e:
+                logger.debug(f"Sampler: {collect.__name__} failed — {e}")
+        return sample
+
+    def start(self) -> bool:
+        if not self.open():
+            return False
+        self._thread = threading.Thread(
+            target=self._run, name="route23-sampler", daemon=True
+        )
+        self._thread.start()
+        logger.info(f"Sampling system vitals every {self.interval:.0f}s to {self.path}")
+        return True
+
+    def _run(self):
+        # Prime the CPU and disk counters so the first stored sample has rates.
+        self.sample()
+        while not self._stop.wait(self.interval):
+            self.append(self.sample())
+
+    def stop(self):
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout=self.interval + 10)
+        self.close()
+
+    @staticmethod
+    def format_sample(s: dict) -> str:
+        def num(value, fmt):
+            return "-" if value is None or value != value else format(value, fmt)
+
+        def rate(value):
+            if value is None or value != value:
+                return "-"
+            return f"{_format_size(int(value))}/s"
+
+        return (
+            f"{datetime.fromtimestamp(s['ts']).strftime('%H:%M:%S')} "
+            f"load {num(s.get('load1'), '.2f')} "
+            f"cpu {num(s.get('cpu_pct'), '.0f')}% io {num(s.get('iowait_pct'), '.0f')}% "
+            f"mem {num(s.get('mem_used_pct'), '.0f')}% "
+            f"disk r {rate(s.get('disk_read_bps'))} w {rate(s.get('disk_write_bps'))} "
+            f"util {num(s.get('disk_util_pct'), '.0f')}% "
+            f"tcp {s.get('tcp_peers', 0)} "
+            f"temp {num(s.get('temp_c'), '.0f')}C "
+            f"rt up {rate(s.get('rt_up_bps'))} down {rate(s.get('rt_down_bps'))}"
+            + (f" [{s['phase']}]" if s.get("phase") else "")
+        )
+
+    @staticmethod
+    def summarize(samples: list[dict]):
+        """Print averages and peaks per rotation phase (idle time is phase "-")."""
+        groups: dict[str, list[dict]] = {}
+        for s in samples:
+            groups.setdefault(s.get("phase") or "-", []).append(s)
+        keys = ("load1", "cpu_pct", "iowait_pct", "mem_used_pct", "disk_util_pct", "temp_c")
+        print(f"{'Phase':<10}{'Samples':>8}" + "".join(f"{k:>15}" for k in keys))
+        for phase, group in groups.items():
+            cells = []
+            for key in keys:
+                values = [
+                    s[key] for s in group if s.get(key) is not None and s[key] == s[key]
+                ]
+                if values:
+                    cells.append(f"{sum(values) / len(values):>7.1f}/{max(values):<7.1f}")
+                else:
+                    cells.append(f"{'-':>15}")
+            print(f"{phase:<10}{len(group):>8}" + "".join(cells))
+        print("(each cell: average/peak)")
+
+
+class Profiler:
+    """Opt-in CPU and memory profiling of one run (PROFILE=cpu|mem|both).
+
+    cpu keeps a separate cProfile per rotation phase on the main thread,
+    and samples every thread's stack with sys._current_frames() to build
+    flamegraph-ready collapsed stacks (pool workers and the deleter
+    included). mem runs tracemalloc and snapshots it at each phase
+    boundary. Reports go next to the state file as route23_profile.*.
+    Nothing here is imported or run unless PROFILE is set.
+    """
+
+    MODES = ("cpu", "mem", "both")
+    STACK_INTERVAL = 0.01
+    MEM_FRAMES = 16
+    TOP_N = 25
+
+    def __init__(self, config: dict):
+        mode = config["profile"]
+        self.cpu = mode in ("cpu", "both")
+        self.mem = mode in ("mem", "both")
+        self.base = Path(config["state_file"]).with_name("route23_profile")
+        self.phase = "-"
+        self._profiles: dict = {}
+        self._active = None
+        self._stacks: dict[str, int] = {}
+        self._snapshots: list = []
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def _profile_for(self, phase: str):
+        import cProfile
+
+        if self._active is not None:
+            self._active.disable()
+        self._active = self._profiles.setdefault(phase, cProfile.Profile())
+        self._active.enable()
+
+    def start(self):
+        if self.mem:
+            import tracemalloc
+
+            tracemalloc.start(self.MEM_FRAMES)
+        if self.cpu:
+            self._thread = threading.Thread(
+                target=self._sample_stacks, name="route23-profiler", daemon=True
+            )
+            self._thread.start()
+            self._profile_for(self.phase)
+        logger.info(
+            "Profiling: " + " + ".join(m for m, on in (("cpu", self.cpu), ("mem", self.mem)) if on)
+        )
+
+    def mark(self, phase: str):
+        """Called at each phase boundary with the phase now starting."""
+        if self._active is not None:
+            # Keep snapshot cost out of the phase being closed.
+            self._active.disable()
+        if self.mem:
+            import tracemalloc
+
+            self._snapshots.append((self.phase, tracemalloc.take_snapshot()))
+        self.phase = phase
+        if self.cpu:
+            self._profile_for(phase)
+
+    def _sample_stacks(self):
+        own = threading.get_ident()
+        names = {}
+        while not self._stop.wait(self.STACK_INTERVAL):
+            for t in threading.enumerate():
+                names[t.ident] = t.name
+            phase = self.phase
+            for ident, frame in sys._current_frames().items():
+                if ident == own:
+                    continue
+                frames = []
+                while frame is not None:
+                    code = frame.f_code
+                    frames.append(
+                        f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+                    )
+                    frame = frame.f_back
+                key = ";".join([phase, names.get(ident, str(ident))] + frames[::-1])
+                self._stacks[key] = self._stacks.get(key, 0) + 1
+
+    def stop(self):
+        """Stop profiling and write the reports."""
+        written = []
+        if self.cpu:
+            self._active.disable()
+            self._stop.set()
+            if self._thread:
+                self._thread.join()
+            written += self._write_cpu()
+        if self.mem:
+            import tracemalloc
+
+            self._snapshots.append((self.phase, tracemalloc.take_snapshot()))
+            current, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            written.append(self._write_mem(peak))
+        logger.info(f"Profile reports written: {', '.join(str(p) for p in written)}")
+
+    def _write_cpu(self) -> list[Path]:
+        import io
+        import pstats
+
+        self.base.parent.mkdir(parents=True, exist_ok=True)
+        profiles = [p for p in self._profiles.values() if p.getstats()]
+        paths = []
+        if profiles:
+            combined = pstats.Stats(profiles[0])
+            for profile in profiles[1:]:
+                combined.add(profile)
+            pstats_path = self.base.with_suffix(".pstats")
+            combined.dump_stats(pstats_path)
+            paths.append(pstats_path)
+
+            text_path = self.base.with_suffix(".txt")
+            with open(text_path, "w") as f:
+                for phase, profile in self._profiles.items():
+                    if not profile.getstats():
+                        continue
+                    out = io.StringIO()
+                    pstats.Stats(profile, stream=out).sort_stats(
+                        "cumulative"
+                    ).print_stats(self.TOP_N)
+                    f.write(f"===== phase: {phase} =====\n{out.getvalue()}\n")
+            paths.append(text_path)
+
+        collapsed_path = self.base.with_suffix(".collapsed")
+        with open(collapsed_path, "w") as f:
+            for stack, count in sorted(self._stacks.items()):
+                f.write(f"{stack} {count}\n")
+        paths.append(collapsed_path)
+        return paths
+
+    def _write_mem(self, peak: int) -> Path:
+        path = self.base.with_suffix(".mem.txt")
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with open(path, "w") as f:
+            f.write(f"Peak traced memory: {_format_size(peak)}\n")
+            previous = None
+            for phase, snapshot in self._snapshots:
+                f.write(f"\n===== end of phase: {phase} =====\n")
+                f.write(f"Top {self.TOP_N} allocation sites:\n")
+                for stat in snapshot.statistics("lineno")[: self.TOP_N]:
+                    f.write(f"  {stat}\n")
+                if previous is not None:
+                    f.write("Largest growth since previous boundary:\n")
+                    for diff in snapshot.compare_to(previous, "lineno")[: self.TOP_N]:
+                        if diff.size_diff > 0:
+                            f.write(f"  {diff}\n")
+                previous = snapshot
+        return path
+
+
+class HashCheckScheduler:
+    """Runs rtorrent rechecks at most K at a time per physical device, smallest first.
+
+    Rechecks on one spindle compete for seeks, so each device gets its own
+    slot count (HASHCHECK_PER_DEVICE). Progress for every queued and
+    running check comes from a single d.multicall2 poll, which also shows
+    rechecks started outside this scheduler (another route23 run, or the
+    ruTorrent UI) so they occupy their device's slots too.
+
+    Devices come from os.stat on rtorrent's download directories, translated
+    by HASHCHECK_PATH_MAP. When rtorrent runs in another container and a
+    path doesn't exist here, it counts as DOWNLOAD_DIR's device, so such
+    rechecks share one set of slots. HASHCHECK_TOTAL_TIMEOUT bounds the
+    whole run of rechecks: once it passes, every one still queued or
+    running is marked failed.
+    """
+
+    POLL_FIELDS = (
+        "d.hash",
+        "d.hashing",
+        "d.directory",
+        "d.size_bytes",
+        "d.bytes_done",
+    )
+    def __init__(self, rotator: "TorrentRotator", config: dict):
+        self.rotator = rotator
+        self.per_device = max(1, config["hashcheck_per_device"])
+        self.timeout = config["hashcheck_timeout"]
+        self.poll_interval = config["hashcheck_poll_interval"]
+        # rtorrent can report hashing=0 for a moment right after d.check_hash.
+        self.start_grace = config.get("hashcheck_start_grace", 2.0)
+        self.total_timeout = config.get("hashcheck_total_timeout", 0)
+        self.path_map = [
+            (remote.rstrip("/"), local.rstrip("/"))
+            for remote, local in config.get("hashcheck_path_map", [])
+        ]
+        self._queue: list[tuple[int, int, str]] = []
+        self._jobs: dict[str, dict] = {}
+        self._seq = itertools.count()
+        self._devices: dict[str, int] = {}
+        self._deadline: float | None = None
+        self.completed: list[tuple[int, float]] = []
+
+    def _local_path(self, directory: str) -> str:
+        for remote, local in self.path_map:
+            if directory == remote or directory.startswith(remote + "/"):
+                return local + directory[len(remote) :]
+        return directory
+
+    def _device(self, directory: str) -> int:
+        if directory not in self._devices:
+            local = self._local_path(directory)
+            for path in (local, self.rotator.config["download_dir"]):
+                try:
+                    self._devices[directory] = os.stat(path).st_dev
+                    break
+                except OSError:
+                    continue
+            else:
+                self._devices[directory] = -1
+            if path != local:
+                logger.info(
+                    f"Hash check: {local} is not visible here, counting its rechecks "
+                    f"against DOWNLOAD_DIR's disk (see HASHCHECK_PATH_MAP)"
+                )
+        return self._devices[directory]
+
+    @property
+    def pending(self) -> int:
+        return sum(1 for job in self._jobs.values() if job["finished"] is None)
+
+    def describe(self) -> list[dict]:
+        """Unfinished rechecks in this process, in queue order, for status output."""
+        jobs = [
+            {
+                "info_hash": info_hash,
+                "name": job["name"],
+                "state": "queued" if job["started"] is None else "checking",
+                "bytes_done": job["done"],
+                "size": job["total"],
+            }
+            for info_hash, job in list(self._jobs.items())
+            if job["finished"] is None
+        ]
+        return sorted(jobs, key=lambda j: (j["state"] == "queued", j["size"]))
+
+    def submit(self, info_hash: str, torrent_name: str, size: int | None = None):
+        """Queue a recheck. Smaller torrents are checked first."""
+        job = self._jobs.get(info_hash)
+        if job and job["finished"] is None:
+            return
+        if self.total_timeout > 0 and (self._deadline is None or not self.pending):
+            self._deadline = time.monotonic() + self.total_timeout
+        self._jobs[info_hash] = {
+            "name": torrent_name,
+            "size": size or 0,
+            "device": None,
+            "started": None,
+            "finished": None,
+            "ok": False,
+            "done": 0,
+            "total": size or 0,
+        }
+        heapq.heappush(self._queue, (size or 0, next(self._seq), info_hash))
+        logger.info(
+            f"Hash check queued for '{torrent_name}' "
+            f"({len(self._queue)} waiting)"
+        )
+
+    def _finish(self, info_hash: str, ok: bool, reason: str = ""):
+        job = self._jobs[info_hash]
+        job["finished"] = time.monotonic()
+        job["ok"] = ok
+        if ok and job["started"] is not None:
+            elapsed = job["finished"] - job["started"]
+            self.completed.append((job["total"], elapsed))
+            METRICS.observe("route23_hashcheck_duration_seconds", elapsed)
+            logger.info(
+                f"Hash check finished for '{job['name']}' in {elapsed:.0f}s"
+            )
+        elif reason:
+            logger.warning(f"Hash check for '{job['name']}': {reason}")
+
+    def _poll(self) -> dict[str, dict] | None:
+        try:
+            rows = self.rotator.snapshot(*self.POLL_FIELDS)
+        except RtorrentUnavailable:
+            for info_hash, job in self._jobs.items():
+                if job["finished"] is None:
+                    self._finish(info_hash, ok=False, reason="rtorrent unavailable")
+            self._queue.clear()
+            return None
+        except Exception as e:
+            logger.warning(f"Hash check poll failed — {e}")
+            return None
+        return {row["d.hash"]: row for row in rows}
+
+    def pump(self) -> bool:
+        """Update progress and start queued rechecks where a device slot is free.
+
+        Returns True while any recheck is still queued or running.
+        """
+        if self._deadline is not None and time.monotonic() > self._deadline:
+            self._expire()
+            return False
+        rows = self._poll()
+        if rows is None:
+            return self.pending > 0
+
+        now = time.monotonic()
+        busy: dict[int, int] = {}
+        for info_hash, row in rows.items():
+            job = self._jobs.get(info_hash)
+            hashing = int(row["d.hashing"]) != 0
+            if job is None or job["started"] is None:
+                if hashing:
+                    device = self._device(row["d.directory"])
+                    busy[device] = busy.get(device, 0) + 1
+                continue
+            if job["finished"] is not None:
+                continue
+            job["done"] = int(row["d.bytes_done"])
+            job["total"] = int(row["d.size_bytes"])
+            elapsed = now - job["started"]
+            if not hashing and elapsed >= self.start_grace:
+                self._finish(info_hash, ok=True)
+            elif elapsed > self.timeout:
+                self._finish(
+                    info_hash,
+                    ok=False,
+                    reason=f"did not finish within {self.timeout}s",
+                )
+            else:
+                busy[job["device"]] = busy.get(job["device"], 0) + 1
+
+        for info_hash, job in self._jobs.items():
+            if (
+                job["started"] is not None
+                and job["finished"] is None
+                and info_hash not in rows
+            ):
+                self._finish(info_hash, ok=False, reason="torrent left rtorrent")
+
+        blocked = []
+        while self._queue:
+            item = heapq.heappop(self._queue)
+            info_hash = item[2]
+            row = rows.get(info_hash)
+            if row is None:
+                self._finish(info_hash, ok=False, reason="torrent not in rtorrent")
+                continue
+            job = self._jobs[info_hash]
+            job["device"] = self._device(row["d.directory"])
+            if busy.get(job["device"], 0) >= self.per_device:
+                blocked.append(item)
+                continue
+            if not self.rotator.trigger_hash_check(info_hash):
+                self._finish(info_hash, ok=False, reason="could not start recheck")
+                continue
+            job["started"] = now
+            busy[job["device"]] = busy.get(job["device"], 0) + 1
+        for item in blocked:
+            heapq.heappush(self._queue, item)
+
+        return self.pending > 0
+
+    def _expire(self):
+        """Fail every recheck still queued or running once HASHCHECK_TOTAL_TIMEOUT passes."""
+        for info_hash, job in self._jobs.items():
+            if job["finished"] is None:
+                self._finish(
+                    info_hash,
+                    ok=False,
+                    reason=f"rechecks did not all finish within {self.total_timeout:.0f}s",
+                )
+        self._queue.clear()
+
+    def job(self, info_hash: str) -> dict | None:
+        return self._jobs.get(info_hash)
+
+    def log_progress(self):
+        running = [
+            j
+            for j in self._jobs.values()
+            if j["started"] is not None and j["finished"] is None
+        ]
+        done = sum(j["done"] for j in running)
+        total = sum(j["total"] for j in running)
+        pct = f", {done * 100 / total:.0f}% of running" if total else ""
+        logger.info(
+            f"Hash checks: {len(running)} running, "
+            f"{len(self._queue)} queued{pct}"
+        )
+
+    def collect(self) -> dict[str, dict]:
+        """Hand back every submitted recheck and forget them. Returns {info_hash: job}."""
+        jobs, self._jobs = self._jobs, {}
+        self._deadline = None
+        return jobs
+
+    def wait_all(self) -> dict[str, dict]:
+        """Pump until every submitted recheck has finished. Returns {info_hash: job}."""
+        last_report = 0.0
+        while self.pump():
+            if time.monotonic() - last_report >= 30:
+                self.log_progress()
+                last_report = time.monotonic()
+            time.sleep(self.poll_interval)
+        return self.collect()
+
+
+class TorrentRotator:
+    def __init__(self, config: dict, preloader: PreloadManager | None = None):
+        self.config = config
+        self.state = self.load_state()
+        self._rtorrent: RtorrentClient | RtorrentPool | None = None
+        self.preloader = preloader
+        self.notifier = NotificationQueue(config)
+        self.deleter = (
+            DeletionWorker(config) if config["background_delete"] else None
+        )
+        self.metadata = TorrentMetadataCache(config)
+        self.hashcheck = HashCheckScheduler(self, config)
+        self.sampler: SystemSampler | None = None
+        self.profiler: Profiler | None = None
+        self._current_phase = "-"
+        self.progress = {"done": 0, "total": 0}
+        # Load checks made and seconds spent waiting in them, for the planner.
+        self.load_checks = 0
+        self.load_waited = 0.0
+        self._run_start: dict = {}
+        # Held while an action runs, so daemon checks and API jobs never overlap.
+        self.lock = threading.RLock()
+        if self.preloader:
+            self.preloader.load_stats(self.state.get("preload_sources", {}))
+            self.preloader.load_promoted(self.state.get("promoted", {}))
+
+    @property
+    def rtorrent(self) -> "RtorrentClient | RtorrentPool":
+        """The rtorrent client, created on first use so runs that never call rtorrent skip it."""
+        if self._rtorrent is None:
+            self._rtorrent = make_rtorrent_client(self.config)
+        return self._rtorrent
+
+    def start_sampler(self):
+        """Start recording system samples for the rest of the run, once."""
+        if self.sampler or self.config["sample_interval"] <= 0:
+            return
+        sampler = SystemSampler(self.config)
+        if sampler.start():
+            self.sampler = sampler
+
+    def find_rtorrent_hash(
+        self, torrent_name: str, retries: int = 6
+    ) -> str | None:
+        """Find the rtorrent info hash for a torrent by its name, with retries.
+
+        A just-added torrent can take a moment to show up, so misses are
+        retried with jittered exponential backoff.
+        """
+        for attempt in range(retries):
+            try:
+                for row in self.snapshot("d.hash", "d.name"):
+                    if row["d.name"] == torrent_name:
+                        return row["d.hash"]
+            except RtorrentUnavailable:
+                raise
+            except Exception as e:
+                logger.debug(f"Hash lookup for '{torrent_name}' failed — {e}")
+            if attempt < retries - 1:
+                time.sleep(0.5 + RpcPolicy.backoff_delay("trust", attempt))
+        return None
+
+    def trigger_hash_check(self, info_hash: str) -> bool:
+        """Ask rtorrent to recheck a torrent's files against what's on disk."""
+        try:
+            self.rtorrent.d.check_hash(info_hash)
+            logger.info(f"Preload: triggered hash check for {info_hash[:8]}")
+            return True
+        except Exception as e:
+            logger.error(f"Preload: hash check failed — {e}")
+            return False
+
+    def queue_hash_check(self, info_hash: str, torrent_name: str, torrent_path: str):
+        """Hand a preloaded torrent to the recheck scheduler and start it if a slot is free."""
+        self.hashcheck.submit(
+            info_hash, torrent_name, self.metadata.total_size(torrent_path)
+        )
+        self.hashcheck.pump()
+
+    @TRACER.traced()
+    def finish_hash_checks(self) -> dict[str, int]:
+        """Wait for every queued recheck, then verify each. Returns {info_hash: bytes_done}."""
+        if not self.hashcheck.pending:
+            return {}
+        jobs = self.hashcheck.wait_all()
+        self._record_hash_rate()
+        results = {}
+        for info_hash, job in jobs.items():
+            if not job["ok"]:
+                results[info_hash] = 0
+                continue
+            results[info_hash] = self._report_verified(
+                info_hash, job["name"], job["done"], job["total"]
+            )
+        return results
+
+    def _update_perf(self, key: str, value: float):
+        """Fold one measurement into the running averages RotationSimulator reads."""
+        perf = self.state.setdefault("perf", {})
+        previous = perf.get(key)
+        perf[key] = value if previous is None else previous + 0.3 * (value - previous)
+
+    def _record_hash_rate(self):
+        """Keep a running average of recheck throughput for duration estimates."""
+        for nbytes, seconds in self.hashcheck.completed:
+            if nbytes <= 0 or seconds <= 0:
+                continue
+            self._update_perf("hash_bytes_per_s", nbytes / seconds)
+        self.hashcheck.completed.clear()
+
+    def _record_run_perf(self):
+        """Record this rotation's mean RPC latency and load wait per check."""
+        if not self._run_start:
+            return
+        calls, seconds = METRICS.totals("route23_rpc_latency_seconds")
+        calls0, seconds0 = self._run_start["rpc"]
+        if calls > calls0:
+            self._update_perf("rpc_latency_s", (seconds - seconds0) / (calls - calls0))
+        checks0, waited0 = self._run_start["load"]
+        if self.load_checks > checks0:
+            self._update_perf(
+                "load_wait_s",
+                (self.load_waited - waited0) / (self.load_checks - checks0),
+            )
+
+    def _report_verified(
+        self, info_hash: str, torrent_name: str, done: int, total: int
+    ) -> int:
+        """Log a finished recheck's result. If 0%, stop the torrent so it's visibly broken.
+
+        Returns bytes_done. Catches the 'preload staged wrong bytes' case where SCP
+        succeeded but the data doesn't match the torrent's pieces (e.g. same size,
+        different encode), which would otherwise leave the torrent silently started
+        with no usable data.
+        """
+        if total <= 0:
+            logger.warning(
+                f"Preload verify: '{torrent_name}' has unknown total size"
+            )
+            return 0
+
+        pct = done * 100 / total
+        if done == 0:
+            logger.error(
+                f"Preload verify: '{torrent_name}' is 0% after hash check — "
+                f"staged data did not match torrent pieces. Stopping torrent."
+            )
+            try:
+                self.rtorrent.d.stop(info_hash)
+            except Exception as e:
+                logger.warning(
+                    f"Preload verify: failed to stop torrent — {e}"
+                )
+        elif pct < 100:
+            logger.warning(
+                f"Preload verify: '{torrent_name}' is {pct:.1f}% after hash check "
+                f"({_format_size(done)} / {_format_size(total)}) — remainder will leech"
+            )
+        else:
+            logger.info(
+                f"Preload verify: '{torrent_name}' is 100% — seeding"
+            )
+        return done
+
+    def get_system_load(self) -> float:
+        """Get current system load average (1 minute)."""
+        try:
+            with open("/proc/loadavg", "r") as f:
+                return float(f.read().split()[0])
+        except Exception:
+            return 0.0
+
+    def wait_for_low_load(self):
+        """Wait until system load drops below threshold."""
+        max_load = self.config["max_load"]
+        load_wait = self.config["load_wait"]
+
+        self.load_checks += 1
+        current_load = self.get_system_load()
+        while current_load > max_load:
+            logger.info(
+                f"System load {current_load:.2f} exceeds {max_load:.2f}, waiting {load_wait}s..."
+            )
+            time.sleep(load_wait)
+            METRICS.inc("route23_load_wait_seconds_total", load_wait)
+            self.load_waited += load_wait
+            current_load = self.get_system_load()
+
+        return current_load
+
+    def throttled_sleep(self, seconds: float, reason: str = ""):
+        """Sleep with logging for transparency."""
+        if seconds > 0:
+            if reason:
+                logger.debug(f"Waiting {seconds}s ({reason})")
+            time.sleep(seconds)
+            METRICS.inc(
+                "route23_throttle_sleep_seconds_total", seconds, reason=reason or "other"
+            )
+
+    def load_state(self) -> dict:
+        """Load state from file or create initial state."""
+        state_path = Path(self.config["state_file"])
+        if state_path.exists():
+            with open(state_path, "r") as f:
+                state = json.load(f)
+            # One-time migration: backfill seeded_this_cycle from torrent_history
+            # so existing installs don't re-seed already-processed files.
+            if "seeded_this_cycle" not in state:
+                state["seeded_this_cycle"] = [
+                    info["path"]
+                    for info in state.get("torrent_history", {}).values()
+                    if "path" in info
+                ]
+                if state["seeded_this_cycle"]:
+                    logger.info(
+                        f"Migrated {len(state['seeded_this_cycle'])} previously seeded "
+                        f"torrents into cycle tracking"
+                    )
+            return state
+        return {
+            "current_index": 0,
+            "batch_started": None,
+            "current_batch": [],
+            "completed_batches": 0,
+            "sort_seed": None,
+            "seeded_this_cycle": [],
+            "torrent_history": {},
+        }
+
+    def reload_state(self):
+        """Re-read the state file, picking up changes made by one-off runs."""
+        self.state = self.load_state()
+        if self.preloader:
+            self.preloader.load_promoted(self.state.get("promoted", {}))
+
+    @TRACER.traced()
+    def save_state(self):
+        """Persist state to file."""
+        state_path = Path(self.config["state_file"])
+        state_path.parent.mkdir(parents=True, exist_ok=True)
+        if self.preloader:
+            self.state["preload_sources"] = self.preloader.export_stats()
+        with open(state_path, "w") as f:
+            json.dump(self.state, f, indent=2, default=str)
+        self.metadata.save()
+        logger.info(f"State saved to {state_path}")
+
+    def get_torrent_files(self) -> list:
+        """Get list of all .torrent files ordered by SORT_ORDER."""
+        torrent_dir = Path(self.config["torrent_dir"])
+        if not torrent_dir.exists():
+            logger.error(f"Torrent directory not found: {torrent_dir}")
+            return []
+
+        sort_order = self.config["sort_order"]
+        torrents = list(torrent_dir.glob("*.torrent"))
+
+        if sort_order == "alphabetical":
+            torrents = sorted(torrents)
+        elif sort_order == "reverse":
+            torrents = sorted(torrents, reverse=True)
+        elif sort_order == "date_added":
+            torrents = sorted(torrents, key=lambda t: t.stat().st_mtime)
+        elif sort_order == "demand":
+            torrents = self._sort_by_demand(sorted(torrents))
+        elif sort_order == "random":
+            if self.state.get("sort_seed") is None:
+                self.state["sort_seed"] = random.randint(0, 2**32)
+            rng = random.Random(self.state["sort_seed"])
+            rng.shuffle(torrents)
+        else:
+            logger.warning(
+                f"Unknown SORT_ORDER '{sort_order}', falling back to alphabetical"
+            )
+            torrents = sorted(torrents)
+
+        logger.info(f"Found {len(torrents)} torrent files (sort: {sort_order})")
+        return [str(t) for t in torrents]
+
+    def get_torrent_hash(self, torrent_path: str) -> str:
+        """Get info hash from a .torrent file (simplified - uses file hash)."""
+        import hashlib
+
+        with open(torrent_path, "rb") as f:
+            return hashlib.sha1(f.read()).hexdigest().upper()
+
+    def get_active_torrents(self) -> list:
+        """Get list of currently active torrent hashes in rtorrent."""
+        try:
+            return self.rtorrent.download_list()
+        except Exception as e:
+            logger.error(f"Failed to get active torrents: {e}")
+            return []
+
+    def snapshot(self, *fields: str, view: str = "main") -> list[dict]:
+        """Fetch fields (e.g. "d.hash", "d.name") for every torrent in one d.multicall2."""
+        rows = self.rtorrent.d.multicall2("", view, *(f"{f}=" for f in fields))
+        return [dict(zip(fields, row)) for row in rows]
+
+    def record_seeding_stats(self, rows: list[dict]):
+        """Fold an end-of-batch snapshot into per-info-hash demand history."""
+        started = self.state.get("batch_started")
+        seconds = 0.0
+        if started:
+            seconds = (datetime.now() - datetime.fromisoformat(started)).total_seconds()
+
+        paths_by_hash = {}
+        for path in self.state.get("current_batch", []):
+            entry = self.metadata.get(path)
+            if entry:
+                paths_by_hash[entry["info_hash"]] = path
+
+        stats = self.state.setdefault("torrent_stats", {})
+        for row in rows:
+            info_hash = row["d.hash"].upper()
+            entry = stats.setdefault(
+                info_hash,
+                {"up_total": 0, "seed_seconds": 0.0, "samples": 0},
+            )
+            entry["name"] = row["d.name"]
+            entry["size"] = int(row["d.size_bytes"])
+            entry["up_total"] += int(row["d.up.total"])
+            entry["seed_seconds"] += seconds
+            entry["samples"] += 1
+            entry["peers"] = int(row["d.peers_connected"])
+            entry["seeders"] = int(row["d.peers_complete"])
+            entry["leechers"] = int(row["d.peers_accounted"])
+            entry["last_snapshot"] = datetime.now().isoformat()
+            if info_hash in paths_by_hash:
+                entry["path"] = paths_by_hash[info_hash]
+        logger.info(f"Recorded seeding stats for {len(rows)} torrents")
+
+    def _demand_score(self, torrent_path: str) -> float | None:
+        """Upload bytes per GB of data per day seeded, from recorded history."""
+        entry = self.metadata.get(torrent_path)
+        if not entry:
+            return None
+        stats = self.state.get("torrent_stats", {}).get(entry["info_hash"])
+        if not stats or stats.get("seed_seconds", 0) <= 0:
+            return None
+        size_gb = max(entry["total_size"], 1) / 1024**3
+        days = stats["seed_seconds"] / 86400
+        return stats["up_total"] / size_gb / days
+
+    def _sort_by_demand(self, torrents: list) -> list:
+        """Highest expected upload per GB first.
+
+        Torrents never seeded before are ranked at the median score, so new
+        additions are neither starved nor allowed to crowd out proven swarms.
+        Ties fall back to the current leecher/seeder ratio, then to name.
+        """
+        scores = {str(t): self._demand_score(str(t)) for t in torrents}
+        known = sorted(v for v in scores.values() if v is not None)
+        prior = known[len(known) // 2] if known else 0.0
+
+        def pressure(t) -> float:
+            entry = self.metadata.get(str(t))
+            stats = (
+                self.state.get("torrent_stats", {}).get(entry["info_hash"], {})
+                if entry
+                else {}
+            )
+            return stats.get("leechers", 0) / (stats.get("seeders", 0) + 1)
+
+        def key(t):
+            score = scores[str(t)]
+            return (-(prior if score is None else score), -pressure(t), str(t))
+
+        return sorted(torrents, key=key)
+
+    @TRACER.traced()
+    def add_torrent(self, torrent_path: str) -> bool:
+        """Add a torrent to rtorrent."""
+        import xmlrpc.client
+
+        try:
+            with open(torrent_path, "rb") as f:
+                torrent_data = f.read()
+
+            self.rtorrent.load.raw_start(
+                "",
+                xmlrpc.client.Binary(torrent_data),
+                f"d.directory.set={self.config['download_dir']}",
+            )
+
+            logger.info(f"Added torrent: {Path(torrent_path).name}")
+            return True
+        except Exception as e:
+            logger.error(f"Failed to add torrent {torrent_path}: {e}")
+            return False
+
+    def remove_torrent(
+        self,
+        info_hash: str,
+        delete_data: bool = False,
+        base_path: str | None = None,
+    ) -> bool:
+        """Remove a torrent from rtorrent, optionally deleting downloaded files."""
+        try:
+            if delete_data and not base_path:
+                try:
+                    base_path = self.rtorrent.d.base_path(info_hash)
+                except Exception as e:
+                    logger.warning(
+                        f"Could not get base path for {info_hash[:8]}: {e}"
+                    )
+
+            self.rtorrent.d.stop(info_hash)
+            self.rtorrent.d.close(info_hash)
+            self.rtorrent.d.erase(info_hash)
+            logger.info(f"Removed torrent: {info_hash}")
+
+            if delete_data and base_path:
+                self._delete_path(base_path)
+
+            return True
+        except Exception as e:
+            logger.error(f"Failed to remove torrent {info_hash}: {e}")
+            return False
+
+    def _delete_path(self, path: str):
+        """Delete a file or directory left behind by a removed torrent."""
+        if self.deleter:
+            self.deleter.enqueue(path)
+            return
+        p = Path(path)
+        if not p.exists():
+            logger.debug(f"Nothing to delete, path does not exist: {path}")
+            return
+        import shutil
+
+        try:
+            if p.is_dir():
+                shutil.rmtree(p)
+                logger.info(f"Deleted directory: {path}")
+            else:
+                p.unlink()
+                logger.info(f"Deleted file: {path}")
+        except Exception as e:
+            logger.error(f"Failed to delete {path}: {e}")
+
+    @TRACER.traced()
+    def remove_all_active(self, delete_data: bool = False):
+        """Remove all currently active torrents with delays.
+
+        One multicall snapshot taken up front supplies the seeding stats
+        recorded for SORT_ORDER=demand and every torrent's base path.
+        """
+        active, base_paths = self._removal_plan()
+        total = len(active)
+        logger.info(f"Removing {total} active torrents")
+
+        for i, info_hash in enumerate(active, 1):
+            if self.rtorrent.unavailable:
+                raise RtorrentUnavailable(
+                    f"rtorrent stopped responding after {i - 1}/{total} removals"
+                )
+            self.wait_for_low_load()
+
+            logger.info(f"Removing torrent {i}/{total}: {info_hash[:8]}...")
+            self.remove_torrent(
+                info_hash, delete_data, base_path=base_paths.get(info_hash)
+            )
+
+            if i < total:
+                self.throttled_sleep(
+                    self.config["remove_delay"], "between removals"
+                )
+
+    def _removal_plan(self) -> tuple[list[str], dict[str, str]]:
+        """Hashes of the active torrents and their base paths, recording seeding stats."""
+        base_paths: dict[str, str] = {}
+        try:
+            rows = self.snapshot(
+                "d.hash",
+                "d.name",
+                "d.base_path",
+                "d.size_bytes",
+                "d.up.total",
+                "d.peers_connected",
+                "d.peers_complete",
+                "d.peers_accounted",
+            )
+            active = [row["d.hash"] for row in rows]
+            base_paths = {row["d.hash"]: row["d.base_path"] for row in rows}
+            self.record_seeding_stats(rows)
+        except Exception as e:
+            logger.warning(f"Snapshot before removal failed — {e}")
+            active = self.get_active_torrents()
+        return active, base_paths
+
+    def should_rotate(self) -> bool:
+        """Check if it's time to rotate to the next batch."""
+        if self.state["batch_started"] is None:
+            return True
+
+        started = datetime.fromisoformat(self.state["batch_started"])
+        rotation_period = timedelta(days=self.config["rotation_days"])
+        time_elapsed = datetime.now() - started
+
+        if time_elapsed >= rotation_period:
+            logger.info(f"Rotation period elapsed ({time_elapsed.days} days)")
+            return True
+
+        remaining = rotation_period - time_elapsed
+        logger.info(
+            f"Time until next rotation: {remaining.days} days, {remaining.seconds // 3600} hours"
+        )
+        return False
+
+    def get_next_batch(self) -> list:
+        """Get the next batch of torrent files to seed, skipping already-seeded ones."""
+        all_torrents = self.get_torrent_files()
+        if not all_torrents:
+            return []
+
+        seeded = set(self.state.get("seeded_this_cycle", []))
+        eligible = [t for t in all_torrents if t not in seeded]
+
+        batch = self._select(eligible) if eligible else []
+        if not batch:
+            # Nothing eligible, or only torrents that can't fit the disk right
+            # now: either way this cycle is as done as it can get.
+            logger.info(
+                f"{len(all_torrents) - len(eligible)} of {len(all_torrents)} torrents "
+                f"seeded this cycle, none left that fit — starting new cycle"
+            )
+            self.state["seeded_this_cycle"] = []
+            if self.config["sort_order"] == "random":
+                self.state["sort_seed"] = random.randint(0, 2**32)
+                all_torrents = self.get_torrent_files()
+            eligible = all_torrents
+            batch = self._select(eligible)
+        logger.info(
+            f"Next batch: {len(batch)} torrents "
+            f"({len(eligible)} eligible, {len(seeded)} seeded this cycle)"
+        )
+        return batch
+
+    def _select(self, eligible: list) -> list:
+        if self.config["disk_aware_batch"]:
+            return self._pack_batch(eligible)
+        return eligible[: self.config["batch_size"]]
+
+    def get_disk_budget(self) -> tuple[int, int] | None:
+        """Return (bytes available for the next batch, usable capacity) of DOWNLOAD_DIR.
+
+        Free space counts data still queued for background deletion, since
+        it will be freed while the batch is being added. The reserve keeps
+        rtorrent's close_low_diskspace threshold from being crossed.
+        """
+        try:
+            st = os.statvfs(self.config["download_dir"])
+        except OSError as e:
+            logger.warning(f"Could not stat download dir, not packing by size: {e}")
+            return None
+
+        reserve = int(self.config["disk_reserve_gb"] * 1024**3)
+        free = st.f_bavail * st.f_frsize
+        if self.deleter:
+            free += self.deleter.pending_bytes()
+        capacity = st.f_blocks * st.f_frsize - reserve
+        return max(free - reserve, 0), capacity
+
+    def _pack_batch(self, eligible: list) -> list:
+        """Take eligible torrents in order, skipping any that don't fit the disk budget.
+
+        Skipped torrents stay eligible and lead the next batch, so every
+        torrent is still seeded once per cycle. A torrent larger than the
+        whole disk can never be seeded here; it is passed over with a warning
+        and counted as seeded, so it does not hold the cycle open.
+        """
+        budget = self.get_disk_budget()
+        if budget is None:
+            return eligible[: self.config["batch_size"]]
+        remaining, capacity = budget
+
+        batch, deferred, planned = [], 0, 0
+        for torrent_path in eligible:
+            if len(batch) >= self.config["batch_size"]:
+                break
+            size = self.metadata.total_size(torrent_path)
+            if size is None:
+                batch.append(torrent_path)
+                continue
+            if size > capacity:
+                logger.warning(
+                    f"Skipping {Path(torrent_path).name}: {_format_size(size)} "
+                    f"exceeds usable disk capacity ({_format_size(capacity)})"
+                )
+                self.state.setdefault("seeded_this_cycle", []).append(torrent_path)
+                continue
+            if size > remaining:
+                deferred += 1
+                logger.debug(
+                    f"Deferring {Path(torrent_path).name} ({_format_size(size)}) — "
+                    f"only {_format_size(remaining)} left in budget"
+                )
+                continue
+            batch.append(torrent_path)
+            remaining -= size
+            planned += size
+
+        logger.info(
+            f"Disk budget: {_format_size(planned)} planned, "
+            f"{_format_size(remaining)} spare"
+            + (f", {deferred} deferred to a later batch" if deferred else "")
+        )
+        return batch
+
+    @contextmanager
+    def _phase(self, name: str):
+        """Time one rotation phase as a trace span and a metrics observation."""
+        previous = self._current_phase
+        self._set_phase(name)
+        try:
+            with TRACER.span(f"phase {name}"), METRICS.timer(
+                "route23_phase_duration_seconds", phase=name
+            ):
+                yield
+        finally:
+            self._set_phase(previous)
+
+    def _set_phase(self, name: str):
+        self._current_phase = name
+        if self.sampler:
+            self.sampler.phase = "" if name == "-" else name
+        if self.profiler:
+            self.profiler.mark(name)
+
+    @TRACER.traced()
+    def rotate(self, delete_old_data: bool = False):
+        """Perform the rotation: remove old batch, add new batch with throttling."""
+        if self.config["rotation_engine"] == "async":
+            return AsyncRotationEngine(self).run("rotate", delete_old_data)
+        self._begin_rotation()
+        with self._phase("remove"):
+            self.remove_all_active(delete_data=delete_old_data)
+
+        logger.info(
+            f"Waiting {self.config['startup_delay']}s for system to settle..."
+        )
+        with self._phase("settle"):
+            self.throttled_sleep(
+                self.config["startup_delay"], "post-removal cooldown"
+            )
+
+        with self._phase("select"):
+            new_batch = self.get_next_batch()
+        if not new_batch:
+            logger.warning("No torrents found to add!")
+            return
+
+        total = len(new_batch)
+        logger.info(
+            f"Adding {total} torrents with {self.config['add_delay']}s delay between each"
+        )
+        self.state["batch_info"] = {}
+        with self._phase("add"):
+            added = self._add_batch(new_batch)
+
+        with self._phase("hashcheck"):
+            self.finish_hash_checks()
+        self._finish_rotation(added, total)
+
+    def _begin_rotation(self):
+        logger.info("=" * 50)
+        logger.info("Starting rotation")
+        logger.info(f"Configuration: {describe_config(self.config)}")
+        self.start_sampler()
+        self._run_start = {
+            "rpc": METRICS.totals("route23_rpc_latency_seconds"),
+            "load": (self.load_checks, self.load_waited),
+        }
+
+        if self.deleter:
+            self.deleter.resume()
+        self.notifier.outbox.resume()
+
+    def _finish_rotation(self, added: list, total: int):
+        """Make the added torrents the current batch, save state and send the digest."""
+        self.state["current_batch"] = added
+        self.state["batch_started"] = datetime.now().isoformat()
+        self.state.setdefault("seeded_this_cycle", [])
+        self.state["seeded_this_cycle"].extend(added)
+        self.state["current_index"] = len(self.state["seeded_this_cycle"])
+        self.state["completed_batches"] += 1
+        self._record_run_perf()
+
+        with self._phase("save"):
+            self.save_state()
+        self.export_metrics()
+        logger.info(f"Rotation complete. Added {len(added)}/{total} torrents.")
+        logger.info(f"Next rotation in {self.config['rotation_days']} days")
+
+        self.notifier.flush()
+
+    def _remember_batch_torrent(self, torrent_path: str):
+        """Keep a batch torrent's name, size and info hash in state for status."""
+        entry = self.metadata.get(torrent_path)
+        info = self.state.setdefault("batch_info", {}).setdefault(torrent_path, {})
+        info["name"] = entry["name"] if entry else Path(torrent_path).stem
+        if entry:
+            info["info_hash"] = entry["info_hash"]
+            info["size"] = entry["total_size"]
+
+    def _record_preload(self, torrent_path: str, result: PreloadResult):
+        info = self.state.setdefault("batch_info", {}).setdefault(torrent_path, {})
+        info["preload"] = {
+            "success": result.success,
+            "remote_dir": result.remote_dir,
+            "bytes": result.total_bytes(),
+            "reason": result.reason,
+            "at": datetime.now().isoformat(timespec="seconds"),
+        }
+
+    def _record_added(self, torrent_path: str):
+        """Count a torrent that rtorrent accepted toward its seeding history."""
+        self._remember_batch_torrent(torrent_path)
+        file_hash = self.get_torrent_hash(torrent_path)
+        if file_hash not in self.state["torrent_history"]:
+            self.state["torrent_history"][file_hash] = {
+                "times_seeded": 0,
+                "path": torrent_path,
+            }
+        self.state["torrent_history"][file_hash]["times_seeded"] += 1
+        self.state["torrent_history"][file_hash]["last_seeded"] = (
+            datetime.now().isoformat()
+        )
+
+    def _add_batch(self, new_batch: list) -> list:
+        """Add each torrent with throttling, preloading as we go. Returns those added."""
+        total = len(new_batch)
+        added = []
+        for i, torrent_path in enumerate(new_batch, 1):
+            self.progress = {"done": i - 1, "total": total}
+            if self.rtorrent.unavailable:
+                logger.error(
+                    f"rtorrent unavailable — stopping after {len(added)} additions"
+                )
+                break
+            if self.hashcheck.pending:
+                self.hashcheck.pump()
+            current_load = self.wait_for_low_load()
+            logger.info(
+                f"[{i}/{total}] Adding: {Path(torrent_path).name} (load: {current_load:.2f})"
+            )
+
+            if self.add_torrent(torrent_path):
+                added.append(torrent_path)
+                self._record_added(torrent_path)
+
+                if self.preloader:
+                    preload_result = self.preloader.preload(
+                        torrent_path, self.config["download_dir"]
+                    )
+                    self.notifier.add(preload_result)
+                    self._record_preload(torrent_path, preload_result)
+                    if preload_result.success:
+                        try:
+                            rt_hash = self.find_rtorrent_hash(
+                                preload_result.torrent_name
+                            )
+                            if rt_hash:
+                                self.queue_hash_check(
+                                    rt_hash,
+                                    preload_result.torrent_name,
+                                    torrent_path,
+                                )
+                            else:
+                                logger.warning(
+                                    f"Preload: could not find rtorrent hash for "
+                                    f"'{preload_result.torrent_name}' to trigger recheck"
+                                )
+                        except Exception as e:
+                            logger.warning(
+                                f"Preload: hash check step failed — {e}"
+                            )
+
+            if i < total:
+                self.throttled_sleep(
+                    self.config["add_delay"], "between additions"
+                )
+        self.progress = {"done": total, "total": total}
+        return added
+
+    @TRACER.traced()
+    def repreload(self):
+        """Re-run preload against the currently active batch.
+
+        Useful when the original rotation could not reach the remote machine
+        (e.g. it was offline) and the torrents are still seeding empty. For
+        each torrent in the saved current batch, this re-attempts the SCP
+        copy and triggers an rtorrent hash recheck on success.
+        """
+        if not self.preloader:
+            logger.error("Repreload requested but PRELOAD_ENABLED is not set")
+            return
+        if self.config["rotation_engine"] == "async":
+            return AsyncRotationEngine(self).run("repreload")
+
+        batch = self.state.get("current_batch", [])
+        if not batch:
+            logger.warning("Repreload: no current batch in state, nothing to do")
+            return
+
+        logger.info(f"Repreload: re-attempting {len(batch)} torrent(s)")
+        self.start_sampler()
+
+        with self._phase("preload"):
+            for i, torrent_path in enumerate(batch, 1):
+                self.progress = {"done": i - 1, "total": len(batch)}
+                if self.rtorrent.unavailable:
+                    logger.error("Repreload: rtorrent unavailable — stopping")
+                    break
+                if not Path(torrent_path).exists():
+                    logger.warning(
+                        f"[{i}/{len(batch)}] torrent file missing: {torrent_path}"
+                    )
+                    continue
+
+                if self._already_complete(torrent_path, f"[{i}/{len(batch)}]"):
+                    continue
+
+                self.wait_for_low_load()
+                logger.info(f"[{i}/{len(batch)}] Repreload: {Path(torrent_path).name}")
+
+                result = self.preloader.preload(
+                    torrent_path, self.config["download_dir"]
+                )
+                self.notifier.add(result)
+                self._record_preload(torrent_path, result)
+
+                if result.success:
+                    try:
+                        rt_hash = self.find_rtorrent_hash(result.torrent_name)
+                        if rt_hash:
+                            self.queue_hash_check(
+                                rt_hash, result.torrent_name, torrent_path
+                            )
+                        else:
+                            logger.warning(
+                                f"Repreload: could not find rtorrent hash for "
+                                f"'{result.torrent_name}' to trigger recheck"
+                            )
+                    except Exception as e:
+                        logger.warning(f"Repreload: hash check step failed — {e}")
+        self.progress = {"done": len(batch), "total": len(batch)}
+
+        with self._phase("hashcheck"):
+            self.finish_hash_checks()
+        logger.info("Repreload complete")
+        with self._phase("save"):
+            self.save_state()
+        self.notifier.flush()
+
+    def _already_complete(self, torrent_path: str, prefix: str) -> bool:
+        """True if rtorrent already reports the torrent fully downloaded; logs its progress."""
+        try:
+            torrent_name = parse_torrent(torrent_path)["name"]
+            rt_hash = self.find_rtorrent_hash(torrent_name, retries=1)
+            if rt_hash:
+                done = int(self.rtorrent.d.bytes_done(rt_hash))
+                total = int(self.rtorrent.d.size_bytes(rt_hash))
+                if total > 0 and done >= total:
+                    logger.info(
+                        f"{prefix} Skipping '{torrent_name}' "
+                        f"— already 100% ({_format_size(total)})"
+                    )
+                    return True
+                if total > 0:
+                    pct = done * 100 / total
+                    logger.info(
+                        f"{prefix} '{torrent_name}' is "
+                        f"{pct:.1f}% complete "
+                        f"({_format_size(done)} / {_format_size(total)})"
+                    )
+        except Exception as e:
+            logger.warning(f"Repreload: completion check failed — {e}")
+        return False
+
+    @TRACER.traced()
+    def force_preload_one(
+        self, torrent_substring: str, remote_dir_override: str = ""
+    ):
+        """Re-stage data for a single torrent and recheck it.
+
+        Looks for the torrent file by case-insensitive substring against the
+        current batch first, then the full torrent directory. If
+        remote_dir_override is set, that exact remote directory is used,
+        bypassing the auto-matcher (useful when the Plex dir name differs from
+        what the matcher expects).
+        """
+        if not self.preloader:
+            logger.error(
+                "Force preload requested but PRELOAD_ENABLED is not set"
+            )
+            return
+        if self.config["rotation_engine"] == "async":
+            return AsyncRotationEngine(self).run(
+                "force_preload_one", torrent_substring, remote_dir_override
+            )
+        self.start_sampler()
+
+        target = self._force_preload_target(torrent_substring)
+        if target is None:
+            return
+        torrent_path, torrent_info = target
+
+        if remote_dir_override:
+            logger.info(
+                f"Force preload: using remote dir override '{remote_dir_override}'"
+            )
+            result = self.preloader._staging_result(
+                PreloadResult(
+                    torrent_name=torrent_info["name"],
+                    success=False,
+                    remote_dir=remote_dir_override,
+                ),
+                *self.preloader.fetch_and_stage(
+                    remote_dir_override,
+                    torrent_info,
+                    self.config["download_dir"],
+                ),
+            )
+        else:
+            result = self.preloader.preload(
+                torrent_path, self.config["download_dir"]
+            )
+        if not self._accept_force_preload(torrent_path, result, remote_dir_override):
+            return
+
+        rt_hash = self.find_rtorrent_hash(result.torrent_name)
+        if not rt_hash:
+            self._force_preload_not_loaded(result.torrent_name)
+            return
+
+        self.hashcheck.submit(
+            rt_hash, result.torrent_name, self.metadata.total_size(torrent_path)
+        )
+        done = self.finish_hash_checks().get(rt_hash, 0)
+        self._finish_force_preload(rt_hash, result.torrent_name, done)
+
+    def _force_preload_target(
+        self, torrent_substring: str, action: str = "Force preload"
+    ) -> tuple[str, dict] | None:
+        """Resolve a torrent substring to exactly one (torrent_path, torrent_info), or log why not.
+
+        action prefixes the log lines (FORCE_PRELOAD_TORRENT and PROMOTE_TORRENT share this).
+        """
+        needle = torrent_substring.strip().lower()
+        if not needle:
+            logger.error(f"{action}: no torrent substring given")
+            return None
+
+        batch = self.state.get("current_batch", [])
+        candidates = [t for t in batch if needle in Path(t).name.lower()]
+        source = "current_batch"
+
+        if not candidates:
+            all_torrents = self.get_torrent_files()
+            candidates = [
+                t for t in all_torrents if needle in Path(t).name.lower()
+            ]
+            source = "torrent_dir"
+
+        if not candidates:
+            logger.error(
+                f"{action}: no .torrent file matched '{torrent_substring}'"
+            )
+            return None
+
+        if len(candidates) > 1:
+            names = [Path(t).name for t in candidates[:5]]
+            logger.error(
+                f"{action}: {len(candidates)} torrents matched "
+                f"'{torrent_substring}' — narrow the substring. First few: {names}"
+            )
+            return None
+
+        torrent_path = candidates[0]
+        if not Path(torrent_path).exists():
+            logger.error(
+                f"{action}: torrent file missing on disk: {torrent_path}"
+            )
+            return None
+
+        logger.info(
+            f"{action}: targeting {Path(torrent_path).name} (from {source})"
+        )
+
+        try:
+            torrent_info = parse_torrent(torrent_path)
+        except Exception as e:
+            logger.error(f"{action}: could not parse torrent — {e}")
+            return None
+        return torrent_path, torrent_info
+
+    def _accept_force_preload(
+        self, torrent_path: str, result: PreloadResult, remote_dir_override: str
+    ) -> bool:
+        """Queue the result for the digest; on failure log it and send the digest now."""
+        if not result.success:
+            if remote_dir_override:
+                logger.error(f"Force preload: staging failed — {result.reason}")
+            else:
+                logger.error(
+                    f"Force preload: auto-match failed — {result.reason}. "
+                    f"Set FORCE_PRELOAD_REMOTE_DIR to bypass the matcher."
+                )
+            self.notifier.add(result)
+            self.notifier.flush()
+            return False
+
+        self.notifier.add(result)
+        if torrent_path in self.state.get("current_batch", []):
+            self._record_preload(torrent_path, result)
+        return True
+
+    def _force_preload_not_loaded(self, torrent_name: str):
+        logger.error(
+            f"Force preload: could not find rtorrent hash for "
+            f"'{torrent_name}'. Is the torrent loaded in rtorrent?"
+        )
+        self.notifier.flush()
+
+    def _finish_force_preload(self, rt_hash: str, torrent_name: str, done: int):
+        """Save state, make sure a verified torrent is started, and send the digest."""
+        self.save_state()
+
+        if done > 0:
+            try:
+                self.rtorrent.d.start(rt_hash)
+                logger.info(
+                    f"Force preload: ensured '{torrent_name}' is started"
+                )
+            except Exception as e:
+                logger.warning(
+                    f"Force preload: could not start torrent — {e}"
+                )
+
+        self.notifier.flush()
+
+    def promote(self, torrent_substring: str, plex_name: str = "") -> bool:
+        """Hardlink a finished torrent into the Plex movie library and remember where it went.
+
+        plex_name is the library directory, 'Title (YEAR) {imdb-ttXXXXXXX}';
+        without it the torrent's own name must already be one. The torrent
+        keeps seeding from its download path. If BACKUP_MEDIA_DIR is set,
+        the promoted files alone are copied there.
+        """
+        target = self._force_preload_target(torrent_substring, action="Promote")
+        if target is None:
+            return False
+        _, torrent_info = target
+        name = torrent_info["name"]
+        dirname = plex_name.strip() or (
+            name if torrent_info["multi_file"] else Path(name).stem
+        )
+        if not PlexLibraryVerifier.MOVIE_DIR.match(dirname):
+            logger.error(
+                f"Promote: '{dirname}' is not a Plex movie directory name — set "
+                f"PROMOTE_AS to 'Title (YEAR) {{imdb-ttXXXXXXX}}'"
+            )
+            return False
+
+        try:
+            rows = [r for r in self.snapshot("d.name", "d.complete") if r["d.name"] == name]
+        except Exception as e:
+            logger.warning(
+                f"Promote: could not ask rtorrent whether '{name}' is complete ({e}) "
+                f"— checking file sizes only"
+            )
+            rows = []
+        if rows and not int(rows[0]["d.complete"]):
+            logger.error(f"Promote: '{name}' has not finished downloading")
+            return False
+
+        promoter = LibraryPromoter(self.config)
+        record, reason = promoter.promote(torrent_info, dirname)
+        if record is None:
+            logger.error(f"Promote: {reason}")
+            return False
+        self.state.setdefault("promoted", {})[name] = record
+        if self.preloader:
+            self.preloader.load_promoted(self.state["promoted"])
+        self.save_state()
+        logger.info(f"Promote: '{name}' is in the library as '{dirname}'")
+
+        issues = PlexLibraryVerifier(self.config).update_entry("movies", dirname)
+        for issue in issues or []:
+            logger.warning(f"Promote: {dirname}: {issue}")
+        if promoter.backup_dir:
+            return self._backup_promoted(promoter, [record])
+        return True
+
+    def backup_promoted(self) -> bool:
+        """Bring BACKUP_MEDIA_DIR up to date with every promoted title."""
+        promoter = LibraryPromoter(self.config)
+        if not promoter.backup_dir:
+            logger.error("Backup: BACKUP_MEDIA_DIR is not set")
+            return False
+        return self._backup_promoted(
+            promoter, list(self.state.get("promoted", {}).values())
+        )
+
+    @staticmethod
+    def _backup_promoted(promoter: "LibraryPromoter", records: list[dict]) -> bool:
+        paths = [p for record in records for p in promoter.library_paths(record)]
+        start = time.monotonic()
+        stats = promoter.backup(paths)
+        logger.info(
+            f"Backup: {stats['copied']} file(s) copied ({_format_size(stats['bytes'])}), "
+            f"{stats['current']} already current, {stats['failed']} failed "
+            f"in {time.monotonic() - start:.1f}s"
+        )
+        return not stats["failed"]
+
+    STATUS_FIELDS = (
+        "d.hash",
+        "d.name",
+        "d.size_bytes",
+        "d.bytes_done",
+        "d.ratio",
+        "d.up.rate",
+        "d.down.rate",
+        "d.up.total",
+        "d.hashing",
+        "d.state",
+        "d.peers_connected",
+    )
+
+    def count_torrent_files(self) -> int:
+        """Count .torrent files in TORRENT_DIR without stat-ing or sorting them."""
+        try:
+            with os.scandir(self.config["torrent_dir"]) as entries:
+                return sum(
+                    1
+                    for e in entries
+                    if e.name.endswith(".torrent") and not e.name.startswith(".")
+                )
+        except OSError:
+            return 0
+
+    def _status_rows(self) -> tuple[list[dict] | None, str, list[dict]]:
+        """Every torrent's status fields in one d.multicall2 per rtorrent instance.
+
+        Uses its own client with a single attempt and a short timeout, so a
+        dashboard poll never waits out retries or queues behind a rotation's
+        calls. Returns (rows, error, per-instance summaries); rows is None
+        only if no instance answered.
+        """
+        config = dict(self.config, rpc_max_attempts=1)
+        client = make_rtorrent_client(config, min(config["rpc_timeout"], 5.0))
+        args = ("", "main", *(f"{f}=" for f in self.STATUS_FIELDS))
+        if isinstance(client, RtorrentPool):
+            results = client.multicall_by_instance(*args)
+        else:
+            try:
+                results = {"rtorrent": (client.d.multicall2(*args), "")}
+            except Exception as e:
+                results = {"rtorrent": (None, str(e))}
+
+        rows, errors, instances = [], [], []
+        for name, (part, error) in results.items():
+            part_rows = [dict(zip(self.STATUS_FIELDS, row), instance=name) for row in part or []]
+            rows.extend(part_rows)
+            if error:
+                errors.append(f"{name}: {error}" if len(results) > 1 else error)
+            instances.append(
+                {
+                    "name": name,
+                    "reachable": part is not None,
+                    "error": error or None,
+                    "torrents": len(part_rows),
+                    "up_rate": sum(int(r["d.up.rate"]) for r in part_rows),
+                    "down_rate": sum(int(r["d.down.rate"]) for r in part_rows),
+                }
+            )
+        reachable = any(i["reachable"] for i in instances)
+        return (rows if reachable else None), "; ".join(errors), instances
+
+    @staticmethod
+    def _torrent_status(path: str | None, info: dict, row: dict | None) -> dict:
+        entry = {
+            "name": info.get("name") or (Path(path).stem if path else ""),
+            "path": path,
+            "info_hash": info.get("info_hash"),
+            "in_batch": path is not None,
+            "state": "missing",
+            "size": info.get("size"),
+            "bytes_done": None,
+            "progress": None,
+            "ratio": None,
+            "up_rate": None,
+            "down_rate": None,
+            "up_total": None,
+            "peers": None,
+            "instance": None,
+            "preload": info.get("preload"),
+        }
+        if row is None:
+            return entry
+        size = int(row["d.size_bytes"])
+        done = int(row["d.bytes_done"])
+        if int(row["d.hashing"]):
+            state = "checking"
+        elif not int(row["d.state"]):
+            state = "stopped"
+        elif size and done >= size:
+            state = "seeding"
+        else:
+            state = "downloading"
+        entry.update(
+            name=row["d.name"],
+            info_hash=row["d.hash"].upper(),
+            state=state,
+            size=size,
+            bytes_done=done,
+            progress=round(done / size, 4) if size else 0.0,
+            ratio=int(row["d.ratio"]) / 1000,
+            up_rate=int(row["d.up.rate"]),
+            down_rate=int(row["d.down.rate"]),
+            up_total=int(row["d.up.total"]),
+            peers=int(row["d.peers_connected"]),
+            instance=row.get("instance"),
+        )
+        return entry
+
+    def status_snapshot(self) -> dict:
+        """Status as a dict, from state and one d.multicall2 per rtorrent instance.
+
+        Batch torrents are described from the info recorded at rotation
+        time, so neither TORRENT_DIR nor the metadata cache is read in full.
+        """
+        now = datetime.now()
+        rows, error, instances = self._status_rows()
+        by_hash = {row["d.hash"].upper(): row for row in rows or []}
+        batch_info = self.state.get("batch_info", {})
+
+        torrents = []
+        for path in self.state.get("current_batch", []):
+            info = batch_info.get(path)
+            if info is None:
+                # Batches from before batch_info was recorded.
+                entry = self.metadata.get(path) or {}
+                info = {
+                    "name": entry.get("name"),
+                    "info_hash": entry.get("info_hash"),
+                    "size": entry.get("total_size"),
+                }
+            torrents.append(
+                self._torrent_status(path, info, by_hash.pop(info.get("info_hash"), None))
+            )
+        torrents.extend(self._torrent_status(None, {}, row) for row in by_hash.values())
+
+        started = self.state.get("batch_started")
+        next_rotation = eta = None
+        if started:
+            due = datetime.fromisoformat(started) + timedelta(
+                days=self.config["rotation_days"]
+            )
+            next_rotation = due.isoformat(timespec="seconds")
+            eta = max(0.0, round((due - now).total_seconds()))
+
+        preloads = [t["preload"] for t in torrents if t["in_batch"] and t["preload"]]
+        return {
+            "generated_at": now.isoformat(timespec="seconds"),
+            "phase": self._current_phase,
+            "library": {
+                "torrent_files": self.count_torrent_files(),
+                "seeded_this_cycle": len(self.state.get("seeded_this_cycle", [])),
+                "completed_batches": self.state.get("completed_batches", 0),
+            },
+            "batch": {
+                "size": len(self.state.get("current_batch", [])),
+                "batch_size": self.config["batch_size"],
+                "started": started,
+                "rotation_days": self.config["rotation_days"],
+                "next_rotation": next_rotation,
+                "next_rotation_eta_seconds": eta,
+                "rotation_due": started is None or eta == 0,
+            },
+            "rtorrent": {
+                "reachable": rows is not None,
+                "error": error or None,
+                "torrents": len(rows or []),
+                "up_rate": sum(int(r["d.up.rate"]) for r in rows or []),
+                "down_rate": sum(int(r["d.down.rate"]) for r in rows or []),
+                "instances": instances,
+            },
+            "torrents": torrents,
+            "hashcheck": {
+                "checking": [
+                    {
+                        "info_hash": t["info_hash"],
+                        "name": t["name"],
+                        "bytes_done": t["bytes_done"],
+                        "size": t["size"],
+                    }
+                    for t in torrents
+                    if t["state"] == "checking"
+                ],
+                "scheduler": self.hashcheck.describe(),
+            },
+            "preload": {
+                "enabled": self.preloader is not None,
+                "succeeded": sum(1 for p in preloads if p["success"]),
+                "failed": sum(1 for p in preloads if not p["success"]),
+                "bytes": sum(p["bytes"] for p in preloads),
+                "sources": (
+                    self.preloader.export_stats()
+                    if self.preloader
+                    else self.state.get("preload_sources", {})
+                ),
+            },
+            "deletions": {
+                "pending": self.deleter.pending_count if self.deleter else 0,
+                "reclaimed_bytes": self.deleter.reclaimed_bytes if self.deleter else 0,
+            },
+            "mail": {"spooled": self.notifier.outbox.pending_count},
+            "system_load": self.get_system_load(),
+        }
+
+    def status(self, fmt: str = "text"):
+        """Print current status, as a table or (fmt="json") as JSON on stdout."""
+        snapshot = self.status_snapshot()
+        if fmt == "json":
+            print(json.dumps(snapshot, indent=2))
+            return
+
+        library, batch = snapshot["library"], snapshot["batch"]
+        rtorrent = snapshot["rtorrent"]
+        print("\n" + "=" * 50)
+        print("TORRENT ROTATOR STATUS")
+        print("=" * 50)
+        print(f"Total .torrent files:     {library['torrent_files']}")
+        if rtorrent["reachable"]:
+            print(f"Currently active:         {rtorrent['torrents']}")
+            print(
+                f"Transfer rate:            {_format_size(rtorrent['up_rate'])}/s up, "
+                f"{_format_size(rtorrent['down_rate'])}/s down"
+            )
+        else:
+            print(f"rtorrent:                 unreachable ({rtorrent['error']})")
+        if len(rtorrent["instances"]) > 1:
+            for inst in rtorrent["instances"]:
+                detail = (
+                    f"{inst['torrents']} torrents, {_format_size(inst['up_rate'])}/s up"
+                    if inst["reachable"]
+                    else f"unreachable ({inst['error']})"
+                )
+                print(f"  {inst['name'][:22] + ':':<24}{detail}")
+        print(f"Batch size:               {self.config['batch_size']}")
+        print(f"Rotation period:          {self.config['rotation_days']} days")
+        print(f"Completed batches:        {library['completed_batches']}")
+        print(
+            f"Seeded this cycle:        {library['seeded_this_cycle']} / {library['torrent_files']}"
+        )
 
-    def add_torrent(self, torrent_path: str) -> bool:
-        """Add a torrent to rtorrent."""
-        try:
-            with open(torrent_path, "rb") as f:
-                torrent_data = f.read()
+        print("-" * 50)
+        print("PERFORMANCE SETTINGS")
+        print("-" * 50)
+        print(f"Current system load:      {snapshot['system_load']:.2f}")
+        print(f"Max load threshold:       {self.config['max_load']}")
+        print(f"Add delay:                {self.config['add_delay']}s")
+        print(f"Remove delay:             {self.config['remove_delay']}s")
+        print(f"Load wait time:           {self.config['load_wait']}s")
+        if self.deleter:
+            print(
+                f"Pending deletions:        {snapshot['deletions']['pending']} "
+                f"({_format_size(snapshot['deletions']['reclaimed_bytes'])} reclaimed to date)"
+            )
+        if snapshot["mail"]["spooled"]:
+            print(f"Spooled digest emails:    {snapshot['mail']['spooled']}")
 
-            last_fault = None
-            for attempt in range(3):
-                try:
-                    self.rtorrent.load.raw_start(
-                        "",
-                        xmlrpc.client.Binary(torrent_data),
-                        f"d.directory.set={self.config['download_dir']}",
-                    )
-                    break
-                except xmlrpc.client.Fault as fault:
-                    if fault.faultCode != -507:
-                        raise
-                    last_fault = fault
-                    logger.warning(
-                        f"Transient trust fault adding {Path(torrent_path).name} "
-                        f"(attempt {attempt + 1}/3): {fault.faultString}"
-                    )
-                    time.sleep(2)
-            else:
-                raise last_fault
+        est_add_time = self.config["batch_size"] * self.config["add_delay"]
+        print(
+            f"Est. add time:            ~{est_add_time // 60:.0f}m {est_add_time % 60:.0f}s"
+            " (PLAN_ROTATION=true simulates the whole rotation)"
+        )
 
-            logger.info(f"Added torrent: {Path(torrent_path).name}")
-            return True
-        except Exception as e:
-            logger.error(f"Failed to add torrent {torrent_path}: {e}")
-            return False
+        if batch["started"]:
+            started = datetime.fromisoformat(batch["started"])
+            elapsed = datetime.now() - started
+            eta = timedelta(seconds=batch["next_rotation_eta_seconds"])
+            print("-" * 50)
+            print(
+                f"Batch started:            {started.strftime('%Y-%m-%d %H:%M')}"
+            )
+            print(
+                f"Time elapsed:             {elapsed.days}d {elapsed.seconds // 3600}h"
+            )
+            if not batch["rotation_due"]:
+                print(
+                    f"Time remaining:           {eta.days}d {eta.seconds // 3600}h"
+                )
+            else:
+                print("Status:                   READY TO ROTATE")
+        else:
+            print("-" * 50)
+            print("Status:                   NOT STARTED")
 
-    def remove_torrent(
-        self, info_hash: str, delete_data: bool = False
-    ) -> bool:
-        """Remove a torrent from rtorrent, optionally deleting downloaded files."""
-        try:
-            base_path = None
-            if delete_data:
-                try:
-                    base_path = self.rtorrent.d.base_path(info_hash)
-                except Exception as e:
-                    logger.warning(
-                        f"Could not get base path for {info_hash[:8]}: {e}"
+        batch_torrents = [t for t in snapshot["torrents"] if t["in_batch"]]
+        if batch_torrents:
+            print("-" * 50)
+            print("CURRENT BATCH")
+            print("-" * 50)
+            for t in batch_torrents:
+                if t["progress"] is None:
+                    detail = "not in rtorrent"
+                else:
+                    detail = (
+                        f"{t['progress'] * 100:5.1f}%  ratio {t['ratio']:.2f}  "
+                        f"{_format_size(t['up_rate'])}/s up"
                     )
+                print(f"{t['state']:<11} {t['name'][:40]:<40}  {detail}")
+            queued = [
+                j for j in snapshot["hashcheck"]["scheduler"] if j["state"] == "queued"
+            ]
+            checking = len(snapshot["hashcheck"]["checking"])
+            if checking or queued:
+                print(f"Hash checks:              {checking} running, {len(queued)} queued")
 
-            last_fault = None
-            for attempt in range(3):
-                try:
-                    self.rtorrent.d.stop(info_hash)
-                    self.rtorrent.d.close(info_hash)
-                    self.rtorrent.d.erase(info_hash)
-                    break
-                except xmlrpc.client.Fault as fault:
-                    if fault.faultCode != -507:
-                        raise
-                    last_fault = fault
-                    logger.warning(
-                        f"Transient trust fault removing {info_hash[:8]} "
-                        f"(attempt {attempt + 1}/3): {fault.faultString}"
-                    )
-                    time.sleep(2)
-            else:
-                raise last_fault
-            logger.info(f"Removed torrent: {info_hash}")
+        print("=" * 50 + "\n")
 
-            if delete_data and base_path:
-                self._delete_path(base_path)
+    def export_metrics(self):
+        """Refresh state-derived gauges and write METRICS_TEXTFILE if configured."""
+        METRICS.set("route23_batch_torrents", len(self.state.get("current_batch", [])))
+        if self.state.get("batch_started"):
+            started = datetime.fromisoformat(self.state["batch_started"])
+            METRICS.set("route23_last_rotation_timestamp_seconds", started.timestamp())
+        if self.deleter:
+            METRICS.set("route23_pending_deletions", self.deleter.pending_count)
+        METRICS.set("route23_spooled_mail", self.notifier.outbox.pending_count)
+        METRICS.write_textfile(self.config["metrics_textfile"])
 
-            return True
-        except Exception as e:
-            logger.error(f"Failed to remove torrent {info_hash}: {e}")
-            return False
+    def run(self, force: bool = False, delete_data: bool = False):
+        """Main run method - check if rotation needed and perform if so."""
+        if force:
+            logger.info("Forced rotation requested")
+            self.rotate(delete_old_data=delete_data)
+        elif self.should_rotate():
+            self.rotate(delete_old_data=delete_data)
+        else:
+            logger.info("No rotation needed at this time")
 
-    def _delete_path(self, path: str):
-        """Delete a file or directory left behind by a removed torrent."""
-        p = Path(path)
-        if not p.exists():
-            logger.debug(f"Nothing to delete, path does not exist: {path}")
-            return
+
+class AsyncRotationEngine:
+    """Runs rotate, repreload and force_preload_one on an asyncio event loop.
+
+    Selected with ROTATION_ENGINE=async. The sync engine takes a batch one
+    torrent at a time: add, preload, find its hash, queue the recheck, then
+    ADD_DELAY before the next. Here each torrent is its own task, so one
+    slow copy or recheck no longer holds up the rest. Concurrency is capped
+    by explicit semaphores: rtorrent calls get one slot per instance, file
+    transfers get PRELOAD_CONCURRENCY. Additions are still spaced ADD_DELAY
+    apart and held back while load is above MAX_LOAD. Rechecks go through
+    the rotator's HashCheckScheduler, pumped by a single watcher task, and
+    each torrent is verified as soon as its own recheck finishes.
+
+    RPC reuses the rotator's policy-wrapped client in worker threads, so
+    retries, the circuit breaker and per-instance routing are unchanged.
+    Transfers run as asyncio subprocesses and every wait is an asyncio
+    sleep, so SIGTERM cancels the run promptly and kills transfers in flight.
+    """
+
+    def __init__(self, rotator: "TorrentRotator"):
+        self.rotator = rotator
+        self.config = rotator.config
+
+    def run(self, action: str, *args):
+        """Run one entry point (rotate, repreload, force_preload_one) to completion."""
+        import asyncio
+
+        return asyncio.run(self._main(getattr(self, action), args))
+
+    async def _main(self, action, args):
+        import asyncio
+        import signal
+
+        # Created here so they belong to this run's event loop.
+        instances = len(self.config.get("rtorrent_instances") or [None])
+        self._rpc_slots = asyncio.Semaphore(instances)
+        self._transfer_slots = asyncio.Semaphore(
+            max(1, self.config["preload_concurrency"])
+        )
+        self._hash_lock = asyncio.Lock()
+        self._add_lock = asyncio.Lock()
+        self._next_add = 0.0
+        self._added: list[str] = []
+        self._stopped = False
+        self._watches: dict[str, asyncio.Future] = {}
+        self._watcher: asyncio.Task | None = None
+        self._wake = asyncio.Event()
+
+        loop = asyncio.get_running_loop()
+        task = asyncio.current_task()
+        terminated = []
+        # Signal handlers can only be installed from the main thread; API
+        # jobs run their actions on worker threads.
+        on_main = threading.current_thread() is threading.main_thread()
+        if on_main:
+            previous = signal.getsignal(signal.SIGTERM)
+            loop.add_signal_handler(
+                signal.SIGTERM, lambda: (terminated.append(True), task.cancel())
+            )
         try:
-            if p.is_dir():
-                shutil.rmtree(p)
-                logger.info(f"Deleted directory: {path}")
-            else:
-                p.unlink()
-                logger.info(f"Deleted file: {path}")
-        except Exception as e:
-            logger.error(f"Failed to delete {path}: {e}")
+            return await action(*args)
+        except asyncio.CancelledError:
+            if not terminated:
+                raise
+            logger.warning("SIGTERM received — run cancelled")
+            raise SystemExit(128 + signal.SIGTERM)
+        finally:
+            if self._watcher:
+                self._watcher.cancel()
+            if on_main:
+                loop.remove_signal_handler(signal.SIGTERM)
+                signal.signal(signal.SIGTERM, previous)
 
-    def remove_all_active(self, delete_data: bool = False):
-        """Remove all currently active torrents with delays."""
-        active = self.get_active_torrents()
-        total = len(active)
-        logger.info(f"Removing {total} active torrents")
+    async def rpc(self, fn, *args):
+        """Run a blocking rotator call that talks to rtorrent in a worker thread."""
+        import asyncio
 
-        for i, info_hash in enumerate(active, 1):
-            self.wait_for_low_load()
+        async with self._rpc_slots:
+            return await asyncio.to_thread(fn, *args)
 
-            logger.info(f"Removing torrent {i}/{total}: {info_hash[:8]}...")
-            self.remove_torrent(info_hash, delete_data)
+    async def sleep(self, seconds: float, reason: str = ""):
+        """throttled_sleep() that can be cancelled."""
+        import asyncio
 
-            if i < total:
-                self.throttled_sleep(
-                    self.config["remove_delay"], "between removals"
-                )
+        if seconds > 0:
+            if reason:
+                logger.debug(f"Waiting {seconds:.1f}s ({reason})")
+            await asyncio.sleep(seconds)
+            METRICS.inc(
+                "route23_throttle_sleep_seconds_total", seconds, reason=reason or "other"
+            )
 
-    def should_rotate(self) -> bool:
-        """Check if it's time to rotate to the next batch."""
-        if self.state["batch_started"] is None:
-            return True
+    async def wait_for_low_load(self) -> float:
+        import asyncio
 
-        started = datetime.fromisoformat(self.state["batch_started"])
-        rotation_period = timedelta(days=self.config["rotation_days"])
-        time_elapsed = datetime.now() - started
+        max_load = self.config["max_load"]
+        load_wait = self.config["load_wait"]
 
-        if time_elapsed >= rotation_period:
-            logger.info(f"Rotation period elapsed ({time_elapsed.days} days)")
-            return True
+        self.rotator.load_checks += 1
+        current_load = self.rotator.get_system_load()
+        while current_load > max_load:
+            logger.info(
+                f"System load {current_load:.2f} exceeds {max_load:.2f}, waiting {load_wait}s..."
+            )
+            await asyncio.sleep(load_wait)
+            METRICS.inc("route23_load_wait_seconds_total", load_wait)
+            self.rotator.load_waited += load_wait
+            current_load = self.rotator.get_system_load()
+        return current_load
 
-        remaining = rotation_period - time_elapsed
-        logger.info(
-            f"Time until next rotation: {remaining.days} days, {remaining.seconds // 3600} hours"
-        )
-        return False
+    async def find_rtorrent_hash(
+        self, torrent_name: str, retries: int = 6
+    ) -> str | None:
+        import asyncio
 
-    def get_next_batch(self) -> list:
-        """Get the next batch of torrent files to seed, skipping already-seeded ones."""
-        all_torrents = self.get_torrent_files()
-        if not all_torrents:
-            return []
+        for attempt in range(retries):
+            rt_hash = await self.rpc(
+                self.rotator.find_rtorrent_hash, torrent_name, 1
+            )
+            if rt_hash:
+                return rt_hash
+            if attempt < retries - 1:
+                await asyncio.sleep(0.5 + RpcPolicy.backoff_delay("trust", attempt))
+        return None
 
-        seeded = set(self.state.get("seeded_this_cycle", []))
-        eligible = [t for t in all_torrents if t not in seeded]
+    async def hash_check(
+        self, info_hash: str, torrent_name: str, torrent_path: str
+    ) -> dict:
+        """Queue a recheck and wait for it to finish. Returns the scheduler's job."""
+        import asyncio
 
-        if not eligible:
-            logger.info(
-                f"All {len(all_torrents)} torrents seeded this cycle — starting new cycle"
+        hashcheck = self.rotator.hashcheck
+        async with self._hash_lock:
+            hashcheck.submit(
+                info_hash, torrent_name, self.rotator.metadata.total_size(torrent_path)
             )
-            self.state["seeded_this_cycle"] = []
-            if self.config["sort_order"] == "random":
-                self.state["sort_seed"] = random.randint(0, 2**32)
-                all_torrents = self.get_torrent_files()
-            eligible = all_torrents
-
-        batch = eligible[: self.config["batch_size"]]
-        logger.info(
-            f"Next batch: {len(batch)} torrents "
-            f"({len(eligible)} eligible, {len(seeded)} seeded this cycle)"
+        future = self._watches.get(info_hash)
+        if future is None:
+            future = self._watches[info_hash] = asyncio.get_running_loop().create_future()
+        if self._watcher is None or self._watcher.done():
+            self._watcher = asyncio.create_task(self._watch())
+        self._wake.set()
+        return await future
+
+    async def _watch(self):
+        """Pump the recheck scheduler until every watched recheck has finished."""
+        import asyncio
+
+        hashcheck = self.rotator.hashcheck
+        last_report = time.monotonic()
+        try:
+            while self._watches:
+                self._wake.clear()
+                async with self._hash_lock:
+                    await self.rpc(hashcheck.pump)
+                for info_hash, future in list(self._watches.items()):
+                    job = hashcheck.job(info_hash)
+                    if job is None or job["finished"] is not None:
+                        del self._watches[info_hash]
+                        if not future.done():
+                            future.set_result(job or {"ok": False})
+                if not self._watches:
+                    break
+                if time.monotonic() - last_report >= 30:
+                    hashcheck.log_progress()
+                    last_report = time.monotonic()
+                try:
+                    async with asyncio.timeout(hashcheck.poll_interval):
+                        await self._wake.wait()
+                except TimeoutError:
+                    pass
+        except Exception as e:
+            for future in self._watches.values():
+                if not future.done():
+                    future.set_exception(e)
+            self._watches.clear()
+            raise
+
+    async def _recheck(self, torrent_name: str, torrent_path: str, label: str) -> int:
+        """Find a staged torrent's hash, recheck it, and verify the result. Returns bytes_done."""
+        try:
+            rt_hash = await self.find_rtorrent_hash(torrent_name)
+            if not rt_hash:
+                logger.warning(
+                    f"{label}: could not find rtorrent hash for "
+                    f"'{torrent_name}' to trigger recheck"
+                )
+                return 0
+            job = await self.hash_check(rt_hash, torrent_name, torrent_path)
+        except RtorrentUnavailable:
+            raise
+        except Exception as e:
+            logger.warning(f"{label}: hash check step failed — {e}")
+            return 0
+        if not job["ok"]:
+            return 0
+        return await self.rpc(
+            self.rotator._report_verified,
+            rt_hash,
+            job["name"],
+            job["done"],
+            job["total"],
         )
-        return batch
 
-    def rotate(self, delete_old_data: bool = False):
-        """Perform the rotation: remove old batch, add new batch with throttling."""
-        logger.info("=" * 50)
-        logger.info("Starting rotation")
+    def _rtorrent_lost(self, message: str) -> bool:
+        """True (logging message once) once rtorrent has stopped responding."""
+        if not self.rotator.rtorrent.unavailable:
+            return False
+        if not self._stopped:
+            logger.error(message)
+            self._stopped = True
+        return True
+
+    async def _run_all(self, coros) -> list:
+        """Run one task per torrent; the first unexpected error cancels the rest."""
+        import asyncio
+
+        tasks = [asyncio.create_task(c) for c in coros]
+        try:
+            return await asyncio.gather(*tasks)
+        finally:
+            for t in tasks:
+                t.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+    def _progress(self, total: int):
+        self.rotator.progress = {
+            "done": self.rotator.progress["done"] + 1,
+            "total": total,
+        }
 
-        self.remove_all_active(delete_data=delete_old_data)
+    async def rotate(self, delete_old_data: bool = False):
+        import asyncio
+
+        r = self.rotator
+        r._begin_rotation()
+        with r._phase("remove"):
+            await self._remove_all_active(delete_old_data)
 
         logger.info(
             f"Waiting {self.config['startup_delay']}s for system to settle..."
         )
-        self.throttled_sleep(
-            self.config["startup_delay"], "post-removal cooldown"
-        )
+        with r._phase("settle"):
+            await self.sleep(self.config["startup_delay"], "post-removal cooldown")
 
-        new_batch = self.get_next_batch()
+        with r._phase("select"):
+            new_batch = await asyncio.to_thread(r.get_next_batch)
         if not new_batch:
             logger.warning("No torrents found to add!")
             return
 
         total = len(new_batch)
-        added = []
-
         logger.info(
-            f"Adding {total} torrents with {self.config['add_delay']}s delay between each"
+            f"Adding {total} torrents with {self.config['add_delay']}s delay between "
+            f"each, preloading up to {self.config['preload_concurrency']} files at once"
         )
-
-        for i, torrent_path in enumerate(new_batch, 1):
-            current_load = self.wait_for_low_load()
-            logger.info(
-                f"[{i}/{total}] Adding: {Path(torrent_path).name} (load: {current_load:.2f})"
-            )
-
-            if self.add_torrent(torrent_path):
-                added.append(torrent_path)
-                file_hash = self.get_torrent_hash(torrent_path)
-                if file_hash not in self.state["torrent_history"]:
-                    self.state["torrent_history"][file_hash] = {
-                        "times_seeded": 0,
-                        "path": torrent_path,
-                    }
-                self.state["torrent_history"][file_hash]["times_seeded"] += 1
-                self.state["torrent_history"][file_hash]["last_seeded"] = (
-                    datetime.now().isoformat()
+        r.state["batch_info"] = {}
+        r.progress = {"done": 0, "total": total}
+        try:
+            with r._phase("add"):
+                results = await self._run_all(
+                    self._add_one(i, total, path) for i, path in enumerate(new_batch, 1)
                 )
+        except RtorrentUnavailable:
+            # Torrents rtorrent already took are the batch now; record them
+            # as the sync engine would before the run aborts.
+            added = [path for path in new_batch if path in self._added]
+            logger.error(
+                f"rtorrent unavailable — keeping the {len(added)} torrent(s) already added"
+            )
+            r.hashcheck.collect()
+            await asyncio.to_thread(r._finish_rotation, added, total)
+            raise
+        r.progress = {"done": total, "total": total}
+        r.hashcheck.collect()
+        r._record_hash_rate()
+
+        added = [path for path in results if path]
+        await asyncio.to_thread(r._finish_rotation, added, total)
+
+    async def _remove_all_active(self, delete_data: bool):
+        r = self.rotator
+        active, base_paths = await self.rpc(r._removal_plan)
+        total = len(active)
+        logger.info(f"Removing {total} active torrents")
 
-                if self.preloader:
-                    preload_result = self.preloader.preload(
-                        torrent_path, self.config["download_dir"]
-                    )
-                    self.notifier.add(preload_result)
-                    if preload_result.success:
-                        try:
-                            rt_hash = self.find_rtorrent_hash(
-                                preload_result.torrent_name
-                            )
-                            if rt_hash:
-                                self.trigger_hash_check(rt_hash)
-                                self.verify_preload_data(
-                                    rt_hash, preload_result.torrent_name
-                                )
-                            else:
-                                logger.warning(
-                                    f"Preload: could not find rtorrent hash for "
-                                    f"'{preload_result.torrent_name}' to trigger recheck"
-                                )
-                        except Exception as e:
-                            logger.warning(
-                                f"Preload: hash check step failed — {e}"
-                            )
-
-            if i < total:
-                self.throttled_sleep(
-                    self.config["add_delay"], "between additions"
+        for i, info_hash in enumerate(active, 1):
+            if r.rtorrent.unavailable:
+                raise RtorrentUnavailable(
+                    f"rtorrent stopped responding after {i - 1}/{total} removals"
                 )
+            await self.wait_for_low_load()
 
-        self.state["current_batch"] = added
-        self.state["batch_started"] = datetime.now().isoformat()
-        self.state.setdefault("seeded_this_cycle", [])
-        self.state["seeded_this_cycle"].extend(added)
-        self.state["current_index"] = len(self.state["seeded_this_cycle"])
-        self.state["completed_batches"] += 1
-
-        self.save_state()
-        logger.info(f"Rotation complete. Added {len(added)}/{total} torrents.")
-        logger.info(f"Next rotation in {self.config['rotation_days']} days")
-
-        self.notifier.flush()
-
-    def repreload(self):
-        """Re-run preload against the currently active batch.
-
-        Useful when the original rotation could not reach the remote machine
-        (e.g. it was offline) and the torrents are still seeding empty. For
-        each torrent in the saved current batch, this re-attempts the SCP
-        copy and triggers an rtorrent hash recheck on success.
-        """
-        if not self.preloader:
-            logger.error("Repreload requested but PRELOAD_ENABLED is not set")
-            return
+            logger.info(f"Removing torrent {i}/{total}: {info_hash[:8]}...")
+            await self.rpc(
+                r.remove_torrent, info_hash, delete_data, base_paths.get(info_hash)
+            )
 
-        batch = self.state.get("current_batch", [])
+            if i < total:
+                await self.sleep(self.config["remove_delay"], "between removals")
+
+    async def _add_one(self, i: int, total: int, torrent_path: str) -> str | None:
+        """Add, preload and recheck one batch torrent. Returns its path if rtorrent took it."""
+        r = self.rotator
+        # Additions happen one at a time, in batch order, ADD_DELAY apart.
+        async with self._add_lock:
+            await self.sleep(self._next_add - time.monotonic(), "between additions")
+            if self._rtorrent_lost("rtorrent unavailable — stopping additions"):
+                return None
+            current_load = await self.wait_for_low_load()
+            logger.info(
+                f"[{i}/{total}] Adding: {Path(torrent_path).name} (load: {current_load:.2f})"
+            )
+            ok = await self.rpc(r.add_torrent, torrent_path)
+            self._next_add = time.monotonic() + self.config["add_delay"]
+        if not ok:
+            self._progress(total)
+            return None
+        r._record_added(torrent_path)
+        self._added.append(torrent_path)
+
+        if r.preloader:
+            result = await r.preloader.preload_async(
+                torrent_path, self.config["download_dir"], self._transfer_slots
+            )
+            r.notifier.add(result)
+            r._record_preload(torrent_path, result)
+            if result.success:
+                await self._recheck(result.torrent_name, torrent_path, "Preload")
+        self._progress(total)
+        return torrent_path
+
+    async def repreload(self):
+        r = self.rotator
+        batch = r.state.get("current_batch", [])
         if not batch:
             logger.warning("Repreload: no current batch in state, nothing to do")
             return
 
         logger.info(f"Repreload: re-attempting {len(batch)} torrent(s)")
+        r.start_sampler()
 
-        for i, torrent_path in enumerate(batch, 1):
-            if not Path(torrent_path).exists():
-                logger.warning(
-                    f"[{i}/{len(batch)}] torrent file missing: {torrent_path}"
-                )
-                continue
-
-            # Skip torrents that rtorrent already reports as fully downloaded.
-            try:
-                torrent_name = parse_torrent(torrent_path)["name"]
-                rt_hash = self.find_rtorrent_hash(torrent_name, retries=1)
-                if rt_hash:
-                    done = int(self.rtorrent.d.bytes_done(rt_hash))
-                    total = int(self.rtorrent.d.size_bytes(rt_hash))
-                    if total > 0 and done >= total:
-                        logger.info(
-                            f"[{i}/{len(batch)}] Skipping '{torrent_name}' "
-                            f"— already 100% ({_format_size(total)})"
-                        )
-                        continue
-                    if total > 0:
-                        pct = done * 100 / total
-                        logger.info(
-                            f"[{i}/{len(batch)}] '{torrent_name}' is "
-                            f"{pct:.1f}% complete "
-                            f"({_format_size(done)} / {_format_size(total)})"
-                        )
-            except Exception as e:
-                logger.warning(f"Repreload: completion check failed — {e}")
+        r.progress = {"done": 0, "total": len(batch)}
+        with r._phase("preload"):
+            await self._run_all(
+                self._repreload_one(i, len(batch), path)
+                for i, path in enumerate(batch, 1)
+            )
+        r.progress = {"done": len(batch), "total": len(batch)}
+        r.hashcheck.collect()
+        r._record_hash_rate()
+        logger.info("Repreload complete")
+        with r._phase("save"):
+            r.save_state()
+        r.notifier.flush()
 
-            self.wait_for_low_load()
-            logger.info(f"[{i}/{len(batch)}] Repreload: {Path(torrent_path).name}")
+    async def _repreload_one(self, i: int, total: int, torrent_path: str):
+        r = self.rotator
+        prefix = f"[{i}/{total}]"
+        try:
+            if self._rtorrent_lost("Repreload: rtorrent unavailable — stopping"):
+                return
+            if not Path(torrent_path).exists():
+                logger.warning(f"{prefix} torrent file missing: {torrent_path}")
+                return
+            if await self.rpc(r._already_complete, torrent_path, prefix):
+                return
 
-            result = self.preloader.preload(
-                torrent_path, self.config["download_dir"]
+            await self.wait_for_low_load()
+            logger.info(f"{prefix} Repreload: {Path(torrent_path).name}")
+            result = await r.preloader.preload_async(
+                torrent_path, self.config["download_dir"], self._transfer_slots
             )
-            self.notifier.add(result)
-
+            r.notifier.add(result)
+            r._record_preload(torrent_path, result)
             if result.success:
-                try:
-                    rt_hash = self.find_rtorrent_hash(result.torrent_name)
-                    if rt_hash:
-                        self.trigger_hash_check(rt_hash)
-                        self.verify_preload_data(rt_hash, result.torrent_name)
-                    else:
-                        logger.warning(
-                            f"Repreload: could not find rtorrent hash for "
-                            f"'{result.torrent_name}' to trigger recheck"
-                        )
-                except Exception as e:
-                    logger.warning(f"Repreload: hash check step failed — {e}")
-
-        logger.info("Repreload complete")
-        self.notifier.flush()
+                await self._recheck(result.torrent_name, torrent_path, "Repreload")
+        finally:
+            self._progress(total)
 
-    def force_preload_one(
+    async def force_preload_one(
         self, torrent_substring: str, remote_dir_override: str = ""
     ):
-        """Re-stage data for a single torrent and recheck it.
+        import asyncio
 
-        Looks for the torrent file by case-insensitive substring against the
-        current batch first, then the full torrent directory. If
-        remote_dir_override is set, that exact remote directory is used,
-        bypassing the auto-matcher (useful when the Plex dir name differs from
-        what the matcher expects).
-        """
-        if not self.preloader:
-            logger.error(
-                "Force preload requested but PRELOAD_ENABLED is not set"
+        r = self.rotator
+        r.start_sampler()
+        target = await asyncio.to_thread(r._force_preload_target, torrent_substring)
+        if target is None:
+            return
+        torrent_path, torrent_info = target
+
+        if remote_dir_override:
+            logger.info(
+                f"Force preload: using remote dir override '{remote_dir_override}'"
+            )
+            result = r.preloader._staging_result(
+                PreloadResult(
+                    torrent_name=torrent_info["name"],
+                    success=False,
+                    remote_dir=remote_dir_override,
+                ),
+                *await r.preloader.fetch_and_stage_async(
+                    remote_dir_override,
+                    torrent_info,
+                    self.config["download_dir"],
+                    self._transfer_slots,
+                ),
             )
+        else:
+            result = await r.preloader.preload_async(
+                torrent_path, self.config["download_dir"], self._transfer_slots
+            )
+        if not r._accept_force_preload(torrent_path, result, remote_dir_override):
             return
 
-        needle = torrent_substring.strip().lower()
-        if not needle:
-            logger.error("Force preload: FORCE_PRELOAD_TORRENT is empty")
+        rt_hash = await self.find_rtorrent_hash(result.torrent_name)
+        if not rt_hash:
+            r._force_preload_not_loaded(result.torrent_name)
             return
 
-        batch = self.state.get("current_batch", [])
-        candidates = [t for t in batch if needle in Path(t).name.lower()]
-        source = "current_batch"
+        job = await self.hash_check(rt_hash, result.torrent_name, torrent_path)
+        r.hashcheck.collect()
+        r._record_hash_rate()
+        done = 0
+        if job["ok"]:
+            done = await self.rpc(
+                r._report_verified, rt_hash, job["name"], job["done"], job["total"]
+            )
+        await self.rpc(r._finish_force_preload, rt_hash, result.torrent_name, done)
 
-        if not candidates:
-            all_torrents = self.get_torrent_files()
-            candidates = [
-                t for t in all_torrents if needle in Path(t).name.lower()
-            ]
-            source = "torrent_dir"
 
-        if not candidates:
-            logger.error(
-                f"Force preload: no .torrent file matched '{torrent_substring}'"
-            )
-            return
+class RotationSimulator:
+    """Dry run of the next rotation on a virtual clock (PLAN_ROTATION).
 
-        if len(candidates) > 1:
-            names = [Path(t).name for t in candidates[:5]]
-            logger.error(
-                f"Force preload: {len(candidates)} torrents matched "
-                f"'{torrent_substring}' — narrow the substring. First few: {names}"
-            )
-            return
+    Picks the batch the next rotation would pick, using the same selection
+    and disk packing on a copy of the state, then replays the rotation's
+    steps with durations measured on earlier runs. Those are the mean RPC
+    latency, load wait per check, recheck rate ("perf" in the state file)
+    and each preload source's throughput. Nothing calls rtorrent or a
+    preload source. Every batch torrent is assumed to preload when preload
+    is enabled, so the estimate is an upper bound on transfer time.
 
-        torrent_path = candidates[0]
-        if not Path(torrent_path).exists():
-            logger.error(
-                f"Force preload: torrent file missing on disk: {torrent_path}"
-            )
-            return
+    The result covers duration by phase, peak disk usage in DOWNLOAD_DIR,
+    and the seeding gap. The gap runs from the old batch's last removal
+    until the first new torrent is seeding.
+    """
 
-        logger.info(
-            f"Force preload: targeting {Path(torrent_path).name} (from {source})"
+    # rtorrent calls per removal: d.stop, d.close, d.erase.
+    REMOVE_CALLS = 3
+
+    def __init__(self, rotator: "TorrentRotator"):
+        self.rotator = rotator
+        self.config = rotator.config
+
+    def _size(self, torrent_path: str) -> int:
+        info = self.rotator.state.get("batch_info", {}).get(torrent_path, {})
+        if "size" in info:
+            return info["size"]
+        return self.rotator.metadata.total_size(torrent_path) or 0
+
+    def _transfer_rate(self) -> float | None:
+        preloader = self.rotator.preloader
+        if not preloader:
+            return None
+        rates = [
+            preloader.source_stats.get(source.name, {}).get("throughput") or 0
+            for source in preloader.sources
+        ]
+        return max(rates, default=0) or None
+
+    @staticmethod
+    def _serve(jobs: list[tuple[float, float, float]], servers: int) -> list[tuple[float, float]]:
+        """Run (ready_at, priority, duration) jobs on identical servers.
+
+        Whenever a server frees up, the lowest-priority-value job that is
+        ready goes next. Returns (start, finish) per job, in input order.
+        """
+        order = sorted(range(len(jobs)), key=lambda j: jobs[j][0])
+        free = [0.0] * max(1, servers)
+        ready: list[tuple[float, int]] = []
+        result: list[tuple[float, float]] = [(0.0, 0.0)] * len(jobs)
+        i = 0
+        while i < len(order) or ready:
+            now = min(free)
+            if not ready and jobs[order[i]][0] > now:
+                now = jobs[order[i]][0]
+            while i < len(order) and jobs[order[i]][0] <= now:
+                heapq.heappush(ready, (jobs[order[i]][1], order[i]))
+                i += 1
+            _, j = heapq.heappop(ready)
+            server = free.index(min(free))
+            start = max(now, free[server])
+            free[server] = start + jobs[j][2]
+            result[j] = (start, free[server])
+        return result
+
+    def plan(self, delete_data: bool = False) -> dict:
+        r = self.rotator
+        cfg = self.config
+        perf = r.state.get("perf", {})
+        assumptions = []
+
+        # Selection runs after the removals, when deleted data already
+        # counts as free (DeletionWorker.pending_bytes), so credit it here.
+        freed = (
+            sum(self._size(t) for t in r.state.get("current_batch", []))
+            if delete_data
+            else 0
         )
 
-        try:
-            torrent_info = parse_torrent(torrent_path)
-            torrent_name = torrent_info["name"]
-        except Exception as e:
-            logger.error(f"Force preload: could not parse torrent — {e}")
-            return
+        def disk_budget(measure=r.get_disk_budget):
+            budget = measure()
+            if budget is None:
+                return None
+            remaining, capacity = budget
+            return min(remaining + freed, capacity), capacity
 
-        if remote_dir_override:
-            logger.info(
-                f"Force preload: using remote dir override '{remote_dir_override}'"
-            )
-            staged_files, reason = self.preloader.fetch_and_stage(
-                remote_dir_override,
-                torrent_info,
-                self.config["download_dir"],
-            )
-            if staged_files is None:
-                logger.error(f"Force preload: staging failed — {reason}")
-                result = PreloadResult(
-                    torrent_name=torrent_name,
-                    success=False,
-                    remote_dir=remote_dir_override,
-                    reason=reason,
-                )
-                self.notifier.add(result)
-                self.notifier.flush()
-                return
-            result = PreloadResult(
-                torrent_name=torrent_name,
-                success=True,
-                remote_dir=remote_dir_override,
-                staged_files=staged_files,
+        saved = r.state
+        r.state = json.loads(json.dumps(saved, default=str))
+        r.get_disk_budget = disk_budget
+        try:
+            batch = r.get_next_batch()
+        finally:
+            r.state = saved
+            del r.get_disk_budget
+
+        latency = perf.get("rpc_latency_s")
+        if latency is None:
+            latency = 0.0
+            assumptions.append("no RPC latency recorded yet; rtorrent calls counted as instant")
+        load_wait = perf.get("load_wait_s", 0.0)
+        hash_rate = perf.get("hash_bytes_per_s")
+        if r.preloader and not hash_rate:
+            assumptions.append("no recheck rate recorded yet; rechecks counted as instant")
+        transfer_rate = self._transfer_rate()
+        if r.preloader and not transfer_rate:
+            assumptions.append("no preload throughput recorded yet; transfers counted as instant")
+        if not r.preloader:
+            assumptions.append("preload disabled; new torrents download from peers after the run")
+        disk_events: list[tuple[float, int]] = []
+
+        # Remove: one snapshot, then each old torrent in turn.
+        old = saved.get("current_batch", [])
+        clock = latency
+        for i, torrent_path in enumerate(old, 1):
+            clock += load_wait + self.REMOVE_CALLS * latency
+            if delete_data:
+                disk_events.append((clock, -self._size(torrent_path)))
+            if i < len(old):
+                clock += cfg["remove_delay"]
+        removed_at = clock
+        clock += cfg["startup_delay"]
+        settled_at = clock
+
+        sizes = [self._size(t) for t in batch]
+        preload = r.preloader is not None
+        async_engine = cfg["rotation_engine"] == "async"
+        slots = max(1, cfg["preload_concurrency"]) if async_engine else 1
+
+        def transfer_time(size: int) -> float:
+            return size / transfer_rate if preload and transfer_rate else 0.0
+
+        def recheck_time(size: int) -> float:
+            # The recorded rate runs from d.check_hash to the poll that saw
+            # it finish, so it already includes poll granularity.
+            return size / hash_rate if hash_rate else 0.0
+
+        added_at, queued_at, transfers = [], [], []
+        if async_engine:
+            # Adds stay serial and ADD_DELAY apart; transfers share the link
+            # across PRELOAD_CONCURRENCY slots.
+            next_add = settled_at
+            for size in sizes:
+                added = next_add + load_wait + latency
+                added_at.append(added)
+                next_add = added + cfg["add_delay"]
+            transfers = self._serve(
+                [(t, i, transfer_time(size) * slots) for i, (t, size) in enumerate(zip(added_at, sizes))],
+                slots,
             )
+            queued_at = [end + latency for _, end in transfers]
+            adds_done = added_at[-1] if added_at else settled_at
         else:
-            result = self.preloader.preload(
-                torrent_path, self.config["download_dir"]
+            # Each torrent is added, preloaded and queued before the next add.
+            clock = settled_at
+            for i, size in enumerate(sizes):
+                clock += load_wait + latency
+                added_at.append(clock)
+                if preload:
+                    transfers.append((clock, clock + transfer_time(size)))
+                    clock = transfers[-1][1] + latency
+                    queued_at.append(clock)
+                if i < len(sizes) - 1:
+                    clock += cfg["add_delay"]
+            adds_done = clock
+
+        if preload:
+            disk_events += [(end, size) for (_, end), size in zip(transfers, sizes)]
+            rechecks = self._serve(
+                [(q, size, recheck_time(size)) for q, size in zip(queued_at, sizes)],
+                cfg["hashcheck_per_device"],
             )
-            if not result.success:
-                logger.error(
-                    f"Force preload: auto-match failed — {result.reason}. "
-                    f"Set FORCE_PRELOAD_REMOTE_DIR to bypass the matcher."
-                )
-                self.notifier.add(result)
-                self.notifier.flush()
-                return
+            ready_at = [end + latency for _, end in rechecks]
+        else:
+            ready_at = list(added_at)
+        end = max([adds_done, *ready_at])
 
-        self.notifier.add(result)
+        disk = None
+        try:
+            st = os.statvfs(cfg["download_dir"])
+        except OSError as e:
+            assumptions.append(f"could not stat DOWNLOAD_DIR ({e}); disk usage not modelled")
+        else:
+            used = (st.f_blocks - st.f_bfree) * st.f_frsize
+            peak = current = used
+            for _, delta in sorted(disk_events):
+                current += delta
+                peak = max(peak, current)
+            staged = sum(sizes) if preload else 0
+            disk = {
+                "used_now": used,
+                "peak": peak,
+                "after_download": current + sum(sizes) - staged,
+                "capacity": st.f_blocks * st.f_frsize,
+                "reserve": int(cfg["disk_reserve_gb"] * 1024**3),
+            }
 
-        rt_hash = self.find_rtorrent_hash(torrent_name)
-        if not rt_hash:
-            logger.error(
-                f"Force preload: could not find rtorrent hash for "
-                f"'{torrent_name}'. Is the torrent loaded in rtorrent?"
-            )
-            self.notifier.flush()
-            return
+        return {
+            "engine": cfg["rotation_engine"],
+            "delete_data": delete_data,
+            "removals": len(old),
+            "batch": [
+                {"path": t, "name": Path(t).stem, "size": size, "ready_after": round(ready, 1)}
+                for t, size, ready in zip(batch, sizes, ready_at)
+            ],
+            "batch_bytes": sum(sizes),
+            "duration_seconds": round(end, 1),
+            "phases": {
+                "remove": round(removed_at, 1),
+                "settle": round(settled_at - removed_at, 1),
+                "add": round(adds_done - settled_at, 1),
+                "hashcheck": round(max(0.0, end - adds_done), 1),
+            },
+            "seeding_gap_seconds": round(min(ready_at) - removed_at, 1) if ready_at else None,
+            "all_seeding_after_seconds": round(max(ready_at), 1) if ready_at else None,
+            "disk": disk,
+            "inputs": {
+                "rpc_latency_s": latency,
+                "load_wait_s": load_wait,
+                "transfer_bytes_per_s": transfer_rate,
+                "hash_bytes_per_s": hash_rate,
+            },
+            "assumptions": assumptions,
+        }
 
-        self.trigger_hash_check(rt_hash)
-        done = self.verify_preload_data(rt_hash, torrent_name)
 
-        if done > 0:
-            try:
-                self.rtorrent.d.start(rt_hash)
-                logger.info(
-                    f"Force preload: ensured '{torrent_name}' is started"
+# The job whose log lines the current context produces. Set on the job's
+# worker thread; asyncio tasks and asyncio.to_thread calls inherit it, the
+# sampler, mail and HTTP threads do not.
+_CURRENT_JOB: contextvars.ContextVar[dict | None] = contextvars.ContextVar(
+    "route23_job", default=None
+)
+
+
+class _JobLogHandler(logging.Handler):
+    """Copies the running job's log lines into its record.
+
+    The handler sits on the root logger, so records logged outside the job's
+    context (other threads) are filtered out.
+    """
+
+    def __init__(self, job: dict, limit: int):
+        super().__init__(logging.INFO)
+        self.job = job
+        self.limit = limit
+        self.setFormatter(logging.Formatter("%(asctime)s - %(levelname)s - %(message)s"))
+        self.addFilter(lambda record: _CURRENT_JOB.get() is self.job)
+
+    def emit(self, record: logging.LogRecord):
+        log = self.job["log"]
+        log.append(self.format(record))
+        if len(log) > self.limit:
+            del log[: len(log) - self.limit]
+            self.job["log_dropped"] += 1
+
+
+class JobRunner:
+    """Runs control API actions one at a time on a worker thread.
+
+    Jobs take rotator.lock like the daemon's scheduled checks, so a POSTed
+    rotation never overlaps another. Each job keeps its state, phase,
+    progress and recent log lines in memory for /jobs.
+    """
+
+    ACTIONS = ("rotate", "repreload", "force-preload")
+    MAX_JOBS = 50
+    MAX_LOG_LINES = 500
+
+    def __init__(self, rotator: "TorrentRotator"):
+        self.rotator = rotator
+        self._lock = threading.Lock()
+        self._wake = threading.Condition(self._lock)
+        self._jobs: dict[str, dict] = {}
+        self._pending: list[str] = []
+        self._seq = itertools.count(1)
+        self._thread: threading.Thread | None = None
+        self.current: dict | None = None
+
+    def submit(self, action: str, params: dict) -> dict:
+        job = {
+            "id": f"{datetime.now():%Y%m%d%H%M%S}-{next(self._seq)}",
+            "action": action,
+            "params": params,
+            "state": "queued",
+            "created": datetime.now().isoformat(timespec="seconds"),
+            "started": None,
+            "finished": None,
+            "error": None,
+            "log": [],
+            "log_dropped": 0,
+        }
+        with self._lock:
+            self._jobs[job["id"]] = job
+            self._pending.append(job["id"])
+            finished = [j for j in self._jobs.values() if j["finished"]]
+            for old in finished[: max(0, len(self._jobs) - self.MAX_JOBS)]:
+                del self._jobs[old["id"]]
+            if self._thread is None:
+                self._thread = threading.Thread(
+                    target=self._work, name="route23-jobs", daemon=True
                 )
+                self._thread.start()
+            self._wake.notify()
+        logger.info(f"Control API: queued {action} job {job['id']}")
+        return self.describe(job["id"])
+
+    def describe(self, job_id: str, log_from: int = 0) -> dict | None:
+        """Job as a JSON-ready dict, with live phase and progress while it runs.
+
+        log_from is an absolute line number, so a client can ask for only
+        the lines it has not seen even after old ones were dropped.
+        """
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None:
+                return None
+            view = {k: v for k, v in job.items() if k != "log"}
+            view["log"] = job["log"][max(0, log_from - job["log_dropped"]) :]
+            view["log_total"] = len(job["log"]) + job["log_dropped"]
+        if job is self.current:
+            view["phase"] = self.rotator._current_phase
+            view["progress"] = dict(self.rotator.progress)
+        return view
+
+    def summaries(self) -> list[dict]:
+        """Every remembered job, newest first, without log lines."""
+        with self._lock:
+            ids = list(self._jobs)
+        return [
+            {k: v for k, v in self.describe(i).items() if k != "log"}
+            for i in reversed(ids)
+        ]
+
+    def _work(self):
+        while True:
+            with self._lock:
+                while not self._pending:
+                    self._wake.wait()
+                job = self._jobs.get(self._pending.pop(0))
+            if job is not None:
+                self._run(job)
+
+    def _run(self, job: dict):
+        handler = _JobLogHandler(job, self.MAX_LOG_LINES)
+        rotator = self.rotator
+        with rotator.lock:
+            self.current = job
+            job["state"] = "running"
+            job["started"] = datetime.now().isoformat(timespec="seconds")
+            context = _CURRENT_JOB.set(job)
+            logging.getLogger().addHandler(handler)
+            try:
+                rotator.reload_state()
+                params = job["params"]
+                if job["action"] == "rotate":
+                    rotator.run(
+                        force=True,
+                        delete_data=params.get("delete_data", DELETE_DATA),
+                    )
+                elif job["action"] == "repreload":
+                    rotator.repreload()
+                else:
+                    rotator.force_preload_one(
+                        params.get("torrent", ""), params.get("remote_dir", "")
+                    )
+                job["state"] = "done"
+            except RtorrentUnavailable as e:
+                job["state"], job["error"] = "failed", str(e)
+                rotator.rtorrent.policy.reset()
             except Exception as e:
-                logger.warning(
-                    f"Force preload: could not start torrent — {e}"
-                )
+                logger.exception(f"Control API: {job['action']} job failed")
+                job["state"], job["error"] = "failed", str(e)
+            finally:
+                logging.getLogger().removeHandler(handler)
+                _CURRENT_JOB.reset(context)
+                job["finished"] = datetime.now().isoformat(timespec="seconds")
+                self.current = None
+                rotator._set_phase("-")
+                _end_cycle(rotator)
+
+
+class ControlAPI:
+    """Routes for daemon mode's HTTP server, independent of http.server itself.
+
+    GET /metrics, /status, /jobs, /jobs/<id> and /jobs/<id>/events are
+    open. POST /rotate, /repreload and /force-preload need CONTROL_TOKEN as
+    a bearer token and answer 202 with a job; its progress can be polled or
+    followed as server-sent events. /status serves a snapshot cached for
+    CONTROL_STATUS_TTL seconds.
+    """
+
+    def __init__(self, rotator: "TorrentRotator", jobs: JobRunner):
+        self.rotator = rotator
+        self.jobs = jobs
+        self.token = rotator.config["control_token"]
+        self.status_ttl = rotator.config["control_status_ttl"]
+        self._status: tuple[float, bytes] | None = None
+        self._status_lock = threading.Lock()
+
+    def status(self) -> bytes:
+        with self._status_lock:
+            if self._status and time.monotonic() - self._status[0] < self.status_ttl:
+                return self._status[1]
+            body = json.dumps(self.rotator.status_snapshot(), indent=2).encode()
+            self._status = (time.monotonic(), body)
+            return body
+
+    def get(self, path: str) -> tuple[int, str, bytes]:
+        """Returns (status code, content type, body) for a GET."""
+        if path == "/metrics":
+            return 200, "text/plain; version=0.0.4", METRICS.render().encode()
+        if path == "/status":
+            return 200, "application/json", self.status()
+        if path == "/jobs":
+            return 200, "application/json", json.dumps(self.jobs.summaries()).encode()
+        if path.startswith("/jobs/"):
+            job = self.jobs.describe(path[len("/jobs/") :])
+            if job:
+                return 200, "application/json", json.dumps(job, indent=2).encode()
+        return 404, "application/json", b'{"error": "not found"}'
+
+    def authorized(self, header: str | None) -> bool:
+        import hmac
+
+        scheme, _, token = (header or "").partition(" ")
+        return (
+            bool(self.token)
+            and scheme.lower() == "bearer"
+            and hmac.compare_digest(token.strip().encode(), self.token.encode())
+        )
 
-        self.notifier.flush()
+    def post(self, path: str, auth: str | None, body: bytes) -> tuple[int, dict]:
+        """Returns (status code, JSON body) for a POST."""
+        action = path.strip("/")
+        if action not in JobRunner.ACTIONS:
+            return 404, {"error": "not found"}
+        if not self.token:
+            return 403, {"error": "control API disabled, set CONTROL_TOKEN"}
+        if not self.authorized(auth):
+            return 401, {"error": "invalid or missing bearer token"}
+        try:
+            params = json.loads(body) if body.strip() else {}
+        except ValueError as e:
+            return 400, {"error": f"invalid JSON body: {e}"}
+        if not isinstance(params, dict):
+            return 400, {"error": "body must be a JSON object"}
+        if not isinstance(params.get("delete_data", False), bool):
+            return 400, {"error": "\"delete_data\" must be true or false"}
+        if action == "force-preload" and not str(params.get("torrent", "")).strip():
+            return 400, {"error": "force-preload needs a \"torrent\" substring"}
+        if action != "rotate" and not self.rotator.preloader:
+            return 409, {"error": f"{action} needs PRELOAD_ENABLED"}
+        return 202, self.jobs.submit(action, params)
+
+    def events(self, job_id: str, write) -> bool:
+        """Stream a job's log lines and progress as server-sent events until it ends.
+
+        write(bytes) sends a chunk. Returns False if the job does not exist.
+        """
+        sent, last_progress = 0, None
+        while True:
+            job = self.jobs.describe(job_id, log_from=sent)
+            if job is None:
+                return sent > 0
+            for line in job["log"]:
+                write(f"event: log\ndata: {line}\n\n".encode())
+            sent = job["log_total"]
+            progress = (job["state"], job.get("phase"), job.get("progress"))
+            if progress != last_progress:
+                last_progress = progress
+                update = {k: job.get(k) for k in ("state", "phase", "progress")}
+                write(f"event: progress\ndata: {json.dumps(update)}\n\n".encode())
+            if job["finished"]:
+                summary = {k: v for k, v in job.items() if k != "log"}
+                write(f"event: done\ndata: {json.dumps(summary)}\n\n".encode())
+                return True
+            time.sleep(1.0)
+
+
+def start_http_server(port: int, api: ControlAPI) -> "http.server.ThreadingHTTPServer":
+    """Serve the control API (and /metrics) on a background thread."""
+    import http.server
+
+    class Handler(http.server.BaseHTTPRequestHandler):
+        def _reply(self, code: int, content_type: str, body: bytes):
+            self.send_response(code)
+            self.send_header("Content-Type", content_type)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def do_GET(self):
+            path = self.path.split("?", 1)[0].rstrip("/") or "/"
+            if path.startswith("/jobs/") and path.endswith("/events"):
+                self.send_response(200)
+                self.send_header("Content-Type", "text/event-stream")
+                self.send_header("Cache-Control", "no-cache")
+                self.end_headers()
+
+                def write(chunk: bytes):
+                    self.wfile.write(chunk)
+                    self.wfile.flush()
 
-    def status(self):
-        """Print current status."""
-        all_torrents = self.get_torrent_files()
-        active = self.get_active_torrents()
-        current_load = self.get_system_load()
+                try:
+                    api.events(path[len("/jobs/") : -len("/events")], write)
+                except (BrokenPipeError, ConnectionResetError):
+                    pass
+                self.close_connection = True
+                return
+            try:
+                self._reply(*api.get(path))
+            except Exception as e:
+                logger.exception(f"Control API: GET {path} failed")
+                self._reply(500, "application/json", json.dumps({"error": str(e)}).encode())
 
+        def do_POST(self):
+            try:
+                length = int(self.headers.get("Content-Length") or 0)
+            except ValueError:
+                length = -1
+            if length < 0:
+                self._reply(400, "application/json", b'{"error": "invalid Content-Length"}')
+                self.close_connection = True
+                return
+            body = self.rfile.read(min(length, 65536)) if length else b""
+            path = self.path.split("?", 1)[0].rstrip("/")
+            code, reply = api.post(path, self.headers.get("Authorization"), body)
+            self._reply(code, "application/json", json.dumps(reply).encode())
+
+        def log_message(self, format, *args):
+            logger.debug(f"http: {format % args}")
+
+    server = http.server.ThreadingHTTPServer(("", port), Handler)
+    server.daemon_threads = True
+    threading.Thread(
+        target=server.serve_forever, name="route23-http", daemon=True
+    ).start()
+    logger.info(
+        f"Serving /metrics, /status and /jobs on :{port}"
+        + ("" if api.token else " (POST actions disabled, CONTROL_TOKEN unset)")
+    )
+    return server
+
+
+def run_monitor(config: dict):
+    """Print live system samples (MONITOR) or the stored history (MONITOR_HISTORY)."""
+    sampler = SystemSampler(config)
+    if MONITOR_HISTORY:
+        try:
+            samples = SystemSampler.read(sampler.path)
+        except (OSError, ValueError) as e:
+            logger.error(f"Cannot read samples: {e}")
+            return
+        for sample in samples:
+            print(SystemSampler.format_sample(sample))
+        print()
+        SystemSampler.summarize(samples)
+        return
+
+    # Monitoring only reads; if a rotation's sampler holds the ring file it
+    # is already recording, so just show the samples without storing them.
+    recording = sampler.open()
+    if not recording:
+        logger.warning(
+            f"{sampler.path} is locked by a running rotation, "
+            f"showing live samples without storing them"
+        )
+    duration = config["monitor_duration"]
+    logger.info(
+        f"Sampling every {sampler.interval:.0f}s "
+        + (f"for {duration:.0f}s" if duration > 0 else "until interrupted")
+    )
+    samples = []
+    deadline = time.monotonic() + duration
+    sampler.sample()
+    try:
+        while duration <= 0 or time.monotonic() < deadline:
+            time.sleep(sampler.interval)
+            sample = sampler.sample()
+            if recording:
+                sampler.append(sample)
+            samples.append(sample)
+            print(SystemSampler.format_sample(sample), flush=True)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        sampler.close()
+    print()
+    SystemSampler.summarize(samples)
+
+
+def run_library_report(config: dict, fmt: str = "text"):
+    """Scan TORRENT_DIR into the library index and print a library-wide report."""
+    index = LibraryIndex(config)
+    stats = index.scan()
+    start = time.perf_counter()
+    report = index.report()
+    report["scan"] = stats
+    report["query_seconds"] = round(time.perf_counter() - start, 4)
+    index.close()
+    if fmt == "json":
+        print(json.dumps(report, indent=2))
+        return
+
+    print("\n" + "=" * 50)
+    print("LIBRARY REPORT")
+    print("=" * 50)
+    print(f"Torrents:                 {report['torrents']}")
+    if not report["torrents"]:
+        print("=" * 50 + "\n")
+        return
+    print(f"Total size:               {_format_size(report['total_bytes'])}")
+    print(f"Total files:              {report['total_files']}")
+    print(f"Median torrent size:      {_format_size(report['median_bytes'])}")
+    for title, key in (
+        ("TORRENT SIZE", "size_histogram"),
+        ("FILES PER TORRENT", "file_count_histogram"),
+        ("PIECE LENGTH", "piece_length_histogram"),
+    ):
+        print("-" * 50)
+        print(title)
+        print("-" * 50)
+        for label, n in report[key].items():
+            print(f"  {label:<12} {n:>8}")
+    print("-" * 50)
+    print("LARGEST")
+    print("-" * 50)
+    for item in report["largest"]:
+        print(f"  {_format_size(item['bytes']):>10}  {item['name']}")
+    dupes = report["duplicates"]
+    if dupes["same_info_hash"] or dupes["same_name_and_size"]:
+        print("-" * 50)
+        print("DUPLICATES")
+        print("-" * 50)
+        for files in dupes["same_info_hash"]:
+            print(f"  same torrent:  {', '.join(files)}")
+        for files in dupes["same_name_and_size"]:
+            print(f"  same content:  {', '.join(files)}")
+    print("=" * 50)
+    print(
+        f"Scanned in {stats['seconds']:.2f}s ({stats['parsed']} parsed), "
+        f"queried in {report['query_seconds'] * 1000:.1f}ms\n"
+    )
+
+
+def run_library_verify(config: dict, mode: str, fmt: str = "text"):
+    """Verify Plex naming for the selected sections and refresh their manifests."""
+    sections = {
+        "movies": ["movies"],
+        "movie": ["movies"],
+        "tv": ["tv"],
+    }.get(mode, ["movies", "tv"])
+    report = PlexLibraryVerifier(config).run(sections)
+    failed = any(r.get("error") or r["issues"] for r in report.values())
+    if fmt == "json":
+        print(json.dumps(report, indent=2))
+        if failed:
+            raise SystemExit(1)
+        return
+
+    for section, result in report.items():
         print("\n" + "=" * 50)
-        print("TORRENT ROTATOR STATUS")
+        print(f"VERIFY {PlexLibraryVerifier.SECTIONS[section].upper()}")
         print("=" * 50)
-        print(f"Total .torrent files:     {len(all_torrents)}")
-        print(f"Currently active:         {len(active)}")
-        print(f"Batch size:               {self.config['batch_size']}")
-        print(f"Rotation period:          {self.config['rotation_days']} days")
-        print(f"Completed batches:        {self.state['completed_batches']}")
-        seeded_count = len(self.state.get("seeded_this_cycle", []))
-        print(f"Seeded this cycle:        {seeded_count} / {len(all_torrents)}")
+        print(f"Directory:                {result['root']}")
+        if result.get("error"):
+            print(f"ERROR: {result['error']}")
+            continue
+        print(f"Titles checked:           {result['checked']}")
+        print(f"Valid:                    {result['valid']}")
+        print(f"Video files:              {result['video_files']}")
+        print(f"Issues:                   {len(result['issues'])}")
+        if result["issues"]:
+            print("-" * 50)
+            for item in result["issues"]:
+                print(f"  {item['dir']}: {item['issue']}")
+        print("-" * 50)
+        print(f"Manifest:                 {result['manifest'] or 'not written'}")
+        print(f"Scanned in {result['seconds']:.2f}s")
+    print("=" * 50 + "\n")
+    if failed:
+        raise SystemExit(1)
+
 
+def run_fix_permissions(config: dict, root: str, fmt: str = "text"):
+    """Normalize owner and modes under root and print what changed."""
+    try:
+        fixer = PermissionFixer(config, root)
+    except ValueError as e:
+        logger.error(f"Permissions: {e}")
+        raise SystemExit(1)
+    report = fixer.run()
+    failed = bool(report.get("error") or report["failed"])
+    if fmt == "json":
+        print(json.dumps(report, indent=2))
+        if failed:
+            raise SystemExit(1)
+        return
+
+    print("\n" + "=" * 50)
+    print("FIX PERMISSIONS")
+    print("=" * 50)
+    print(f"Directory:                {report['root']}")
+    if report.get("error"):
+        print(f"ERROR: {report['error']}")
+        print("=" * 50 + "\n")
+        raise SystemExit(1)
+    print(f"Owner:                    {report['owner'] or '(unchanged)'}")
+    print(f"Modes:                    dirs {report['dir_mode']}, files {report['file_mode']}")
+    print(f"Mode:                     {'incremental' if report['incremental'] else 'full walk'}")
+    print(
+        f"Directories:              {report['dirs_listed']} listed, "
+        f"{report['dirs_skipped']} unchanged"
+    )
+    print(f"Entries checked:          {report['checked']}")
+    print(f"Owner changed:            {report['chowned']}")
+    print(f"Mode changed:             {report['chmodded']}")
+    print(f"Failed:                   {report['failed']}")
+    print("=" * 50)
+    print(f"Done in {report['seconds']:.2f}s\n")
+    if failed:
+        raise SystemExit(1)
+
+
+def _format_duration(seconds: float) -> str:
+    seconds = int(seconds)
+    if seconds >= 3600:
+        return f"{seconds // 3600}h {seconds % 3600 // 60}m"
+    return f"{seconds // 60}m {seconds % 60}s"
+
+
+def run_rotation_plan(rotator: TorrentRotator, fmt: str = "text", delete_data: bool = False):
+    """Simulate the next rotation and print its plan without changing anything."""
+    plan = RotationSimulator(rotator).plan(delete_data)
+    if fmt == "json":
+        print(json.dumps(plan, indent=2))
+        return
+
+    print("\n" + "=" * 50)
+    print("ROTATION PLAN (dry run)")
+    print("=" * 50)
+    print(f"Engine:                   {plan['engine']}")
+    print(f"Removals:                 {plan['removals']}")
+    print(
+        f"Next batch:               {len(plan['batch'])} torrents, "
+        f"{_format_size(plan['batch_bytes'])}"
+    )
+    print(f"Est. rotation time:       ~{_format_duration(plan['duration_seconds'])}")
+    for phase, seconds in plan["phases"].items():
+        print(f"  {phase + ':':<24}{_format_duration(seconds)}")
+    if plan["seeding_gap_seconds"] is not None:
+        print(f"Seeding gap:              ~{_format_duration(plan['seeding_gap_seconds'])}")
+        print(
+            f"All seeding after:        ~{_format_duration(plan['all_seeding_after_seconds'])}"
+        )
+    disk = plan["disk"]
+    if disk:
         print("-" * 50)
-        print("PERFORMANCE SETTINGS")
+        print("DISK (DOWNLOAD_DIR)")
         print("-" * 50)
-        print(f"Current system load:      {current_load:.2f}")
-        print(f"Max load threshold:       {self.config['max_load']}")
-        print(f"Add delay:                {self.config['add_delay']}s")
-        print(f"Remove delay:             {self.config['remove_delay']}s")
-        print(f"Load wait time:           {self.config['load_wait']}s")
-
-        est_add_time = self.config["batch_size"] * self.config["add_delay"]
+        print(f"Used now:                 {_format_size(disk['used_now'])}")
+        print(f"Peak during rotation:     {_format_size(disk['peak'])}")
+        print(f"Once fully downloaded:    {_format_size(disk['after_download'])}")
         print(
-            f"Est. rotation time:       ~{est_add_time // 60:.0f}m {est_add_time % 60:.0f}s"
+            f"Capacity:                 {_format_size(disk['capacity'])} "
+            f"({_format_size(disk['reserve'])} reserved)"
         )
-
-        if self.state["batch_started"]:
-            started = datetime.fromisoformat(self.state["batch_started"])
-            elapsed = datetime.now() - started
-            remaining = timedelta(days=self.config["rotation_days"]) - elapsed
-            print("-" * 50)
-            print(
-                f"Batch started:            {started.strftime('%Y-%m-%d %H:%M')}"
-            )
+    if plan["batch"]:
+        print("-" * 50)
+        print("BATCH")
+        print("-" * 50)
+        for t in plan["batch"]:
             print(
-                f"Time elapsed:             {elapsed.days}d {elapsed.seconds // 3600}h"
+                f"  {_format_size(t['size']):>10}  ready ~{_format_duration(t['ready_after']):>8}  "
+                f"{t['name'][:44]}"
             )
-            if remaining.total_seconds() > 0:
-                print(
-                    f"Time remaining:           {remaining.days}d {remaining.seconds // 3600}h"
-                )
-            else:
-                print("Status:                   READY TO ROTATE")
-        else:
-            print("-" * 50)
-            print("Status:                   NOT STARTED")
-
-        print("=" * 50 + "\n")
-
-    def run(self, force: bool = False, delete_data: bool = False):
-        """Main run method - check if rotation needed and perform if so."""
-        if force:
-            logger.info("Forced rotation requested")
-            self.rotate(delete_old_data=delete_data)
-        elif self.should_rotate():
-            self.rotate(delete_old_data=delete_data)
-        else:
-            logger.info("No rotation needed at this time")
+    if plan["assumptions"]:
+        print("-" * 50)
+        for note in plan["assumptions"]:
+            print(f"Note: {note}")
+    print("=" * 50 + "\n")
+
+
+def _end_cycle(rotator: TorrentRotator):
+    """Publish metrics and the trace after a daemon check or API job."""
+    rotator.export_metrics()
+    TRACER.log_summary()
+    TRACER.export_chrome()
+    TRACER.reset()
+
+
+def run_daemon(rotator: TorrentRotator):
+    """Check for rotation every DAEMON_INTERVAL seconds, serving the HTTP API in between."""
+    interval = rotator.config["daemon_interval"]
+    if rotator.config["metrics_port"]:
+        api = ControlAPI(rotator, JobRunner(rotator))
+        start_http_server(rotator.config["metrics_port"], api)
+    logger.info(f"Daemon mode: checking for rotation every {interval:.0f}s")
+    rotator.start_sampler()
+    rotator.notifier.outbox.resume()
+    while True:
+        with rotator.lock:
+            # Pick up changes made by one-off runs (force rotation, repreload).
+            rotator.reload_state()
+            try:
+                rotator.run(force=False, delete_data=DELETE_DATA)
+            except RtorrentUnavailable as e:
+                logger.error(f"Rotation check aborted: {e}")
+                rotator.rtorrent.policy.reset()
+            except Exception:
+                logger.exception("Rotation check failed")
+            _end_cycle(rotator)
+        time.sleep(interval)
 
 
 def main():
     """Main entry point - uses environment variables for configuration."""
     logger.info("Torrent Rotator starting")
+    config = load_config()
+    logger.debug(f"Configuration: {describe_config(config)}")
 
-    safe_config = CONFIG.copy()
-    if get_env("RTORRENT_PASS"):
-        parsed = urlparse(safe_config["rtorrent_url"])
-        masked_netloc = f"{parsed.username}:****@{parsed.hostname}"
-        if parsed.port:
-            masked_netloc += f":{parsed.port}"
-        safe_config["rtorrent_url"] = urlunparse(
-            (
-                parsed.scheme,
-                masked_netloc,
-                parsed.path,
-                parsed.params,
-                parsed.query,
-                parsed.fragment,
-            )
-        )
-    logger.info(f"Configuration: {json.dumps(safe_config, indent=2)}")
+    if MONITOR or MONITOR_HISTORY:
+        run_monitor(config)
+        return
+
+    if LIBRARY_REPORT:
+        run_library_report(config, STATUS_FORMAT)
+        return
+
+    if VERIFY_LIBRARY and VERIFY_LIBRARY != "false":
+        run_library_verify(config, VERIFY_LIBRARY, STATUS_FORMAT)
+        return
+
+    if FIX_PERMISSIONS:
+        run_fix_permissions(config, FIX_PERMISSIONS, STATUS_FORMAT)
+        return
 
     preloader = None
     if PRELOAD_ENABLED:
-        if (
-            not CONFIG["preload_host"]
-            or not CONFIG["preload_user"]
-            or not CONFIG["preload_remote_dir"]
-        ):
+        if not config["preload_sources"]:
             logger.error(
-                "PRELOAD_ENABLED=true but PRELOAD_HOST, PRELOAD_USER, or PRELOAD_REMOTE_DIR is not set"
+                "PRELOAD_ENABLED=true but neither PRELOAD_SOURCES nor "
+                "PRELOAD_HOST, PRELOAD_USER, and PRELOAD_REMOTE_DIR are set"
             )
         else:
-            preloader = PreloadManager(CONFIG)
-            logger.info(
-                f"Preload enabled: {CONFIG['preload_user']}@{CONFIG['preload_host']}:{CONFIG['preload_remote_dir']}"
-            )
+            preloader = PreloadManager(config)
+            for source in preloader.sources:
+                logger.info(f"Preload source: {source.label}")
 
-    rotator = TorrentRotator(CONFIG, preloader=preloader)
-
-    if SHOW_STATUS:
-        rotator.status()
-    elif FORCE_PRELOAD_TORRENT:
-        rotator.force_preload_one(
-            FORCE_PRELOAD_TORRENT, FORCE_PRELOAD_REMOTE_DIR
-        )
-    elif REPRELOAD:
-        rotator.repreload()
-    else:
-        rotator.run(force=FORCE_ROTATION, delete_data=DELETE_DATA)
+    if BENCHMARK_TRANSFER:
+        if not preloader:
+            logger.error("BENCHMARK_TRANSFER requires PRELOAD_ENABLED and a source")
+            return
+        TransferBenchmark(config, preloader).run()
+        return
+
+    TRACER.configure(config["trace_file"])
+    rotator = TorrentRotator(config, preloader=preloader)
+    if config["profile"]:
+        if config["profile"] in Profiler.MODES:
+            rotator.profiler = Profiler(config)
+            rotator.profiler.start()
+        else:
+            logger.warning(f"Unknown PROFILE '{config['profile']}', expected cpu, mem or both")
+
+    # A one-off action asked for on the command line wins over DAEMON, so a
+    # `docker compose run` against a daemon's environment still just runs it.
+    daemon = DAEMON and not (
+        PLAN_ROTATION
+        or SHOW_STATUS
+        or "--json" in sys.argv[1:]
+        or PROMOTE_TORRENT
+        or BACKUP_PROMOTED
+        or FORCE_PRELOAD_TORRENT
+        or REPRELOAD
+        or FORCE_ROTATION
+    )
+    try:
+        if daemon:
+            run_daemon(rotator)
+        elif PLAN_ROTATION:
+            run_rotation_plan(rotator, STATUS_FORMAT, DELETE_DATA)
+        elif SHOW_STATUS or "--json" in sys.argv[1:]:
+            rotator.status(STATUS_FORMAT)
+        elif PROMOTE_TORRENT:
+            if not rotator.promote(PROMOTE_TORRENT, PROMOTE_AS):
+                raise SystemExit(1)
+        elif BACKUP_PROMOTED:
+            if not rotator.backup_promoted():
+                raise SystemExit(1)
+        elif FORCE_PRELOAD_TORRENT:
+            logger.info(f"Configuration: {describe_config(config)}")
+            rotator.force_preload_one(
+                FORCE_PRELOAD_TORRENT, FORCE_PRELOAD_REMOTE_DIR
+            )
+        elif REPRELOAD:
+            logger.info(f"Configuration: {describe_config(config)}")
+            rotator.repreload()
+        else:
+            rotator.run(force=FORCE_ROTATION, delete_data=DELETE_DATA)
+    except RtorrentUnavailable as e:
+        logger.error(f"Aborting: {e}")
+        raise SystemExit(1)
+    finally:
+        if rotator.deleter:
+            rotator.deleter.drain()
+        if not daemon:
+            rotator.notifier.outbox.drain(config["mail_drain_timeout"])
+        if rotator.sampler:
+            rotator.sampler.stop()
+        if rotator.profiler:
+            rotator.profiler.stop()
+        if rotator._rtorrent:
+            logger.info(f"rtorrent RPC: {rotator._rtorrent.policy.summary()}")
+        rotator.export_metrics()
+        TRACER.log_summary()
+        trace = TRACER.export_chrome()
+        if trace:
+            logger.info(f"Chrome trace written to {trace}")
 
 
 if __name__ == "__main__":